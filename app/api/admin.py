@@ -0,0 +1,85 @@
+import asyncio
+import os
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from app.api.ui import templates
+from app.core.admin_auth import admin_access
+from app.core.compression import get_compressed_body_cache
+from app.core.profiler import StackSampler, profiler_counters, worker_profile_lock
+from app.core.templating import get_fragment_cache
+from app.db.group_commit import group_commit_stats
+from app.db.query_log import slow_query_log, top_queries
+from app.services.draft_store import draft_store_counters
+from app.services.prerender import get_prerender_store
+from app.services.recipe_cache import get_recipe_cache
+
+router = APIRouter()
+
+
+def _require_admin(request: Request) -> None:
+    access = admin_access(request.scope)
+    if access == "disabled":
+        raise HTTPException(status_code=404, detail="Not Found")
+    if access == "denied":
+        raise HTTPException(status_code=403, detail="Admin access denied")
+
+
+@router.get("/admin/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    request: Request, seconds: float = Query(default=5.0, gt=0, le=60)
+) -> PlainTextResponse:
+    _require_admin(request)
+    if not worker_profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profiling session is already running")
+
+    try:
+        profiler_counters["worker_sessions"] += 1
+        sampler = StackSampler()
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.to_thread(sampler.stop)
+    finally:
+        worker_profile_lock.release()
+
+    return PlainTextResponse(
+        sampler.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="worker-{os.getpid()}.collapsed"',
+            "X-Profile-Samples": str(sampler.sample_count),
+        },
+    )
+
+
+@router.get("/admin/queries")
+async def query_summary(
+    request: Request, limit: int = Query(default=10, ge=1, le=100)
+) -> dict[str, Any]:
+    _require_admin(request)
+    return {
+        "top_queries": top_queries(limit),
+        "slow_queries": list(slow_query_log)[-limit:],
+    }
+
+
+@router.get("/admin/writes")
+async def write_summary(request: Request) -> dict[str, Any]:
+    _require_admin(request)
+    return {"group_commit": group_commit_stats()}
+
+
+@router.get("/admin/cache")
+async def cache_summary(request: Request) -> dict[str, Any]:
+    _require_admin(request)
+    store = get_prerender_store()
+    return {
+        "recipe_cache": get_recipe_cache().stats(),
+        "drafts": dict(draft_store_counters),
+        "fragments": get_fragment_cache(templates).stats(),
+        "compression": get_compressed_body_cache().stats(),
+        "prerender": store.stats() if store is not None else {"enabled": False},
+    }
@@ -3,6 +3,7 @@ import logging
 from fastapi import APIRouter, HTTPException
 
 from app.core.config import get_settings
+from app.core.json_response import FastJSONResponse
 from app.schemas.recipe import Recipe, RecipeRequest
 from app.services.generator_factory import get_generator
 from app.services.generator_stub import StubRecipeGenerator
@@ -23,7 +24,7 @@ _GENERATION_UNAVAILABLE = {
 
 
 @router.post("/generate", response_model=Recipe)
-async def generate_recipe(request: RecipeRequest) -> Recipe:
+async def generate_recipe(request: RecipeRequest) -> FastJSONResponse:
     settings = get_settings()
     try:
         generator = get_generator(settings)
@@ -40,7 +41,7 @@ async def generate_recipe(request: RecipeRequest) -> Recipe:
                 "quick_easy": request.quick_easy,
             },
         )
-        return recipe
+        return FastJSONResponse(recipe)
     except Exception as exc:
         if settings.recipe_generator == "openai" and settings.openai_fallback_to_stub:
             generate_api_counters["fallback"] += 1
@@ -56,7 +57,7 @@ async def generate_recipe(request: RecipeRequest) -> Recipe:
                     "quick_easy": request.quick_easy,
                 },
             )
-            return StubRecipeGenerator().generate(request)
+            return FastJSONResponse(StubRecipeGenerator().generate(request))
 
         generate_api_counters["failure"] += 1
         logger.warning(
@@ -0,0 +1,37 @@
+from typing import Any
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.db.grocery import build_grocery_list, missing_recipe_ids
+from app.db.sqlite import get_conn
+
+router = APIRouter()
+
+
+class GroceryListRecipe(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    recipe_id: str
+    multiplier: float = Field(default=1.0, gt=0, le=100)
+
+
+class GroceryListRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    recipes: list[GroceryListRecipe] = Field(min_length=1, max_length=500)
+
+
+@router.post("/grocery-list")
+async def create_grocery_list(payload: GroceryListRequest) -> dict[str, Any]:
+    selections = [(item.recipe_id, item.multiplier) for item in payload.recipes]
+
+    with get_conn() as conn:
+        missing = missing_recipe_ids(conn, selections)
+        if missing:
+            raise HTTPException(
+                status_code=404, detail=f"Recipe not found: {', '.join(missing)}"
+            )
+        items = build_grocery_list(conn, selections)
+
+    return {"recipe_count": len({recipe_id for recipe_id, _ in selections}), "items": items}
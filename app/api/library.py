@@ -0,0 +1,358 @@
+import json
+import logging
+import time
+from collections import Counter
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from typing import Annotated, Any
+from uuid import uuid4
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import AwareDatetime, BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
+from pydantic_core import to_json
+
+from app.core.config import get_settings
+from app.db.bulk import (
+    BulkNote,
+    BulkRecipe,
+    BulkResult,
+    ConflictMode,
+    RecipeConflictError,
+    insert_recipes,
+)
+from app.db.group_commit import run_write
+from app.db.sqlite import get_conn, get_db_path, to_epoch_us
+from app.schemas.recipe import Recipe
+from app.services.prerender import schedule_prerender
+from app.services.recipe_cache import entry_from_row
+from app.services.similarity import remove_recipes_from_index
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+_EXPORT_PAGE_SIZE = 500
+_IMPORT_CHUNK_SIZE = 500
+_MAX_LINE_BYTES = 1024 * 1024
+_MAX_REPORTED_ERRORS = 100
+_MAX_BATCH_RECIPES = 500
+_TRACKED_IMPORTS = 20
+
+_RECIPE_BATCH = TypeAdapter(
+    Annotated[list[Recipe], Field(min_length=1, max_length=_MAX_BATCH_RECIPES)]
+)
+
+
+class LibraryNote(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    note_id: str | None = None
+    note_text: str
+    created_at: AwareDatetime
+
+
+class LibraryRecord(BaseModel):
+    """One NDJSON line of an export; the same shape is accepted by import."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    recipe: Recipe
+    created_at: AwareDatetime | None = None
+    notes: list[LibraryNote] = Field(default_factory=list)
+
+
+def _export_page(last_doc_id: int) -> tuple[int, bytes]:
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT doc_id, id, recipe_json, schema_version, created_at
+            FROM recipes
+            WHERE doc_id > ?
+            ORDER BY doc_id
+            LIMIT ?
+            """,
+            (last_doc_id, _EXPORT_PAGE_SIZE),
+        ).fetchall()
+        if not rows:
+            return last_doc_id, b""
+
+        notes: dict[str, list[dict[str, str]]] = {}
+        placeholders = ", ".join("?" for _ in rows)
+        for note in conn.execute(
+            f"""
+            SELECT id, recipe_id, note_text, created_at
+            FROM notes
+            WHERE recipe_id IN ({placeholders})
+            ORDER BY created_at_us
+            """,
+            [row["id"] for row in rows],
+        ):
+            notes.setdefault(str(note["recipe_id"]), []).append(
+                {
+                    "note_id": str(note["id"]),
+                    "note_text": str(note["note_text"]),
+                    "created_at": str(note["created_at"]),
+                }
+            )
+
+        lines = []
+        for row in rows:
+            # Stored recipe JSON is spliced in as bytes rather than parsed and re-encoded.
+            entry = entry_from_row(conn, row["recipe_json"], row["schema_version"])
+            lines.append(
+                b'{"recipe":'
+                + entry.recipe_json
+                + b',"created_at":'
+                + to_json(str(row["created_at"]))
+                + b',"notes":'
+                + to_json(notes.get(str(row["id"]), []))
+                + b"}\n"
+            )
+    return int(rows[-1]["doc_id"]), b"".join(lines)
+
+
+@router.get("/recipes/export")
+async def export_recipes() -> StreamingResponse:
+    async def stream() -> AsyncIterator[bytes]:
+        # Keyset pages by doc_id: memory stays at one page and no read transaction is held
+        # open for the whole download.
+        last_doc_id = 0
+        while True:
+            last_doc_id, page = _export_page(last_doc_id)
+            if not page:
+                return
+            yield page
+
+    filename = f"recipes-{datetime.now(UTC):%Y%m%d}.ndjson"
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post(
+    "/recipes/batch",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/Recipe"},
+                        "minItems": 1,
+                        "maxItems": _MAX_BATCH_RECIPES,
+                    }
+                }
+            },
+        }
+    },
+)
+async def save_recipes_batch(request: Request, on_conflict: ConflictMode = "skip") -> dict[str, Any]:
+    # The raw body is validated in one pydantic-core pass instead of json.loads followed by
+    # per-item validation of the decoded list.
+    try:
+        recipes = _RECIPE_BATCH.validate_json(await request.body())
+    except ValidationError as exc:
+        errors = [
+            {**error, "loc": ("body", *error["loc"])} for error in exc.errors(include_url=False)
+        ]
+        raise RequestValidationError(errors) from exc
+    ids = [recipe.id for recipe in recipes]
+    repeated = sorted(recipe_id for recipe_id, count in Counter(ids).items() if count > 1)
+    if repeated:
+        raise HTTPException(status_code=422, detail=f"Repeated recipe ids: {', '.join(repeated)}")
+
+    compress = get_settings().recipe_compression
+    db_path = get_db_path()
+    now = datetime.now(UTC)
+    items = [BulkRecipe(recipe, now, []) for recipe in recipes]
+    try:
+        result = await run_write(
+            lambda conn: insert_recipes(conn, db_path, items, compress, on_conflict)
+        )
+    except RecipeConflictError as exc:
+        conflicts = set(exc.recipe_ids)
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "message": "Recipes already exist; nothing was saved",
+                "items": [
+                    {"id": recipe_id, "status": "conflict" if recipe_id in conflicts else "aborted"}
+                    for recipe_id in ids
+                ],
+            },
+        ) from exc
+
+    _after_bulk_write(items, result)
+    return {
+        "items": [
+            {"id": recipe_id, "status": status}
+            for recipe_id, status in zip(ids, result.statuses, strict=True)
+        ]
+    }
+
+
+def _after_bulk_write(items: list[BulkRecipe], result: BulkResult) -> None:
+    # New doc_ids reach the similarity index through its catch-up; replaced recipes also
+    # have to drop their old vectors. Cached JSON needs nothing: every worker's cache is
+    # keyed by the row's content hash, which the replace changed.
+    if not result.replaced_doc_ids:
+        return
+    remove_recipes_from_index(result.replaced_doc_ids)
+    for item, status in zip(items, result.statuses, strict=True):
+        if status == "replaced":
+            schedule_prerender(item.recipe.id)
+
+
+def _to_bulk(record: LibraryRecord, imported_at: datetime) -> BulkRecipe:
+    return BulkRecipe(
+        recipe=record.recipe,
+        created_at=record.created_at or imported_at,
+        notes=[
+            BulkNote(note.note_id or str(uuid4()), note.note_text, note.created_at)
+            for note in record.notes
+        ],
+    )
+
+
+@router.post("/recipes/import")
+async def import_recipes(
+    request: Request,
+    import_id: str | None = Query(default=None, min_length=1, max_length=64),
+    on_conflict: ConflictMode = "skip",
+) -> dict[str, Any]:
+    compress = get_settings().recipe_compression
+    db_path = get_db_path()
+    started = time.perf_counter()
+    progress: dict[str, Any] = {
+        "import_id": import_id or str(uuid4()),
+        "done": False,
+        "lines": 0,
+        "created": 0,
+        "replaced": 0,
+        "skipped": 0,
+        "invalid": 0,
+        "errors": [],
+    }
+    _save_import(progress)
+    chunk: list[BulkRecipe] = []
+
+    def accept(line_number: int, line: bytes) -> None:
+        if not line.strip():
+            return
+        progress["lines"] += 1
+        try:
+            record = LibraryRecord.model_validate_json(line)
+        except ValidationError as exc:
+            progress["invalid"] += 1
+            if len(progress["errors"]) < _MAX_REPORTED_ERRORS:
+                error = exc.errors(include_url=False, include_input=False)[0]
+                progress["errors"].append({"line": line_number, "error": error["msg"]})
+            return
+        chunk.append(_to_bulk(record, datetime.now(UTC)))
+
+    async def flush() -> None:
+        items = list(chunk)
+        chunk.clear()
+        if not items:
+            return
+        try:
+            result = await run_write(
+                lambda conn: insert_recipes(conn, db_path, items, compress, on_conflict)
+            )
+        except RecipeConflictError as exc:
+            # Earlier chunks stay committed; the summary says how far the import got.
+            progress["conflicts"] = exc.recipe_ids
+            raise HTTPException(status_code=409, detail=progress) from exc
+        _after_bulk_write(items, result)
+        for status in ("created", "replaced", "skipped"):
+            progress[status] += result.statuses.count(status)
+        _save_import(progress)
+        logger.info(
+            "recipe_import",
+            extra={
+                "outcome": "progress",
+                "import_id": progress["import_id"],
+                "lines": progress["lines"],
+                "created": progress["created"],
+            },
+        )
+
+    # The body is consumed as it arrives: memory holds one chunk of records, and each chunk
+    # is committed before more of the body is read.
+    line_number = 0
+    buffer = b""
+    try:
+        async for data in request.stream():
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                line_number += 1
+                accept(line_number, line)
+                if len(chunk) >= _IMPORT_CHUNK_SIZE:
+                    await flush()
+            if len(buffer) > _MAX_LINE_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Line {line_number + 1} is longer than {_MAX_LINE_BYTES} bytes",
+                )
+        accept(line_number + 1, buffer)
+        await flush()
+    except HTTPException:
+        # Pollers see the import end where it stopped rather than running forever.
+        progress["done"] = True
+        _save_import(progress)
+        raise
+
+    progress["done"] = True
+    progress["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    _save_import(progress)
+    logger.info(
+        "recipe_import",
+        extra={
+            "outcome": "complete",
+            "import_id": progress["import_id"],
+            "lines": progress["lines"],
+            "created": progress["created"],
+            "replaced": progress["replaced"],
+            "skipped": progress["skipped"],
+            "invalid": progress["invalid"],
+            "elapsed_ms": progress["elapsed_ms"],
+        },
+    )
+    return progress
+
+
+@router.get("/recipes/import/{import_id}")
+async def import_progress(import_id: str) -> dict[str, Any]:
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT progress_json FROM recipe_imports WHERE id = ?", (import_id,)
+        ).fetchone()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return json.loads(row["progress_json"])
+
+
+def _save_import(progress: dict[str, Any]) -> None:
+    # Stored in the database, so a client polling through any worker sees the same progress.
+    with get_conn() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO recipe_imports (id, progress_json, updated_at_us)
+            VALUES (?, ?, ?)
+            """,
+            (progress["import_id"], json.dumps(progress), to_epoch_us(datetime.now(UTC))),
+        )
+        conn.execute(
+            """
+            DELETE FROM recipe_imports
+            WHERE id NOT IN (
+                SELECT id FROM recipe_imports ORDER BY updated_at_us DESC LIMIT ?
+            )
+            """,
+            (_TRACKED_IMPORTS,),
+        )
@@ -1,117 +1,320 @@
 import sqlite3
+from collections.abc import Iterator
 from datetime import UTC, datetime
+from typing import Any
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, ConfigDict
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict, Field
 
-from app.db.sqlite import get_conn
-from app.schemas.recipe import Recipe
+from app.core.config import get_settings
+from app.core.http_cache import (
+    NOTES_CACHE_CONTROL,
+    RECIPE_JSON_CACHE_CONTROL,
+    content_hash,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
+from app.core.json_response import FastJSONResponse, StreamingJSONResponse, wants_ndjson
+from app.db.codec import encode_for_storage, stored_dictionary_id, train_first_dictionary
+from app.db.group_commit import run_write
+from app.db.ingredients import index_ingredients, match_pantry
+from app.db.recipe_storage import pack_recipe_json
+from app.db.records import (
+    NOTE_RECORD_COLUMNS,
+    RECIPE_SUMMARY_COLUMNS,
+    NoteRecord,
+    RecipeSummary,
+    dump_note_records,
+    dump_recipe_summaries,
+    note_record_row,
+    recipe_summary_row,
+)
+from app.db.search import index_note, index_recipe, search_recipes
+from app.db.sqlite import get_conn, get_db_path, to_epoch_us
+from app.schemas.recipe import RECIPE_SCHEMA_VERSION, Recipe
+from app.services.prerender import schedule_prerender
+from app.services.recipe_cache import load_recipe, load_recipe_entry, store_recipe
+from app.services.similarity import add_recipe_to_index, similar_recipes
 
 router = APIRouter()
 
+_LIST_BATCH_ROWS = 500
+
 
 class RecipeNoteCreate(BaseModel):
     model_config = ConfigDict(extra="forbid")
     note_text: str
-@router.post("/recipes")
+
+
+class PantryMatchRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    ingredients: list[str] = Field(min_length=1, max_length=200)
+    limit: int = Field(default=20, ge=1, le=100)
+    min_coverage: float = Field(default=0.0, ge=0.0, le=1.0)
+
+
+@router.post("/recipes", response_class=FastJSONResponse)
 async def save_recipe(recipe: Recipe) -> dict[str, str]:
     created_at = datetime.now(UTC).isoformat()
     recipe_json = recipe.model_dump_json()
+    packed_json = pack_recipe_json(recipe)
+    compress = get_settings().recipe_compression
+    db_path = get_db_path()
 
-    try:
-        with get_conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO recipes (id, title, recipe_json, created_at)
-                VALUES (?, ?, ?, ?)
-                """,
-                (recipe.id, recipe.title, recipe_json, created_at),
+    def insert(conn: sqlite3.Connection) -> int:
+        stored_json: str | bytes = packed_json
+        if compress:
+            stored_json = encode_for_storage(conn, db_path, packed_json)
+        cursor = conn.execute(
+            """
+            INSERT INTO recipes (
+                id, title, recipe_json, created_at, schema_version, content_hash, doc_id
             )
+            VALUES (?, ?, ?, ?, ?, ?, (SELECT COALESCE(MAX(doc_id), 0) + 1 FROM recipes))
+            """,
+            (
+                recipe.id,
+                recipe.title,
+                stored_json,
+                created_at,
+                RECIPE_SCHEMA_VERSION,
+                content_hash(recipe_json.encode()),
+            ),
+        )
+        doc_id = int(
+            conn.execute(
+                "SELECT doc_id FROM recipes WHERE rowid = ?", (cursor.lastrowid,)
+            ).fetchone()["doc_id"]
+        )
+        index_recipe(conn, doc_id, recipe)
+        index_ingredients(conn, recipe)
+        if compress and stored_dictionary_id(stored_json) is None:
+            train_first_dictionary(conn, db_path)
+        return doc_id
+
+    try:
+        doc_id = await run_write(insert)
     except sqlite3.IntegrityError as exc:
         raise HTTPException(status_code=409, detail="Recipe already exists") from exc
 
+    store_recipe(recipe, recipe_json)
+    add_recipe_to_index(doc_id, recipe)
+    schedule_prerender(recipe.id)
+
     return {"id": recipe.id}
 
 
-@router.get("/recipes")
-async def list_recipes() -> list[dict[str, str]]:
+@router.get("/recipes", response_model=list[dict[str, Any]])
+async def list_recipes_json(
+    request: Request, stream: bool = False, limit: int | None = Query(default=None, ge=1)
+) -> Response:
+    # ?stream=true sends the same JSON array as it is read; Accept: application/x-ndjson
+    # streams one object per line.
+    ndjson = wants_ndjson(request)
+    if stream or ndjson:
+        return StreamingJSONResponse(
+            iter_recipe_summaries(limit), ndjson=ndjson, dumps=dump_recipe_summaries
+        )
+    return Response(
+        dump_recipe_summaries(await list_recipes(limit)), media_type="application/json"
+    )
+
+
+async def list_recipes(limit: int | None = None, offset: int = 0) -> list[RecipeSummary]:
     with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT id, title, created_at
-            FROM recipes
-            ORDER BY created_at DESC
-            """
-        ).fetchall()
+        return _recipe_summaries(conn, limit, offset).fetchall()
 
-    return [
-        {"id": str(row["id"]), "title": str(row["title"]), "created_at": str(row["created_at"])}
-        for row in rows
-    ]
+
+def iter_recipe_summaries(limit: int | None = None) -> Iterator[RecipeSummary]:
+    # Rows are fetched a batch at a time; the connection stays open until iteration ends.
+    conn = get_conn()
+    try:
+        cursor = _recipe_summaries(conn, limit)
+        while rows := cursor.fetchmany(_LIST_BATCH_ROWS):
+            yield from rows
+    finally:
+        conn.close()
+
+
+def _recipe_summaries(
+    conn: sqlite3.Connection, limit: int | None = None, offset: int = 0
+) -> sqlite3.Cursor:
+    cursor = conn.cursor()
+    cursor.row_factory = recipe_summary_row
+    # LIMIT -1 is SQLite for no limit.
+    return cursor.execute(
+        f"""
+        SELECT {RECIPE_SUMMARY_COLUMNS}
+        FROM recipes
+        ORDER BY created_at DESC
+        LIMIT ? OFFSET ?
+        """,
+        (-1 if limit is None else limit, offset),
+    )
+
+
+@router.post("/recipes/match")
+async def match_recipes(payload: PantryMatchRequest) -> dict[str, Any]:
+    with get_conn() as conn:
+        matches = match_pantry(conn, payload.ingredients, payload.limit, payload.min_coverage)
+
+    return {"results": matches}
+
+
+@router.get("/recipes/search")
+async def search(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=50),
+    offset: int = Query(default=0, ge=0),
+) -> dict[str, Any]:
+    with get_conn() as conn:
+        results, has_more = search_recipes(conn, q, limit, offset)
+
+    return {
+        "query": q,
+        "limit": limit,
+        "offset": offset,
+        "has_more": has_more,
+        "results": results,
+    }
 
 
-@router.get("/recipes/{recipe_id}", response_model=Recipe)
 async def get_recipe(recipe_id: str) -> Recipe:
+    recipe = load_recipe(recipe_id)
+    if recipe is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+
+    return recipe
+
+
+def recipe_version(recipe_id: str) -> dict[str, Any] | None:
     with get_conn() as conn:
         row = conn.execute(
             """
-            SELECT recipe_json
+            SELECT content_hash, note_count, (SELECT MAX(doc_id) FROM recipes) AS library_version
             FROM recipes
             WHERE id = ?
             """,
             (recipe_id,),
         ).fetchone()
 
-    if row is None:
+    return dict(row) if row is not None else None
+
+
+@router.get("/recipes/{recipe_id}", response_model=Recipe)
+async def get_recipe_json(recipe_id: str, request: Request) -> Response:
+    entry = load_recipe_entry(recipe_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+
+    etag = make_etag(entry.content_hash)
+    if etag_matches(request, etag):
+        return not_modified(etag, RECIPE_JSON_CACHE_CONTROL)
+    # Stored JSON was produced by Recipe.model_dump_json under the current schema version, so
+    # it is sent as-is; returning a Response skips FastAPI's response_model re-validation.
+    return Response(
+        content=entry.recipe_json,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": RECIPE_JSON_CACHE_CONTROL},
+    )
+
+
+@router.get("/recipes/{recipe_id}/similar")
+async def list_similar(
+    recipe_id: str, limit: int = Query(default=5, ge=1, le=20)
+) -> list[dict[str, Any]]:
+    with get_conn() as conn:
+        recipe_row = conn.execute("SELECT 1 FROM recipes WHERE id = ?", (recipe_id,)).fetchone()
+    if recipe_row is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
-    return Recipe.model_validate_json(str(row["recipe_json"]))
+    return similar_recipes(recipe_id, limit)
 
 
 @router.post("/recipes/{recipe_id}/notes")
 async def add_note(recipe_id: str, payload: RecipeNoteCreate) -> dict[str, str]:
+    note = await insert_note(recipe_id, payload.note_text)
+    return {"note_id": note.note_id}
+
+
+async def insert_note(recipe_id: str, note_text: str) -> NoteRecord:
     note_id = str(uuid4())
-    created_at = datetime.now(UTC).isoformat()
+    now = datetime.now(UTC)
 
-    with get_conn() as conn:
+    def insert(conn: sqlite3.Connection) -> None:
         recipe_row = conn.execute("SELECT 1 FROM recipes WHERE id = ?", (recipe_id,)).fetchone()
         if recipe_row is None:
             raise HTTPException(status_code=404, detail="Recipe not found")
 
         conn.execute(
             """
-            INSERT INTO notes (id, recipe_id, note_text, created_at)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO notes (id, recipe_id, note_text, created_at, created_at_us)
+            VALUES (?, ?, ?, ?, ?)
             """,
-            (note_id, recipe_id, payload.note_text, created_at),
+            (note_id, recipe_id, note_text, now.isoformat(), to_epoch_us(now)),
         )
+        index_note(conn, recipe_id, note_text)
+
+    await run_write(insert)
+    schedule_prerender(recipe_id)
+
+    return NoteRecord(note_id, note_text, now.isoformat())
+
+
+@router.get("/recipes/{recipe_id}/notes", response_model=list[dict[str, str]])
+async def list_notes_json(recipe_id: str, request: Request, stream: bool = False) -> Response:
+    version = recipe_version(recipe_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
 
-    return {"note_id": note_id}
+    # Notes are append-only, so the per-recipe note count is a version counter.
+    ndjson = wants_ndjson(request)
+    etag = make_etag("notes", version["note_count"], *(["ndjson"] if ndjson else []))
+    if etag_matches(request, etag):
+        return not_modified(etag, NOTES_CACHE_CONTROL)
+    headers = {"ETag": etag, "Cache-Control": NOTES_CACHE_CONTROL, "Vary": "Accept"}
+    if stream or ndjson:
+        return StreamingJSONResponse(
+            iter_notes(recipe_id), ndjson=ndjson, headers=headers, dumps=dump_note_records
+        )
+    return Response(
+        dump_note_records(await list_notes(recipe_id)),
+        media_type="application/json",
+        headers=headers,
+    )
 
 
-@router.get("/recipes/{recipe_id}/notes")
-async def list_notes(recipe_id: str) -> list[dict[str, str]]:
+async def list_notes(recipe_id: str) -> list[NoteRecord]:
     with get_conn() as conn:
         recipe_row = conn.execute("SELECT 1 FROM recipes WHERE id = ?", (recipe_id,)).fetchone()
         if recipe_row is None:
             raise HTTPException(status_code=404, detail="Recipe not found")
+        return _note_records(conn, recipe_id).fetchall()
 
-        rows = conn.execute(
-            """
-            SELECT id, note_text, created_at
-            FROM notes
-            WHERE recipe_id = ?
-            ORDER BY created_at DESC
-            """,
-            (recipe_id,),
-        ).fetchall()
-
-    return [
-        {
-            "note_id": str(row["id"]),
-            "note_text": str(row["note_text"]),
-            "created_at": str(row["created_at"]),
-        }
-        for row in rows
-    ]
+
+def iter_notes(recipe_id: str) -> Iterator[NoteRecord]:
+    conn = get_conn()
+    try:
+        cursor = _note_records(conn, recipe_id)
+        while rows := cursor.fetchmany(_LIST_BATCH_ROWS):
+            yield from rows
+    finally:
+        conn.close()
+
+
+def _note_records(conn: sqlite3.Connection, recipe_id: str) -> sqlite3.Cursor:
+    cursor = conn.cursor()
+    cursor.row_factory = note_record_row
+    return cursor.execute(
+        f"""
+        SELECT {NOTE_RECORD_COLUMNS}
+        FROM notes
+        WHERE recipe_id = ?
+        ORDER BY created_at_us DESC
+        """,
+        (recipe_id,),
+    )
@@ -1,28 +1,62 @@
 import logging
 from typing import Any
+from urllib.parse import urlencode
 
 from fastapi import APIRouter, Form, HTTPException, Request
-from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
-from pydantic import ValidationError
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
+from starlette.background import BackgroundTask
 
 from app.api.recipes import (
-    RecipeNoteCreate,
-    add_note,
-    get_recipe,
-    list_notes,
+    insert_note,
+    iter_notes,
     list_recipes,
+    recipe_version,
     save_recipe,
+    search,
 )
+from app.core.assets import get_asset_manifest
 from app.core.config import get_settings
-from app.schemas.recipe import Recipe, RecipeRequest
+from app.core.http_cache import (
+    COOK_PAGE_CACHE_CONTROL,
+    RECIPE_PAGE_CACHE_CONTROL,
+    SERVICE_WORKER_CACHE_CONTROL,
+    etag_matches,
+    fingerprint_directory,
+    make_etag,
+    not_modified,
+)
+from app.core.templating import build_templates
+from app.schemas.recipe import RecipeRequest
+from app.services.draft_store import get_draft_store
 from app.services.generator_factory import get_generator
 from app.services.generator_stub import StubRecipeGenerator
+from app.services.prerender import PrerenderStore, get_prerender_store
+from app.services.recipe_cache import CachedRecipe, load_recipe_entry
+from app.services.similarity import similar_recipes
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+templates = build_templates("app/templates", get_settings())
+# Part of every page ETag, so a deploy with changed templates or assets never serves a stale
+# 304 that links to old asset URLs.
+_TEMPLATES_FINGERPRINT = (
+    f"{fingerprint_directory('app/templates')}.{get_asset_manifest().fingerprint}"
+)
 logger = logging.getLogger(__name__)
 
+# Sent by ui.js when it wants only the changed fragment of a page instead of a redirect or
+# the whole page.
+PARTIAL_HEADER = "X-Partial"
+_UI_PAGE_SIZE = 50
+
+
+def is_partial(request: Request) -> bool:
+    return request.headers.get(PARTIAL_HEADER) == "1"
+
+
+def _components() -> Any:
+    # Macros from components.html, called directly to render a fragment without a page.
+    return templates.env.get_template("components.html").module
+
 
 def _parse_ingredients(raw: str) -> list[str]:
     chunks = [item.strip() for line in raw.splitlines() for item in line.split(",")]
@@ -95,62 +129,216 @@ async def generate_from_form(
             },
         )
 
-    return templates.TemplateResponse(
-        request,
-        "result.html",
-        {
-            "recipe": recipe,
-            "recipe_json": recipe.model_dump_json(),
-        },
-    )
+    # The save form posts back only the id; the recipe itself waits server-side.
+    await get_draft_store().put(recipe)
+    return templates.TemplateResponse(request, "result.html", {"recipe": recipe})
 
 
 @router.post("/ui/save")
-async def save_from_ui(recipe_json: str = Form()) -> RedirectResponse:
-    try:
-        recipe = Recipe.model_validate_json(recipe_json)
-    except ValidationError as exc:
-        raise HTTPException(status_code=400, detail="Invalid recipe payload") from exc
+async def save_from_ui(recipe_id: str = Form()) -> RedirectResponse:
+    drafts = get_draft_store()
+    draft = drafts.get(recipe_id)
+    if draft is None:
+        # A repeated submit after the first one saved and discarded the draft.
+        if recipe_version(recipe_id) is not None:
+            return RedirectResponse(url=f"/recipes/ui/{recipe_id}", status_code=303)
+        raise HTTPException(status_code=404, detail="Recipe draft not found or expired")
     try:
-        saved = await save_recipe(recipe)
-        recipe_id = saved["id"]
+        await save_recipe(draft.recipe)
     except HTTPException as exc:
         if exc.status_code != 409:
             raise
-        recipe_id = recipe.id
+    await drafts.discard(recipe_id)
     return RedirectResponse(url=f"/recipes/ui/{recipe_id}", status_code=303)
 
 
 @router.get("/recipes/ui")
-async def list_recipes_ui(request: Request) -> Any:
-    recipes = await list_recipes()
-    return templates.TemplateResponse(request, "recipes_list.html", {"recipes": recipes})
+async def list_recipes_ui(request: Request, q: str = "", offset: int = 0) -> Any:
+    query = q.strip()[:200]
+    offset = max(offset, 0)
+    if query:
+        found = await search(q=query, limit=_UI_PAGE_SIZE, offset=offset)
+        recipes, has_more = found["results"], found["has_more"]
+    else:
+        rows = await list_recipes(_UI_PAGE_SIZE + 1, offset)
+        recipes, has_more = rows[:_UI_PAGE_SIZE], len(rows) > _UI_PAGE_SIZE
+    next_url = None
+    if has_more:
+        params = {"q": query} if query else {}
+        next_url = "/recipes/ui?" + urlencode({**params, "offset": offset + _UI_PAGE_SIZE})
+    # The same URL answers with the whole page or just the next rows, so caches must key on
+    # the header too.
+    headers = {"Vary": PARTIAL_HEADER}
+    if is_partial(request):
+        fragment = _components().recipe_rows(recipes, query) + _components().load_more(next_url)
+        return HTMLResponse(fragment, headers=headers)
+    return templates.TemplateResponse(
+        request,
+        "recipes_list.html",
+        {"recipes": recipes, "query": query, "next_url": next_url},
+        headers=headers,
+    )
 
 
 @router.get("/recipes/ui/{recipe_id}")
 async def recipe_detail_ui(request: Request, recipe_id: str) -> Any:
-    recipe = await get_recipe(recipe_id)
-    notes = await list_notes(recipe_id)
-    return templates.TemplateResponse(
+    version = recipe_version(recipe_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+
+    etag = _detail_etag(version["content_hash"], version["note_count"])
+    if etag_matches(request, etag):
+        return not_modified(etag, RECIPE_PAGE_CACHE_CONTROL)
+
+    store = get_prerender_store()
+    if store is not None and (body := store.read("detail", recipe_id, etag)) is not None:
+        return HTMLResponse(
+            body, headers={"ETag": etag, "Cache-Control": RECIPE_PAGE_CACHE_CONTROL}
+        )
+
+    page = _detail_page(recipe_id, version)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    # Normally the same ETag; after a concurrent write, the one that describes this body.
+    etag, context = page
+    response = templates.TemplateResponse(
         request,
         "recipe_detail.html",
-        {"recipe": recipe, "notes": notes},
+        context,
+        headers={"ETag": etag, "Cache-Control": RECIPE_PAGE_CACHE_CONTROL},
     )
+    if store is not None:
+        response.background = BackgroundTask(
+            store.write, "detail", recipe_id, etag, bytes(response.body)
+        )
+    return response
+
+
+def _detail_etag(stored_hash: str, note_count: int) -> str:
+    # The similar-recipes panel is loaded separately, so saving another recipe leaves this
+    # page, its pre-rendered file and its 304s alone.
+    return make_etag(_TEMPLATES_FINGERPRINT, stored_hash, note_count)
+
+
+def _detail_page(recipe_id: str, version: dict[str, Any]) -> tuple[str, dict[str, Any]] | None:
+    """ETag and template context of a detail page, the ETag taken from what is rendered.
+
+    The recipe may be newer than ``version`` if it was replaced in between; the ETag then
+    names that newer row, so a page is never cached or pre-rendered under another version.
+    """
+    entry = load_recipe_entry(recipe_id, version["content_hash"])
+    if entry is None or entry.stored_hash is None:
+        return None
+    notes = list(iter_notes(recipe_id))
+    context = {
+        "recipe": entry.recipe,
+        # Fragment caches are keyed by the JSON actually rendered, never by a hash read
+        # separately, so a block cannot be stored under another version's key.
+        "recipe_hash": entry.content_hash,
+        "notes": notes,
+    }
+    return _detail_etag(entry.stored_hash, len(notes)), context
+
+
+@router.get("/recipes/ui/{recipe_id}/similar")
+async def similar_recipes_ui(request: Request, recipe_id: str) -> Any:
+    version = recipe_version(recipe_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+
+    partial = is_partial(request)
+    # Any new or replaced recipe may join the panel, so it follows the library's newest doc_id.
+    etag = make_etag(_TEMPLATES_FINGERPRINT, "similar", version["library_version"], int(partial))
+    if etag_matches(request, etag):
+        return not_modified(etag, RECIPE_PAGE_CACHE_CONTROL)
+
+    similar = similar_recipes(recipe_id, 5)
+    headers = {"ETag": etag, "Cache-Control": RECIPE_PAGE_CACHE_CONTROL, "Vary": PARTIAL_HEADER}
+    if partial:
+        return HTMLResponse(_components().similar_panel(similar), headers=headers)
+    return templates.TemplateResponse(
+        request,
+        "similar_recipes.html",
+        {"recipe_id": recipe_id, "similar": similar},
+        headers=headers,
+    )
+
+
+def _cook_etag(entry: CachedRecipe) -> str:
+    return make_etag(_TEMPLATES_FINGERPRINT, entry.content_hash)
+
+
+def _cook_context(entry: CachedRecipe) -> dict[str, Any]:
+    return {"recipe": entry.recipe, "recipe_hash": entry.content_hash}
+
+
+def render_recipe_pages(store: PrerenderStore, recipe_id: str) -> int:
+    """Write the current detail and cook pages of one recipe; returns the pages written."""
+    written = 0
+    version = recipe_version(recipe_id)
+    page = _detail_page(recipe_id, version) if version is not None else None
+    if page is not None:
+        etag, context = page
+        body = templates.get_template("recipe_detail.html").render(context).encode()
+        store.write("detail", recipe_id, etag, body)
+        written += 1
+    entry = load_recipe_entry(recipe_id)
+    if entry is not None:
+        body = templates.get_template("cook_mode.html").render(_cook_context(entry)).encode()
+        store.write("cook", recipe_id, _cook_etag(entry), body)
+        written += 1
+    return written
 
 
 @router.post("/recipes/ui/{recipe_id}/notes")
-async def add_note_ui(recipe_id: str, note_text: str = Form()) -> RedirectResponse:
+async def add_note_ui(request: Request, recipe_id: str, note_text: str = Form()) -> Response:
     cleaned = note_text.strip()
-    if cleaned:
-        await add_note(recipe_id, RecipeNoteCreate(note_text=cleaned))
+    note = await insert_note(recipe_id, cleaned) if cleaned else None
+    if is_partial(request):
+        # Only the new list item; the page inserts it above the older notes.
+        if note is None:
+            return Response(status_code=204)
+        return HTMLResponse(_components().note_item(note))
     return RedirectResponse(url=f"/recipes/ui/{recipe_id}", status_code=303)
 
 
-@router.get("/cook/{recipe_id}")
-async def cook_mode_page(request: Request, recipe_id: str) -> Any:
-    recipe = await get_recipe(recipe_id)
+@router.get("/sw.js", include_in_schema=False)
+async def service_worker(request: Request) -> Any:
+    # Served from the root so its scope covers every page; the script must keep this URL,
+    # so browsers revalidate it rather than caching it by content hash.
     return templates.TemplateResponse(
         request,
-        "cook_mode.html",
-        {"recipe": recipe},
+        "sw.js",
+        {
+            "version": _TEMPLATES_FINGERPRINT,
+            "shell_urls": ["/", "/recipes/ui", *get_asset_manifest().urls()],
+            "prefetch_recipes": get_settings().offline_prefetch_recipes,
+        },
+        media_type="text/javascript",
+        headers={"Cache-Control": SERVICE_WORKER_CACHE_CONTROL},
     )
+
+
+@router.get("/cook/{recipe_id}")
+async def cook_mode_page(request: Request, recipe_id: str) -> Any:
+    entry = load_recipe_entry(recipe_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+
+    etag = _cook_etag(entry)
+    if etag_matches(request, etag):
+        return not_modified(etag, COOK_PAGE_CACHE_CONTROL)
+
+    headers = {"ETag": etag, "Cache-Control": COOK_PAGE_CACHE_CONTROL}
+    store = get_prerender_store()
+    if store is not None and (body := store.read("cook", recipe_id, etag)) is not None:
+        return HTMLResponse(body, headers=headers)
+
+    response = templates.TemplateResponse(
+        request, "cook_mode.html", _cook_context(entry), headers=headers
+    )
+    if store is not None:
+        response.background = BackgroundTask(
+            store.write, "cook", recipe_id, etag, bytes(response.body)
+        )
+    return response
@@ -0,0 +1,42 @@
+"""Who may use the admin endpoints and the ``X-Profile`` header.
+
+Admin mode must be switched on (``ADMIN_ENABLED=1``), and then each request must either
+carry ``X-Admin-Token`` equal to ``ADMIN_TOKEN`` or, when no token is configured, come
+from a loopback address. Stack dumps include file paths and samplers cost CPU, so an
+enabled flag alone is not enough.
+"""
+
+import hmac
+import ipaddress
+from typing import Literal
+
+from starlette.datastructures import Headers
+from starlette.types import Scope
+
+from app.core.config import get_settings
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+AdminAccess = Literal["disabled", "denied", "allowed"]
+
+
+def _is_loopback(scope: Scope) -> bool:
+    client = scope.get("client")
+    if not client:
+        return False
+    try:
+        return ipaddress.ip_address(client[0]).is_loopback
+    except ValueError:
+        return False
+
+
+def admin_access(scope: Scope) -> AdminAccess:
+    settings = get_settings()
+    if not settings.admin_enabled:
+        return "disabled"
+    if settings.admin_token:
+        supplied = Headers(scope=scope).get(ADMIN_TOKEN_HEADER, "")
+        if hmac.compare_digest(supplied.encode(), settings.admin_token.encode()):
+            return "allowed"
+        return "denied"
+    return "allowed" if _is_loopback(scope) else "denied"
@@ -0,0 +1,241 @@
+"""Fingerprinted, precompressed static assets.
+
+``build_assets`` copies every file in ``app/static`` to ``app/static/build`` under a name that
+carries its content hash (``styles.css`` -> ``styles.<hash>.css``), next to ``.gz`` and, when the
+optional ``brotli`` package is installed, ``.br`` variants. Templates link assets through the
+``asset_url`` global, so a changed file gets a new URL and the old one may be cached forever.
+
+The build runs at deploy time (``python -m app.core.assets``); the app itself only reads the
+manifest and never writes into the package.
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import mimetypes
+import os
+import stat
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Scope
+
+from app.core.compression import accepted_encodings, brotli_module
+from app.core.http_cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path("app/static")
+BUILD_DIRNAME = "build"
+MANIFEST_NAME = "manifest.json"
+STATIC_URL = "/static"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Unhashed paths keep working for old bookmarks and scripts, but must revalidate.
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+_MANIFEST_PATH = f"{BUILD_DIRNAME}/{MANIFEST_NAME}"
+_COMPRESSIBLE_SUFFIXES = {".css", ".js", ".json", ".svg", ".html", ".txt", ".map"}
+# Preferred first when the client accepts both.
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _brotli_compress(data: bytes) -> bytes | None:
+    brotli = brotli_module()
+    if brotli is None:
+        return None
+    return brotli.compress(data, quality=11)
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    # Workers may build at the same time; readers only ever see whole files.
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _hashed_name(name: str, data: bytes) -> str:
+    stem, dot, suffix = name.rpartition(".")
+    digest = content_hash(data)[:12]
+    return f"{stem}.{digest}.{suffix}" if dot else f"{name}.{digest}"
+
+
+def _source_files(static_dir: Path) -> list[Path]:
+    return sorted(
+        path for path in static_dir.iterdir() if path.is_file() and not path.name.startswith(".")
+    )
+
+
+def build_assets(static_dir: Path = STATIC_DIR) -> dict[str, Any]:
+    """Write hashed and precompressed copies of every static file; returns the manifest.
+
+    Files from earlier builds are left in place, so pages rendered before a deploy (and still
+    cached by browsers) keep loading the assets they reference.
+    """
+    build_dir = static_dir / BUILD_DIRNAME
+    build_dir.mkdir(exist_ok=True)
+    files: dict[str, dict[str, Any]] = {}
+    for source in _source_files(static_dir):
+        data = source.read_bytes()
+        hashed = _hashed_name(source.name, data)
+        target = build_dir / hashed
+        entry: dict[str, Any] = {"path": hashed, "bytes": len(data), "encodings": {}}
+        if not target.exists():
+            write_atomic(target, data)
+        if source.suffix in _COMPRESSIBLE_SUFFIXES:
+            variants = (
+                ("gzip", ".gz", lambda raw: gzip.compress(raw, compresslevel=9, mtime=0)),
+                ("br", ".br", _brotli_compress),
+            )
+            for encoding, suffix, compress in variants:
+                variant = build_dir / f"{hashed}{suffix}"
+                if not variant.exists():
+                    compressed = compress(data)
+                    # Not worth a variant when compression does not pay for itself.
+                    if compressed is None or len(compressed) >= len(data):
+                        continue
+                    write_atomic(variant, compressed)
+                entry["encodings"][encoding] = variant.stat().st_size
+        files[source.name] = entry
+    manifest = {"files": files}
+    write_atomic(build_dir / MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+    logger.info("static_assets_built", extra={"files": len(files), "build_dir": str(build_dir)})
+    return manifest
+
+
+class AssetManifest:
+    """Maps source names (``styles.css``) to their fingerprinted URLs.
+
+    ``sources`` maps every static file to the hashed name it should have; a file missing from
+    ``files`` (never built, or edited since the build) is linked by its plain, revalidated URL.
+    """
+
+    def __init__(self, files: dict[str, dict[str, Any]], sources: dict[str, str]) -> None:
+        self.files = files
+        self.sources = sources
+        self.fingerprint = content_hash(
+            json.dumps({"files": files, "sources": sources}, sort_keys=True).encode()
+        )[:12]
+
+    def url(self, name: str) -> str:
+        entry = self.files.get(name)
+        if entry is not None:
+            return f"{STATIC_URL}/{BUILD_DIRNAME}/{entry['path']}"
+        if name not in self.sources:
+            raise ValueError(f"unknown static asset: {name}")
+        return f"{STATIC_URL}/{name}"
+
+    def urls(self) -> list[str]:
+        return [self.url(name) for name in sorted(self.sources)]
+
+
+def load_asset_manifest(static_dir: Path = STATIC_DIR) -> AssetManifest:
+    """Read the build manifest, keeping only entries that match the current sources."""
+    manifest_path = static_dir / BUILD_DIRNAME / MANIFEST_NAME
+    try:
+        files: dict[str, dict[str, Any]] = json.loads(manifest_path.read_bytes())["files"]
+    except (OSError, ValueError, KeyError):
+        files = {}
+    sources = {
+        source.name: _hashed_name(source.name, source.read_bytes())
+        for source in _source_files(static_dir)
+    }
+    current = {
+        name: entry
+        for name, entry in files.items()
+        if sources.get(name) == entry["path"]
+        and (static_dir / BUILD_DIRNAME / entry["path"]).exists()
+    }
+    if len(current) < len(sources):
+        logger.warning(
+            "static_assets_unbuilt",
+            extra={
+                "unbuilt": sorted(set(sources) - set(current)),
+                "hint": "run python -m app.core.assets",
+            },
+        )
+    return AssetManifest(current, sources)
+
+
+@lru_cache
+def get_asset_manifest() -> AssetManifest:
+    return load_asset_manifest()
+
+
+def asset_url(name: str) -> str:
+    """Jinja global: ``{{ asset_url("styles.css") }}``."""
+    return get_asset_manifest().url(name)
+
+
+def _media_type(path: str) -> str | None:
+    media_type, _ = mimetypes.guess_type(path)
+    if media_type is not None and media_type.startswith("text/"):
+        media_type += "; charset=utf-8"
+    return media_type
+
+
+class AssetStaticFiles(StaticFiles):
+    """StaticFiles that serves precompressed variants and long-lived headers for build output."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await self._precompressed_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            immutable = path.startswith(f"{BUILD_DIRNAME}/") and path != _MANIFEST_PATH
+            response.headers["cache-control"] = (
+                IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+            )
+            if Path(path).suffix in _COMPRESSIBLE_SUFFIXES:
+                response.headers["vary"] = "Accept-Encoding"
+        return response
+
+    async def _precompressed_response(self, path: str, scope: Scope) -> Response | None:
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        accepted = accepted_encodings(Headers(scope=scope))
+        for encoding, suffix in _ENCODINGS:
+            if encoding not in accepted:
+                continue
+            try:
+                full_path, stat_result = await anyio.to_thread.run_sync(
+                    self.lookup_path, path + suffix
+                )
+            except (OSError, ValueError):
+                return None
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+            response = self.file_response(full_path, stat_result, scope)
+            response.headers["content-encoding"] = encoding
+            media_type = _media_type(path)
+            if media_type is not None and response.status_code == 200:
+                response.headers["content-type"] = media_type
+            return response
+        return None
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.core.assets")
+    parser.add_argument("--static-dir", type=Path, default=STATIC_DIR)
+    args = parser.parse_args(argv)
+
+    manifest = build_assets(args.static_dir)
+    for name, entry in manifest["files"].items():
+        encodings = ", ".join(f"{key} {size} B" for key, size in entry["encodings"].items())
+        print(f"{name:<12} -> {entry['path']:<28} {entry['bytes']:>7} B  {encodings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""Response compression with per-route policies.
+
+``CompressionMiddleware`` negotiates brotli (when the optional ``brotli`` package is
+installed) or gzip from ``Accept-Encoding``. It compresses buffered bodies in one go and
+streaming bodies chunk by chunk, flushing after each chunk so NDJSON lines still arrive as
+they are written. Bodies that carry an ``ETag`` are cached in compressed form, so a repeat
+hit on an unchanged recipe page or notes list skips the compressor.
+
+A compressed response gets its own strong ``ETag``: the coding is appended inside the quotes
+(``"abc-gzip"``), since the bytes differ from the identity body. ``etag_matches`` strips the
+suffix again, so the conditional GET handlers answer ``304`` whichever copy a client holds.
+"""
+
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.http_cache import encoded_etag
+
+compression_counters = {
+    "compressed": 0,
+    "streamed": 0,
+    "cache_hits": 0,
+    "skipped": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+}
+
+_COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CompressionPolicy:
+    enabled: bool = True
+    # Buffered bodies smaller than this go out as they are; the headers would eat the saving.
+    min_size: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 5
+
+
+DEFAULT_POLICY = CompressionPolicy()
+
+# First matching path prefix wins.
+ROUTE_POLICIES: tuple[tuple[str, CompressionPolicy], ...] = (
+    # Precompressed at build time and served by app.core.assets.
+    ("/static/", CompressionPolicy(enabled=False)),
+    # Whole-library NDJSON: large and CPU-bound, so favour speed over ratio.
+    ("/recipes/export", CompressionPolicy(min_size=0, gzip_level=1, brotli_quality=1)),
+    # List bodies grow with the library; they are mostly repeated keys and compress well cheaply.
+    ("/recipes/search", CompressionPolicy(gzip_level=4, brotli_quality=4)),
+)
+
+
+def policy_for_path(path: str) -> CompressionPolicy:
+    for prefix, policy in ROUTE_POLICIES:
+        if path.startswith(prefix):
+            return policy
+    return DEFAULT_POLICY
+
+
+def brotli_module() -> Any | None:
+    try:
+        import brotli  # type: ignore[import-not-found]
+    except ImportError:
+        return None
+    return brotli
+
+
+def accepted_encodings(headers: Headers) -> set[str]:
+    """Content codings from ``Accept-Encoding``, leaving out any refused with ``q=0``."""
+    accepted = set()
+    for item in headers.get("accept-encoding", "").split(","):
+        token, _, params = item.partition(";")
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if token.strip():
+            accepted.add(token.strip().lower())
+    return accepted
+
+
+def choose_encoding(headers: Headers) -> str | None:
+    accepted = accepted_encodings(headers)
+    if "br" in accepted and brotli_module() is not None:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Encoder:
+    def __init__(self, encoding: str, policy: CompressionPolicy) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            brotli = brotli_module()
+            assert brotli is not None
+            self._brotli = brotli.Compressor(quality=policy.brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(policy.gzip_level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies, keyed by request target, ETag and coding, bounded in bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str, str], bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str, str]) -> bytes | None:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+        return body
+
+    def put(self, key: tuple[str, str, str], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self) -> dict[str, Any]:
+        saved = compression_counters["bytes_in"] - compression_counters["bytes_out"]
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "brotli": brotli_module() is not None,
+            "saved_bytes": saved,
+            **compression_counters,
+        }
+
+
+@lru_cache
+def get_compressed_body_cache() -> CompressedBodyCache:
+    return CompressedBodyCache(get_settings().compression_cache_bytes)
+
+
+class CompressionMiddleware:
+    """Compresses eligible responses; everything else passes through untouched."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not get_settings().compression:
+            await self.app(scope, receive, send)
+            return
+        policy = policy_for_path(scope["path"])
+        if not policy.enabled:
+            await self.app(scope, receive, send)
+            return
+        # Without an accepted coding the responder still marks eligible bodies with Vary.
+        encoding = choose_encoding(Headers(scope=scope))
+        await self.app(scope, receive, _CompressingResponder(scope, send, policy, encoding))
+
+
+class _CompressingResponder:
+    def __init__(
+        self, scope: Scope, send: Send, policy: CompressionPolicy, encoding: str | None
+    ) -> None:
+        self.send = send
+        self.policy = policy
+        self.encoding = encoding
+        self.target = scope["path"] + "?" + scope["query_string"].decode("latin-1")
+        self.if_none_match = Headers(scope=scope).get("if-none-match", "")
+        self.start: Message | None = None
+        self.encoder: _Encoder | None = None
+        # None until the first body message decides; then True to compress, False to pass.
+        self.active: bool | None = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            if message["status"] == 304:
+                self._echo_encoded_etag()
+            return
+        if message["type"] != "http.response.body" or self.active is False:
+            await self.send(message)
+            return
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        if self.active is None:
+            assert self.start is not None
+            headers = Headers(raw=self.start["headers"])
+            eligible = self._eligible(headers, body, more_body)
+            if not eligible or self.encoding is None:
+                self.active = False
+                compression_counters["skipped"] += 1
+                if eligible:
+                    MutableHeaders(scope=self.start).add_vary_header("Accept-Encoding")
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.active = True
+            if not more_body:
+                await self._send_whole(headers, self.encoding, body)
+                return
+            compression_counters["streamed"] += 1
+            self.encoder = _Encoder(self.encoding, self.policy)
+            self._set_headers(self.encoding, None)
+            await self.send(self.start)
+        assert self.encoder is not None
+        compression_counters["bytes_in"] += len(body)
+        data = self.encoder.chunk(body) if more_body else self.encoder.finish(body)
+        compression_counters["bytes_out"] += len(data)
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _eligible(self, headers: Headers, body: bytes, more_body: bool) -> bool:
+        assert self.start is not None
+        if self.start["status"] != 200 or "content-encoding" in headers:
+            return False
+        if "content-range" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if not content_type.startswith(_COMPRESSIBLE_TYPES):
+            return False
+        if more_body:
+            length = headers.get("content-length")
+            return length is None or int(length) >= self.policy.min_size
+        return len(body) >= self.policy.min_size
+
+    async def _send_whole(self, headers: Headers, encoding: str, body: bytes) -> None:
+        etag = headers.get("etag")
+        cache = get_compressed_body_cache()
+        key = (self.target, etag or "", encoding)
+        compressed = cache.get(key) if etag else None
+        if compressed is not None:
+            compression_counters["cache_hits"] += 1
+        else:
+            compressed = _Encoder(encoding, self.policy).finish(body)
+            compression_counters["compressed"] += 1
+            if etag:
+                cache.put(key, compressed)
+        compression_counters["bytes_in"] += len(body)
+        compression_counters["bytes_out"] += len(compressed)
+        self._set_headers(encoding, len(compressed))
+        assert self.start is not None
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    def _echo_encoded_etag(self) -> None:
+        # A 304 names the representation the client validated, so a client revalidating its
+        # compressed copy gets that copy's ETag back rather than the identity one.
+        assert self.start is not None
+        headers = MutableHeaders(scope=self.start)
+        etag = headers.get("etag")
+        if etag is None or self.encoding is None:
+            return
+        encoded = encoded_etag(etag, self.encoding)
+        if encoded in self.if_none_match:
+            headers["etag"] = encoded
+
+    def _set_headers(self, encoding: str, length: int | None) -> None:
+        assert self.start is not None
+        headers = MutableHeaders(scope=self.start)
+        headers["content-encoding"] = encoding
+        if "etag" in headers:
+            headers["etag"] = encoded_etag(headers["etag"], encoding)
+        headers.add_vary_header("Accept-Encoding")
+        if length is None:
+            if "content-length" in headers:
+                del headers["content-length"]
+        else:
+            headers["content-length"] = str(length)
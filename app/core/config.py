@@ -2,7 +2,7 @@ import os
 from functools import lru_cache
 from typing import Literal
 
-from pydantic import BaseModel, ConfigDict, ValidationError, model_validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, model_validator
 
 
 class Settings(BaseModel):
@@ -12,6 +12,26 @@ class Settings(BaseModel):
     openai_api_key: str | None = None
     openai_model: str = "gpt-4.1-mini"
     openai_fallback_to_stub: bool = True
+    admin_enabled: bool = False
+    admin_token: str | None = None
+    slow_query_threshold_ms: float = Field(default=100.0, ge=0)
+    recipe_cache_size: int = Field(default=256, ge=0)
+    recipe_cache_shared_name: str | None = None
+    recipe_compression: bool = True
+    draft_store: Literal["memory", "sqlite"] = "sqlite"
+    draft_store_size: int = Field(default=256, ge=1)
+    draft_ttl_seconds: float = Field(default=3600.0, gt=0)
+    group_commit: bool = True
+    group_commit_window_ms: float = Field(default=2.0, ge=0, le=100)
+    group_commit_max_batch: int = Field(default=64, ge=1)
+    template_bytecode_cache: bool = True
+    template_cache_dir: str | None = None
+    template_fragment_cache_size: int = Field(default=512, ge=0)
+    offline_prefetch_recipes: int = Field(default=20, ge=0, le=200)
+    compression: bool = True
+    compression_cache_bytes: int = Field(default=8 * 1024 * 1024, ge=0)
+    prerender: bool = True
+    prerender_dir: str | None = None
 
     @model_validator(mode="after")
     def _validate_openai(self) -> "Settings":
@@ -31,6 +51,26 @@ def get_settings() -> Settings:
         "openai_api_key": os.getenv("OPENAI_API_KEY"),
         "openai_model": os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
         "openai_fallback_to_stub": os.getenv("OPENAI_FALLBACK_TO_STUB", "1"),
+        "admin_enabled": os.getenv("ADMIN_ENABLED", "0"),
+        "admin_token": os.getenv("ADMIN_TOKEN") or None,
+        "slow_query_threshold_ms": os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"),
+        "recipe_cache_size": os.getenv("RECIPE_CACHE_SIZE", "256"),
+        "recipe_cache_shared_name": os.getenv("RECIPE_CACHE_SHARED_NAME") or None,
+        "recipe_compression": os.getenv("RECIPE_COMPRESSION", "1"),
+        "draft_store": os.getenv("DRAFT_STORE", "sqlite").strip().lower(),
+        "draft_store_size": os.getenv("DRAFT_STORE_SIZE", "256"),
+        "draft_ttl_seconds": os.getenv("DRAFT_TTL_SECONDS", "3600"),
+        "group_commit": os.getenv("GROUP_COMMIT", "1"),
+        "group_commit_window_ms": os.getenv("GROUP_COMMIT_WINDOW_MS", "2"),
+        "group_commit_max_batch": os.getenv("GROUP_COMMIT_MAX_BATCH", "64"),
+        "template_bytecode_cache": os.getenv("TEMPLATE_BYTECODE_CACHE", "1"),
+        "template_cache_dir": os.getenv("TEMPLATE_CACHE_DIR") or None,
+        "template_fragment_cache_size": os.getenv("TEMPLATE_FRAGMENT_CACHE_SIZE", "512"),
+        "offline_prefetch_recipes": os.getenv("OFFLINE_PREFETCH_RECIPES", "20"),
+        "compression": os.getenv("COMPRESSION", "1"),
+        "compression_cache_bytes": os.getenv("COMPRESSION_CACHE_BYTES", str(8 * 1024 * 1024)),
+        "prerender": os.getenv("PRERENDER", "1"),
+        "prerender_dir": os.getenv("PRERENDER_DIR") or None,
     }
     try:
         return Settings.model_validate(raw)
@@ -0,0 +1,68 @@
+import hashlib
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# Saved recipes never change, so their JSON and the cook page may be reused for a few minutes
+# without asking; pages that include notes or other recipes always revalidate.
+RECIPE_JSON_CACHE_CONTROL = "private, max-age=300"
+COOK_PAGE_CACHE_CONTROL = "private, max-age=300"
+RECIPE_PAGE_CACHE_CONTROL = "private, no-cache"
+NOTES_CACHE_CONTROL = "private, no-cache"
+SERVICE_WORKER_CACHE_CONTROL = "no-cache"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def fingerprint_directory(directory: str) -> str:
+    digest = hashlib.sha256()
+    root = Path(directory)
+    for path in sorted(root.rglob("*")):
+        if path.is_file():
+            digest.update(str(path.relative_to(root)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def make_etag(*parts: object) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+# Content codings CompressionMiddleware may apply; each gets its own ETag suffix.
+ETAG_CODINGS = ("gzip", "br")
+
+
+def encoded_etag(etag: str, coding: str) -> str:
+    """The ETag of ``etag``'s representation compressed with ``coding``."""
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{coding}"'
+
+
+def decoded_etag(etag: str) -> str:
+    """``etag`` without a coding suffix added by ``encoded_etag``."""
+    for coding in ETAG_CODINGS:
+        suffix = f'-{coding}"'
+        if etag.endswith(suffix):
+            return etag[: -len(suffix)] + '"'
+    return etag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses weak comparison, so a W/ prefix added by a proxy still matches, and
+    # so does the ETag of any compressed copy of the same content.
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or decoded_etag(candidate.removeprefix("W/")) == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
@@ -0,0 +1,84 @@
+from collections.abc import AsyncIterator, Callable, Iterable, Mapping
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic_core import to_json
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response that serializes pydantic models and plain data straight to bytes.
+
+    Returning one of these from a route skips FastAPI's response_model validation and
+    serialization, so only use it for content the app built or validated itself. Subclass and
+    override ``dumps`` to plug in another encoder.
+    """
+
+    @staticmethod
+    def dumps(content: Any) -> bytes:
+        return to_json(content)
+
+    def render(self, content: Any) -> bytes:
+        return self.dumps(content)
+
+
+class StreamingJSONResponse(StreamingResponse):
+    """Streams items from an iterator as one JSON array, or as NDJSON lines.
+
+    Items are encoded a chunk of ``chunk_items`` at a time, so memory stays at one chunk
+    however many items there are. ``dumps`` encodes a list of items as a JSON array (pass a
+    TypeAdapter's dump_json for types to_json only handles slowly). The array form is
+    byte-identical to FastJSONResponse over the same list, so ETags computed for one hold for
+    the other.
+
+    The iterator is advanced on the event loop thread, which lets it hold a SQLite cursor.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[Any],
+        ndjson: bool = False,
+        headers: Mapping[str, str] | None = None,
+        chunk_items: int = 500,
+        dumps: Callable[[list[Any]], bytes] = to_json,
+    ) -> None:
+        super().__init__(
+            self._encode(items, ndjson, chunk_items, dumps),
+            media_type=NDJSON_MEDIA_TYPE if ndjson else "application/json",
+            headers=headers,
+        )
+
+    @staticmethod
+    async def _encode(
+        items: Iterable[Any],
+        ndjson: bool,
+        chunk_items: int,
+        dumps: Callable[[list[Any]], bytes],
+    ) -> AsyncIterator[bytes]:
+        # Chunks are encoded as arrays with their brackets dropped. NDJSON encodes each item
+        # on its own line; an array joins the chunks with commas inside one pair of brackets.
+        def encode(chunk: list[Any]) -> bytes:
+            if ndjson:
+                return b"".join(dumps([item])[1:-1] + b"\n" for item in chunk)
+            return dumps(chunk)[1:-1]
+
+        if not ndjson:
+            yield b"["
+        lead = b""
+        chunk: list[Any] = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_items:
+                yield lead + encode(chunk)
+                lead = b"" if ndjson else b","
+                chunk.clear()
+        if chunk:
+            yield lead + encode(chunk)
+        if not ndjson:
+            yield b"]"
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
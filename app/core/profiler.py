@@ -0,0 +1,136 @@
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.admin_auth import admin_access
+
+PROFILE_REQUEST_HEADER = b"x-profile"
+
+profiler_counters = {
+    "worker_sessions": 0,
+    "request_sessions": 0,
+}
+
+# Whole-worker sampling sessions are exclusive; overlapping samplers would double-count.
+worker_profile_lock = threading.Lock()
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Periodically samples Python stacks and aggregates them in collapsed-stack form.
+
+    The output is one ``frame;frame;frame count`` line per distinct stack (root first),
+    which is what flamegraph.pl, speedscope and inferno consume.
+    """
+
+    _MAX_DEPTH = 128
+
+    def __init__(self, interval_seconds: float = 0.005, thread_id: int | None = None) -> None:
+        self._interval_seconds = interval_seconds
+        self._thread_id = thread_id
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.sample_count = 0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def _run(self) -> None:
+        sampler_ident = threading.get_ident()
+        while not self._stop.wait(self._interval_seconds):
+            self._sample(sampler_ident)
+
+    def _sample(self, sampler_ident: int) -> None:
+        frames = sys._current_frames()
+        if self._thread_id is not None:
+            frame = frames.get(self._thread_id)
+            if frame is not None:
+                self._record(frame, None)
+            return
+
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in frames.items():
+            if ident != sampler_ident:
+                self._record(frame, thread_names.get(ident, f"thread-{ident}"))
+
+    def _record(self, frame: FrameType | None, root: str | None) -> None:
+        labels: list[str] = []
+        while frame is not None and len(labels) < self._MAX_DEPTH:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        if root is not None:
+            labels.append(root)
+        labels.reverse()
+        self._stacks[";".join(labels)] += 1
+        self.sample_count += 1
+
+
+class RequestProfilerMiddleware:
+    """Profiles a single request sent with ``X-Profile`` by an admin (see ``admin_access``).
+
+    The profiled request's own response is discarded and replaced by the collapsed-stack
+    output; its status code is reported in ``X-Profiled-Status``.
+    """
+
+    _SAMPLE_INTERVAL_SECONDS = 0.001
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not any(
+            name == PROFILE_REQUEST_HEADER for name, _ in scope["headers"]
+        ):
+            await self.app(scope, receive, send)
+            return
+        if admin_access(scope) != "allowed":
+            await self.app(scope, receive, send)
+            return
+
+        profiler_counters["request_sessions"] += 1
+        sampler = StackSampler(self._SAMPLE_INTERVAL_SECONDS, thread_id=threading.get_ident())
+        profiled_status = 500
+
+        async def capture(message: Message) -> None:
+            nonlocal profiled_status
+            if message["type"] == "http.response.start":
+                profiled_status = message["status"]
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            sampler.stop()
+
+        body = sampler.collapsed().encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-profiled-status", str(profiled_status).encode()),
+                    (b"x-profile-samples", str(sampler.sample_count).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, cast
+
+import jinja2
+from fastapi.templating import Jinja2Templates
+from jinja2 import nodes
+from jinja2.ext import Extension
+from jinja2.parser import Parser
+from markupsafe import Markup
+
+from app.core.assets import asset_url
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+fragment_cache_counters = {
+    "hits": 0,
+    "misses": 0,
+    "evictions": 0,
+}
+
+
+class FragmentCache:
+    """Bounded LRU of rendered template fragments."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[Any, ...], Markup] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple[Any, ...]) -> Markup | None:
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+        return fragment
+
+    def put(self, key: tuple[Any, ...], fragment: Markup) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                fragment_cache_counters["evictions"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        lookups = fragment_cache_counters["hits"] + fragment_cache_counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": round(fragment_cache_counters["hits"] / lookups, 4) if lookups else None,
+            **fragment_cache_counters,
+        }
+
+
+class FragmentCacheExtension(Extension):
+    """``{% cache "name", key, ... %}...{% endcache %}`` renders its body once per key.
+
+    The body must depend on nothing but the key parts: recipe blocks are keyed by the recipe's
+    content hash, so a changed recipe renders under a new key and the old entry ages out.
+    """
+
+    tags = {"cache"}
+
+    def __init__(self, environment: jinja2.Environment) -> None:
+        super().__init__(environment)
+        self.cache = FragmentCache(0)
+
+    def parse(self, parser: Parser) -> nodes.Node:
+        lineno = next(parser.stream).lineno
+        key = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            key.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        call = self.call_method("_render", [nodes.List(key)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, key: list[Any], caller: Callable[[], str]) -> Markup:
+        cache_key = tuple(key)
+        fragment = self.cache.get(cache_key)
+        if fragment is not None:
+            fragment_cache_counters["hits"] += 1
+            return fragment
+        fragment_cache_counters["misses"] += 1
+        fragment = Markup(caller())
+        self.cache.put(cache_key, fragment)
+        return fragment
+
+
+def build_templates(directory: str, settings: Settings) -> Jinja2Templates:
+    bytecode_cache = None
+    if settings.template_bytecode_cache:
+        # Compiled templates persist across restarts and are shared by workers; Jinja keys
+        # entries by template source checksum, so edited templates are recompiled.
+        bytecode_cache = jinja2.FileSystemBytecodeCache(settings.template_cache_dir)
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(directory),
+        autoescape=jinja2.select_autoescape(),
+        bytecode_cache=bytecode_cache,
+        extensions=[FragmentCacheExtension],
+    )
+    env.globals["asset_url"] = asset_url
+    templates = Jinja2Templates(env=env)
+    get_fragment_cache(templates).max_entries = settings.template_fragment_cache_size
+    return templates
+
+
+def get_fragment_cache(templates: Jinja2Templates) -> FragmentCache:
+    extension = templates.env.extensions[FragmentCacheExtension.identifier]
+    return cast(FragmentCacheExtension, extension).cache
+
+
+def precompile_templates(templates: Jinja2Templates) -> float:
+    """Load every template now rather than on its first request; returns elapsed ms."""
+    start = time.perf_counter()
+    names = templates.env.list_templates()
+    for name in names:
+        templates.env.get_template(name)
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+    logger.info("templates_precompiled", extra={"templates": len(names), "elapsed_ms": elapsed_ms})
+    return elapsed_ms
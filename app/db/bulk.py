@@ -0,0 +1,183 @@
+import sqlite3
+from datetime import datetime
+from typing import Literal, NamedTuple
+
+from app.core.http_cache import content_hash
+from app.db.codec import encode_recipe_json, latest_dictionary, train_first_dictionary
+from app.db.ingredients import index_ingredients_many
+from app.db.recipe_storage import pack_recipe_json
+from app.db.search import index_recipes, unindex_recipes
+from app.db.sqlite import to_epoch_us
+from app.schemas.recipe import RECIPE_SCHEMA_VERSION, Recipe
+
+ConflictMode = Literal["skip", "replace", "fail"]
+
+
+class BulkNote(NamedTuple):
+    note_id: str
+    note_text: str
+    created_at: datetime
+
+
+class BulkRecipe(NamedTuple):
+    recipe: Recipe
+    created_at: datetime
+    notes: list[BulkNote]
+
+
+class RecipeConflictError(Exception):
+    def __init__(self, recipe_ids: list[str]) -> None:
+        super().__init__(f"{len(recipe_ids)} recipe id(s) already exist")
+        self.recipe_ids = recipe_ids
+
+
+class BulkResult(NamedTuple):
+    statuses: list[str]
+    # doc_ids the replaced recipes had before; their rows now carry new ones.
+    replaced_doc_ids: list[int]
+
+
+def insert_recipes(
+    conn: sqlite3.Connection,
+    db_path: str,
+    items: list[BulkRecipe],
+    compress: bool,
+    on_conflict: ConflictMode = "skip",
+) -> BulkResult:
+    """Insert many recipes with one statement per table; returns a status per item.
+
+    Statuses are "created", "replaced" or "skipped". An id that already exists is skipped,
+    replaced, or (with "fail") raises RecipeConflictError before anything is written; an id
+    repeated later in items is always skipped. Call inside a write transaction: doc_ids are
+    assigned from MAX(doc_id) read here.
+
+    A replaced recipe keeps its created_at and notes but gets a new doc_id, so everything
+    versioned by doc_id (similarity catch-up, page ETags) sees it as new.
+    """
+    placeholders = ", ".join("?" for _ in items)
+    existing = {
+        str(row[0]): int(row[1])
+        for row in conn.execute(
+            f"SELECT id, doc_id FROM recipes WHERE id IN ({placeholders})",
+            [item.recipe.id for item in items],
+        )
+    }
+    if existing and on_conflict == "fail":
+        raise RecipeConflictError([item.recipe.id for item in items if item.recipe.id in existing])
+
+    statuses = []
+    written: list[BulkRecipe] = []
+    seen: set[str] = set()
+    for item in items:
+        recipe_id = item.recipe.id
+        if recipe_id in seen or (recipe_id in existing and on_conflict == "skip"):
+            statuses.append("skipped")
+            continue
+        seen.add(recipe_id)
+        statuses.append("replaced" if recipe_id in existing else "created")
+        written.append(item)
+    replaced_ids = [item.recipe.id for item in written if item.recipe.id in existing]
+    replaced_doc_ids = [existing[recipe_id] for recipe_id in replaced_ids]
+    if not written:
+        return BulkResult(statuses, replaced_doc_ids)
+
+    dictionary = latest_dictionary(conn, db_path) if compress else None
+    next_doc_id = int(conn.execute("SELECT COALESCE(MAX(doc_id), 0) FROM recipes").fetchone()[0])
+    recipe_rows = []
+    replace_rows = []
+    fts_rows = []
+    note_rows = []
+    for doc_id, item in enumerate(written, start=next_doc_id + 1):
+        recipe = item.recipe
+        stored_json = encode_recipe_json(pack_recipe_json(recipe), dictionary)
+        recipe_hash = content_hash(recipe.model_dump_json().encode())
+        if recipe.id in existing:
+            replace_rows.append(
+                (recipe.title, stored_json, RECIPE_SCHEMA_VERSION, recipe_hash, doc_id, recipe.id)
+            )
+        else:
+            recipe_rows.append(
+                (
+                    recipe.id,
+                    recipe.title,
+                    stored_json,
+                    item.created_at.isoformat(),
+                    RECIPE_SCHEMA_VERSION,
+                    recipe_hash,
+                    doc_id,
+                )
+            )
+        fts_rows.append((doc_id, recipe, "\n".join(note.note_text for note in item.notes)))
+        note_rows.extend(
+            (
+                note.note_id,
+                recipe.id,
+                note.note_text,
+                note.created_at.isoformat(),
+                to_epoch_us(note.created_at),
+            )
+            for note in item.notes
+        )
+
+    if replaced_ids:
+        _clear_replaced(conn, replaced_ids, replaced_doc_ids)
+        conn.executemany(
+            """
+            UPDATE recipes
+            SET title = ?, recipe_json = ?, schema_version = ?, content_hash = ?, doc_id = ?
+            WHERE id = ?
+            """,
+            replace_rows,
+        )
+    conn.executemany(
+        """
+        INSERT INTO recipes (
+            id, title, recipe_json, created_at, schema_version, content_hash, doc_id
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        recipe_rows,
+    )
+    # Re-importing an export into a library that already has its notes must not fail.
+    conn.executemany(
+        """
+        INSERT OR IGNORE INTO notes (id, recipe_id, note_text, created_at, created_at_us)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        note_rows,
+    )
+    if replaced_ids:
+        notes_text = _notes_text(conn, replaced_ids)
+        fts_rows = [
+            (doc_id, recipe, notes_text.get(recipe.id, "") if recipe.id in existing else notes)
+            for doc_id, recipe, notes in fts_rows
+        ]
+    index_recipes(conn, fts_rows)
+    index_ingredients_many(conn, [item.recipe for item in written])
+    if compress and dictionary is None:
+        train_first_dictionary(conn, db_path)
+    return BulkResult(statuses, replaced_doc_ids)
+
+
+def _clear_replaced(conn: sqlite3.Connection, recipe_ids: list[str], doc_ids: list[int]) -> None:
+    # A recipe with fewer ingredients than before must not keep the old trailing positions.
+    conn.executemany(
+        "DELETE FROM recipe_ingredients WHERE recipe_id = ?", [(rid,) for rid in recipe_ids]
+    )
+    unindex_recipes(conn, doc_ids)
+
+
+def _notes_text(conn: sqlite3.Connection, recipe_ids: list[str]) -> dict[str, str]:
+    placeholders = ", ".join("?" for _ in recipe_ids)
+    notes: dict[str, list[str]] = {}
+    for row in conn.execute(
+        f"""
+        SELECT recipe_id, note_text
+        FROM notes
+        WHERE recipe_id IN ({placeholders})
+        ORDER BY created_at_us
+        """,
+        recipe_ids,
+    ):
+        notes.setdefault(str(row[0]), []).append(str(row[1]))
+    return {recipe_id: "\n".join(texts) for recipe_id, texts in notes.items()}
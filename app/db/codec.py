@@ -0,0 +1,257 @@
+import random
+import re
+import sqlite3
+import struct
+import threading
+import zlib
+from collections import Counter
+from datetime import UTC, datetime
+from typing import NamedTuple
+
+# Stored recipe_json is either legacy/plain JSON text or a BLOB that starts with this header:
+# one format byte, then the id of the preset dictionary the payload was compressed with.
+FORMAT_ZLIB_DICTIONARY = 1
+_HEADER = struct.Struct(">BH")
+# zlib can only reference the last 32 KiB of a preset dictionary.
+_MAX_DICTIONARY_BYTES = 32 * 1024
+_TRAINING_SAMPLE = 500
+MIN_TRAINING_ROWS = 20
+# A save that trains the first dictionary also compresses the rows stored before it, unless
+# the library is already this large (compression was switched on late); the startup
+# migration converts those in the background.
+_INLINE_MIGRATION_ROWS = 1000
+_MIN_DOCUMENT_SHARE = 0.05
+_MAX_NGRAM = 3
+_JSON_SEGMENT = re.compile(r'"(?:[^"\\]|\\.)*"\s*:?|[^"]+')
+
+
+class CodecError(ValueError):
+    pass
+
+
+class Dictionary(NamedTuple):
+    id: int
+    data: bytes
+
+
+_dictionaries: dict[tuple[str, int], bytes] = {}
+_latest: dict[str, Dictionary] = {}
+_cache_lock = threading.Lock()
+
+
+def create_codec_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS recipe_codec_dictionaries (
+            id INTEGER PRIMARY KEY,
+            created_at TEXT NOT NULL,
+            sample_count INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            migrated_through INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+
+def _segments(text: str) -> list[str]:
+    return _JSON_SEGMENT.findall(text)
+
+
+def train_dictionary(samples: list[str]) -> bytes:
+    # Count in how many samples each run of 1-3 JSON segments (keys, string values, the
+    # punctuation and numbers between them) appears; long, widely shared runs are worth most.
+    document_counts: Counter[str] = Counter()
+    for sample in samples:
+        segments = _segments(sample)
+        seen = {
+            "".join(segments[start : start + size])
+            for size in range(1, _MAX_NGRAM + 1)
+            for start in range(len(segments) - size + 1)
+        }
+        document_counts.update(seen)
+
+    min_documents = max(2, int(len(samples) * _MIN_DOCUMENT_SHARE))
+    ranked = sorted(
+        (
+            (count * len(fragment), fragment)
+            for fragment, count in document_counts.items()
+            if count >= min_documents and len(fragment) > 3
+        ),
+        reverse=True,
+    )
+
+    chosen: list[bytes] = []
+    size = 0
+    for _, fragment in ranked:
+        encoded = fragment.encode()
+        if size + len(encoded) > _MAX_DICTIONARY_BYTES:
+            continue
+        chosen.append(encoded)
+        size += len(encoded)
+    # zlib finds matches near the end of the dictionary most cheaply, so the best go last.
+    return b"".join(reversed(chosen))
+
+
+def store_dictionary(conn: sqlite3.Connection, db_path: str, data: bytes, samples: int) -> int:
+    cursor = conn.execute(
+        """
+        INSERT INTO recipe_codec_dictionaries (created_at, sample_count, data)
+        VALUES (?, ?, ?)
+        """,
+        (datetime.now(UTC).isoformat(), samples, data),
+    )
+    dictionary_id = int(cursor.lastrowid or 0)
+    with _cache_lock:
+        _dictionaries[(db_path, dictionary_id)] = data
+        _latest[db_path] = Dictionary(dictionary_id, data)
+    return dictionary_id
+
+
+def train_from_database(conn: sqlite3.Connection, db_path: str) -> int | None:
+    # Sample by doc_id so training never has to read every recipe body.
+    newest = int(conn.execute("SELECT COALESCE(MAX(doc_id), 0) FROM recipes").fetchone()[0])
+    doc_ids = random.sample(range(1, newest + 1), min(newest, _TRAINING_SAMPLE))
+    placeholders = ", ".join("?" for _ in doc_ids)
+    rows = conn.execute(
+        f"SELECT recipe_json FROM recipes WHERE doc_id IN ({placeholders})", doc_ids
+    ).fetchall()
+    if len(rows) < MIN_TRAINING_ROWS:
+        return None
+    samples = [decode_recipe_json(conn, db_path, row["recipe_json"]).decode() for row in rows]
+    return store_dictionary(conn, db_path, train_dictionary(samples), len(samples))
+
+
+def train_first_dictionary(conn: sqlite3.Connection, db_path: str) -> Dictionary | None:
+    """Train the first dictionary once enough recipes exist; call inside the save's write.
+
+    Saves that had no dictionary to encode with call this after inserting, so a fresh
+    install starts compressing as soon as it crosses MIN_TRAINING_ROWS instead of at the
+    next restart. The write lock serializes it, so only one save ever trains.
+    """
+    newest = int(conn.execute("SELECT COALESCE(MAX(doc_id), 0) FROM recipes").fetchone()[0])
+    if newest < MIN_TRAINING_ROWS or latest_dictionary(conn, db_path) is not None:
+        return None
+    dictionary_id = train_from_database(conn, db_path)
+    if dictionary_id is None:
+        return None
+    # Dropped from the cache until the save commits: if the write is rolled back, later saves
+    # must not encode with a dictionary that was never stored.
+    forget_dictionaries(db_path)
+    data = conn.execute(
+        "SELECT data FROM recipe_codec_dictionaries WHERE id = ?", (dictionary_id,)
+    ).fetchone()["data"]
+    dictionary = Dictionary(dictionary_id, bytes(data))
+    if newest > _INLINE_MIGRATION_ROWS:
+        return dictionary
+    rows = conn.execute(
+        "SELECT id, recipe_json FROM recipes WHERE typeof(recipe_json) = 'text'"
+    ).fetchall()
+    conn.executemany(
+        "UPDATE recipes SET recipe_json = ? WHERE id = ?",
+        [(encode_recipe_json(str(row["recipe_json"]), dictionary), row["id"]) for row in rows],
+    )
+    conn.execute(
+        "UPDATE recipe_codec_dictionaries SET migrated_through = ? WHERE id = ?",
+        (newest, dictionary.id),
+    )
+    return dictionary
+
+
+def latest_dictionary(conn: sqlite3.Connection, db_path: str) -> Dictionary | None:
+    with _cache_lock:
+        cached = _latest.get(db_path)
+    if cached is not None:
+        return cached
+    # "No dictionary yet" is not cached, so a dictionary trained by another worker is
+    # picked up by the next save.
+    row = conn.execute(
+        "SELECT id, data FROM recipe_codec_dictionaries ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+    if row is None:
+        return None
+    dictionary = Dictionary(int(row["id"]), bytes(row["data"]))
+    with _cache_lock:
+        _latest[db_path] = dictionary
+        _dictionaries[(db_path, dictionary.id)] = dictionary.data
+    return dictionary
+
+
+def _dictionary_data(conn: sqlite3.Connection, db_path: str, dictionary_id: int) -> bytes:
+    key = (db_path, dictionary_id)
+    with _cache_lock:
+        data = _dictionaries.get(key)
+    if data is not None:
+        return data
+    row = conn.execute(
+        "SELECT data FROM recipe_codec_dictionaries WHERE id = ?", (dictionary_id,)
+    ).fetchone()
+    if row is None:
+        raise CodecError(f"Unknown recipe codec dictionary {dictionary_id}")
+    data = bytes(row["data"])
+    with _cache_lock:
+        _dictionaries[key] = data
+    return data
+
+
+def forget_dictionaries(db_path: str) -> None:
+    with _cache_lock:
+        _latest.pop(db_path, None)
+        for key in [key for key in _dictionaries if key[0] == db_path]:
+            del _dictionaries[key]
+
+
+def encode_recipe_json(recipe_json: str, dictionary: Dictionary | None) -> str | bytes:
+    if dictionary is None:
+        return recipe_json
+    # zlib (not raw deflate) framing records the dictionary's Adler-32 and a checksum of the
+    # payload, so a row can never be silently decoded with the wrong dictionary.
+    compressor = zlib.compressobj(level=9, zdict=dictionary.data)
+    payload = compressor.compress(recipe_json.encode()) + compressor.flush()
+    return _HEADER.pack(FORMAT_ZLIB_DICTIONARY, dictionary.id) + payload
+
+
+def encode_for_storage(conn: sqlite3.Connection, db_path: str, recipe_json: str) -> str | bytes:
+    return encode_recipe_json(recipe_json, latest_dictionary(conn, db_path))
+
+
+def reencode_recipe_json(
+    conn: sqlite3.Connection, db_path: str, value: str | bytes, recipe_json: str
+) -> str | bytes:
+    # Keeps the row's current format, so rewriting a row never implies migrating it.
+    dictionary_id = stored_dictionary_id(value)
+    if dictionary_id is None:
+        return recipe_json
+    data = _dictionary_data(conn, db_path, dictionary_id)
+    return encode_recipe_json(recipe_json, Dictionary(dictionary_id, data))
+
+
+def stored_dictionary_id(value: str | bytes) -> int | None:
+    if isinstance(value, str):
+        return None
+    return int(_HEADER.unpack_from(value)[1])
+
+
+def decode_recipe_json(conn: sqlite3.Connection, db_path: str, value: str | bytes) -> bytes:
+    if isinstance(value, str):
+        return value.encode()
+    if len(value) < _HEADER.size:
+        raise CodecError("Truncated recipe payload")
+    format_version, dictionary_id = _HEADER.unpack_from(value)
+    if format_version != FORMAT_ZLIB_DICTIONARY:
+        raise CodecError(f"Unsupported recipe storage format {format_version}")
+
+    payload = memoryview(value)[_HEADER.size :]
+    try:
+        return _decompress(payload, _dictionary_data(conn, db_path, dictionary_id))
+    except zlib.error:
+        # A cached dictionary is stale if the database file was replaced; reload once.
+        forget_dictionaries(db_path)
+    try:
+        return _decompress(payload, _dictionary_data(conn, db_path, dictionary_id))
+    except zlib.error as exc:
+        raise CodecError("Corrupt recipe payload") from exc
+
+
+def _decompress(payload: memoryview, dictionary: bytes) -> bytes:
+    decompressor = zlib.decompressobj(zdict=dictionary)
+    return decompressor.decompress(payload) + decompressor.flush()
@@ -0,0 +1,192 @@
+import json
+import re
+import sqlite3
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+_UNIT_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+_NUMBER = re.compile(r"(?:(\d+)\s+)?(\d+(?:\.\d+)?)(?:\s*/\s*(\d+))?")
+_RANGE = re.compile(r"(.+?)\s*(?:-|–|to)\s*(.+)")
+_VULGAR_FRACTIONS = {
+    "½": " 1/2",
+    "⅓": " 1/3",
+    "⅔": " 2/3",
+    "¼": " 1/4",
+    "¾": " 3/4",
+    "⅛": " 1/8",
+}
+# Separates unparsed amounts inside group_concat(); never appears in recipe text.
+_AMOUNT_SEPARATOR = "\x1f"
+
+
+class UnitConversion(NamedTuple):
+    unit: str
+    base_unit: str
+    factor: float
+
+
+UNIT_CONVERSIONS: dict[str, UnitConversion] = {
+    alias: UnitConversion(unit, base_unit, factor)
+    for unit, base_unit, factor, aliases in (
+        ("ml", "ml", 1.0, ("ml", "milliliter", "millilitre")),
+        ("l", "ml", 1000.0, ("l", "liter", "litre")),
+        ("tsp", "ml", 4.92892, ("tsp", "teaspoon")),
+        ("tbsp", "ml", 14.7868, ("tbsp", "tablespoon", "tbs", "tbl")),
+        ("fl oz", "ml", 29.5735, ("fl oz", "fluid ounce")),
+        ("cup", "ml", 236.588, ("cup",)),
+        ("pint", "ml", 473.176, ("pint", "pt")),
+        ("quart", "ml", 946.353, ("quart", "qt")),
+        ("g", "g", 1.0, ("g", "gram", "gr")),
+        ("kg", "g", 1000.0, ("kg", "kilogram", "kilo")),
+        ("mg", "g", 0.001, ("mg", "milligram")),
+        ("oz", "g", 28.3495, ("oz", "ounce")),
+        ("lb", "g", 453.592, ("lb", "lbs", "pound")),
+        ("item", "item", 1.0, ("", "item", "whole", "piece", "each", "ea")),
+    )
+    for alias in aliases
+}
+# Totals at or above the threshold are shown in the larger unit instead of the base unit.
+_DISPLAY_UPGRADES = {"ml": ("l", 1000.0), "g": ("kg", 1000.0)}
+
+
+def _normalize_unit(unit: str) -> str:
+    words = _SPACES.sub(" ", _UNIT_NON_WORD.sub(" ", unit.lower())).strip()
+    if len(words) > 3 and words.endswith("s") and not words.endswith("ss"):
+        words = words[:-1]
+    return words
+
+
+@lru_cache(maxsize=1024)
+def resolve_unit(unit: str) -> UnitConversion:
+    normalized = _normalize_unit(unit)
+    conversion = UNIT_CONVERSIONS.get(normalized)
+    if conversion is None:
+        # Units without a known conversion (can, clove, pinch) only merge with themselves.
+        return UnitConversion(normalized, normalized, 1.0)
+    return conversion
+
+
+def _parse_number(text: str) -> float | None:
+    match = _NUMBER.fullmatch(text.strip())
+    if match is None:
+        return None
+    whole, number, denominator = match.groups()
+    value = float(number)
+    if denominator is not None:
+        if int(denominator) == 0:
+            return None
+        value /= int(denominator)
+    if whole is not None:
+        if denominator is None:
+            return None
+        value += int(whole)
+    return value
+
+
+def parse_quantity(amount: str) -> float | None:
+    text = amount.strip().lower()
+    for fraction, replacement in _VULGAR_FRACTIONS.items():
+        text = text.replace(fraction, replacement)
+    value = _parse_number(text)
+    if value is not None:
+        return value
+    # Ranges ("2-3", "1 to 2") are bought at the upper bound.
+    match = _RANGE.fullmatch(text)
+    if match is None:
+        return None
+    low, high = _parse_number(match.group(1)), _parse_number(match.group(2))
+    if low is None or high is None:
+        return None
+    return max(low, high)
+
+
+@lru_cache(maxsize=4096)
+def ingredient_quantity(amount: str, unit: str) -> tuple[float | None, str, str]:
+    conversion = resolve_unit(unit)
+    quantity = parse_quantity(amount)
+    base_quantity = quantity * conversion.factor if quantity is not None else None
+    return base_quantity, conversion.base_unit, conversion.unit
+
+
+def _display_quantity(
+    base_total: float | None, base_unit: str, shared_unit: str | None
+) -> tuple[float | None, str]:
+    if base_total is None:
+        return None, base_unit
+    if shared_unit is not None:
+        return round(base_total / resolve_unit(shared_unit).factor, 2), shared_unit
+    upgrade = _DISPLAY_UPGRADES.get(base_unit)
+    if upgrade is not None and base_total >= upgrade[1]:
+        return round(base_total / upgrade[1], 2), upgrade[0]
+    return round(base_total, 2), base_unit
+
+
+# Selections arrive as one JSON parameter, so a request for hundreds of recipes is still a
+# single statement rather than hundreds of bound variables.
+_SELECTION_CTE = """
+    WITH selection (recipe_id, multiplier) AS (
+        SELECT json_extract(value, '$[0]'), SUM(json_extract(value, '$[1]'))
+        FROM json_each(?)
+        GROUP BY 1
+    )
+"""
+
+
+def missing_recipe_ids(conn: sqlite3.Connection, selections: list[tuple[str, float]]) -> list[str]:
+    rows = conn.execute(
+        f"""
+        {_SELECTION_CTE}
+        SELECT selection.recipe_id
+        FROM selection
+        LEFT JOIN recipes ON recipes.id = selection.recipe_id
+        WHERE recipes.id IS NULL
+        ORDER BY selection.recipe_id
+        """,
+        (json.dumps(selections),),
+    ).fetchall()
+    return [str(row[0]) for row in rows]
+
+
+def build_grocery_list(
+    conn: sqlite3.Connection, selections: list[tuple[str, float]]
+) -> list[dict[str, Any]]:
+    rows = conn.execute(
+        f"""
+        {_SELECTION_CTE}
+        SELECT
+            ri.name,
+            ri.base_unit,
+            SUM(ri.base_quantity * selection.multiplier) AS base_total,
+            CASE
+                WHEN COUNT(DISTINCT CASE WHEN ri.base_quantity IS NOT NULL THEN ri.unit END) = 1
+                THEN MIN(CASE WHEN ri.base_quantity IS NOT NULL THEN ri.unit END)
+            END AS shared_unit,
+            MIN(ri.optional) AS optional,
+            COUNT(DISTINCT ri.recipe_id) AS recipe_count,
+            group_concat(
+                CASE WHEN ri.base_quantity IS NULL THEN ri.amount_text END, ?
+            ) AS unparsed
+        FROM selection
+        JOIN recipe_ingredients ri ON ri.recipe_id = selection.recipe_id
+        GROUP BY ri.name, ri.base_unit
+        ORDER BY ri.name, ri.base_unit
+        """,
+        (json.dumps(selections), _AMOUNT_SEPARATOR),
+    ).fetchall()
+
+    items = []
+    for row in rows:
+        quantity, unit = _display_quantity(row["base_total"], row["base_unit"], row["shared_unit"])
+        unparsed = row["unparsed"].split(_AMOUNT_SEPARATOR) if row["unparsed"] else []
+        items.append(
+            {
+                "name": str(row["name"]),
+                "quantity": quantity,
+                "unit": unit,
+                "optional": bool(row["optional"]),
+                "recipe_count": int(row["recipe_count"]),
+                "other_amounts": list(dict.fromkeys(unparsed)),
+            }
+        )
+    return items
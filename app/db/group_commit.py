@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import math
+import queue
+import sqlite3
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+from app.db.sqlite import get_conn
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteOperation = Callable[[sqlite3.Connection], T]
+
+_STOP = object()
+_RECENT_BATCHES = 1024
+
+group_commit_counters: dict[str, float] = {
+    "batches": 0,
+    "operations": 0,
+    "failed_operations": 0,
+    "failed_commits": 0,
+    "largest_batch": 0,
+    "commit_ms_total": 0.0,
+    "commit_ms_max": 0.0,
+}
+# (batch size, commit ms) of recent batches, for percentiles.
+recent_batches: deque[tuple[int, float]] = deque(maxlen=_RECENT_BATCHES)
+_stats_lock = threading.Lock()
+
+
+class GroupCommitWriter:
+    """One writer thread that commits queued write operations together.
+
+    The thread waits up to window_ms after the first queued operation (or until max_batch
+    are queued) and runs the whole batch in one transaction, each operation inside its own
+    SAVEPOINT so a failing one is rolled back alone. Futures resolve only after COMMIT, so
+    every caller's acknowledgment is durable. If the thread itself dies, every waiting
+    future is failed and later writes go straight to their own connections.
+    """
+
+    def __init__(self, window_ms: float, max_batch: int) -> None:
+        self.window_seconds = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._closed = False
+        self._closed_lock = threading.Lock()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        # Operations queued before the stop marker are still committed.
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def submit(self, operation: WriteOperation[T]) -> "Future[T]":
+        future: Future[T] = Future()
+        with self._closed_lock:
+            if self._closed:
+                future.set_exception(RuntimeError("Group commit writer has stopped"))
+            else:
+                self._queue.put((operation, future))
+        return future
+
+    def _run(self) -> None:
+        batch: list[Any] = []
+        try:
+            self._write_batches(batch)
+        except BaseException as exc:
+            self._abandon(batch, exc)
+
+    def _write_batches(self, batch: list[Any]) -> None:
+        conn = get_conn()
+        try:
+            stopping = False
+            while not stopping:
+                first = self._queue.get()
+                if first is _STOP:
+                    break
+                # Filled in place so _run can still see the batch if the thread dies.
+                batch[:] = [first]
+                deadline = time.monotonic() + self.window_seconds
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self._commit(conn, batch)
+        finally:
+            conn.close()
+
+    def _abandon(self, batch: list[Any], exc: BaseException) -> None:
+        with self._closed_lock:
+            self._closed = True
+        _forget_writer(self)
+        logger.error(
+            "group_commit",
+            extra={"outcome": "writer_stopped", "error_class": exc.__class__.__name__},
+        )
+        pending = [future for _, future in batch]
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                pending.append(item[1])
+        error = RuntimeError("Group commit writer has stopped")
+        error.__cause__ = exc
+        for future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    def _commit(
+        self, conn: sqlite3.Connection, batch: list[tuple[WriteOperation[Any], Future[Any]]]
+    ) -> None:
+        started = time.perf_counter()
+        outcomes: list[tuple[Future[Any], Any, BaseException | None]] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for operation, future in batch:
+                conn.execute("SAVEPOINT operation")
+                try:
+                    result = operation(conn)
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO operation")
+                    conn.execute("RELEASE operation")
+                    outcomes.append((future, None, exc))
+                else:
+                    conn.execute("RELEASE operation")
+                    outcomes.append((future, result, None))
+            conn.commit()
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.rollback()
+            with _stats_lock:
+                group_commit_counters["failed_commits"] += 1
+            logger.warning(
+                "group_commit",
+                extra={
+                    "outcome": "failure",
+                    "batch_size": len(batch),
+                    "error_class": exc.__class__.__name__,
+                },
+            )
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        failed = sum(1 for _, _, error in outcomes if error is not None)
+        with _stats_lock:
+            group_commit_counters["batches"] += 1
+            group_commit_counters["operations"] += len(batch)
+            group_commit_counters["failed_operations"] += failed
+            group_commit_counters["largest_batch"] = max(
+                group_commit_counters["largest_batch"], len(batch)
+            )
+            group_commit_counters["commit_ms_total"] += elapsed_ms
+            group_commit_counters["commit_ms_max"] = max(
+                group_commit_counters["commit_ms_max"], elapsed_ms
+            )
+            recent_batches.append((len(batch), elapsed_ms))
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+_writer: GroupCommitWriter | None = None
+
+
+def start_group_commit(window_ms: float, max_batch: int) -> None:
+    global _writer
+    if _writer is None:
+        _writer = GroupCommitWriter(window_ms, max_batch)
+        _writer.start()
+
+
+def _forget_writer(writer: GroupCommitWriter) -> None:
+    global _writer
+    if _writer is writer:
+        _writer = None
+
+
+def stop_group_commit() -> None:
+    global _writer
+    writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+
+
+async def run_write(operation: WriteOperation[T]) -> T:
+    # Without a running writer (scripts, tests without the lifespan) each write commits alone.
+    if _writer is None:
+        with get_conn() as conn:
+            return operation(conn)
+    return await asyncio.wrap_future(_writer.submit(operation))
+
+
+def group_commit_stats() -> dict[str, Any]:
+    with _stats_lock:
+        counters = dict(group_commit_counters)
+        recent = list(recent_batches)
+    batches = counters["batches"]
+    commit_ms = sorted(ms for _, ms in recent)
+    sizes = [size for size, _ in recent]
+    return {
+        "enabled": _writer is not None,
+        **counters,
+        "mean_batch_size": round(counters["operations"] / batches, 2) if batches else None,
+        "mean_commit_ms": round(counters["commit_ms_total"] / batches, 3) if batches else None,
+        "p50_batch_size": statistics.median(sizes) if sizes else None,
+        "p50_commit_ms": round(statistics.median(commit_ms), 3) if commit_ms else None,
+        "p95_commit_ms": (
+            round(commit_ms[math.ceil(len(commit_ms) * 0.95) - 1], 3) if commit_ms else None
+        ),
+    }
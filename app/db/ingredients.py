@@ -0,0 +1,169 @@
+import re
+import sqlite3
+from functools import lru_cache
+from typing import Any
+
+from app.db.grocery import ingredient_quantity
+from app.schemas.recipe import Recipe
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+_KEEP_TRAILING_S = ("ss", "us", "is")
+
+
+def _singular(word: str) -> str:
+    if len(word) <= 3 or word.endswith(_KEEP_TRAILING_S):
+        return word
+    if word.endswith("ies"):
+        return f"{word[:-3]}y"
+    if word.endswith(("oes", "ches", "shes", "xes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=4096)
+def normalize_ingredient(name: str) -> str:
+    words = _SPACES.sub(" ", _NON_WORD.sub(" ", name.lower())).strip().split(" ")
+    words[-1] = _singular(words[-1])
+    return " ".join(words).strip()
+
+
+def create_ingredient_index(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS recipe_ingredients (
+            recipe_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            optional INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (recipe_id, position),
+            FOREIGN KEY(recipe_id) REFERENCES recipes(id)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_recipe_ingredients_name
+        ON recipe_ingredients (name, recipe_id)
+        """
+    )
+    # Existing recipes are backfilled by add_ingredient_quantities, once the table has all
+    # of the columns index_ingredients writes.
+
+
+def add_ingredient_quantities(conn: sqlite3.Connection) -> None:
+    # Amounts and units are parsed once here and at save time, so grocery lists aggregate
+    # structured columns instead of re-reading recipe JSON.
+    conn.execute("ALTER TABLE recipe_ingredients ADD COLUMN base_quantity REAL")
+    conn.execute("ALTER TABLE recipe_ingredients ADD COLUMN base_unit TEXT NOT NULL DEFAULT ''")
+    conn.execute("ALTER TABLE recipe_ingredients ADD COLUMN unit TEXT NOT NULL DEFAULT ''")
+    conn.execute("ALTER TABLE recipe_ingredients ADD COLUMN amount_text TEXT NOT NULL DEFAULT ''")
+
+    conn.execute("DELETE FROM recipe_ingredients")
+    rows = conn.execute("SELECT recipe_json FROM recipes").fetchall()
+    for row in rows:
+        index_ingredients(conn, Recipe.model_validate_json(row["recipe_json"]))
+
+
+def index_ingredients(conn: sqlite3.Connection, recipe: Recipe) -> None:
+    index_ingredients_many(conn, [recipe])
+
+
+def index_ingredients_many(conn: sqlite3.Connection, recipes: list[Recipe]) -> None:
+    entries = []
+    for recipe in recipes:
+        for position, ingredient in enumerate(recipe.ingredients):
+            name = normalize_ingredient(ingredient.name)
+            if not name:
+                continue
+            base_quantity, base_unit, unit = ingredient_quantity(ingredient.amount, ingredient.unit)
+            entries.append(
+                (
+                    recipe.id,
+                    position,
+                    name,
+                    int(ingredient.optional),
+                    base_quantity,
+                    base_unit,
+                    unit,
+                    f"{ingredient.amount} {ingredient.unit}".strip(),
+                )
+            )
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO recipe_ingredients (
+            recipe_id, position, name, optional, base_quantity, base_unit, unit, amount_text
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        entries,
+    )
+
+
+def match_pantry(
+    conn: sqlite3.Connection, pantry: list[str], limit: int, min_coverage: float
+) -> list[dict[str, Any]]:
+    pantry_names = sorted({name for name in map(normalize_ingredient, pantry) if name})
+    if not pantry_names:
+        return []
+
+    # Each distinct ingredient name gets one bit; pantry names take the low bits so the pantry
+    # is a contiguous mask and coverage is a couple of integer ops per recipe.
+    bits = {name: 1 << position for position, name in enumerate(pantry_names)}
+    pantry_mask = (1 << len(pantry_names)) - 1
+
+    placeholders = ", ".join("?" for _ in pantry_names)
+    rows = conn.execute(
+        f"""
+        SELECT ri.recipe_id, ri.name, ri.optional, r.title, r.created_at
+        FROM recipe_ingredients ri
+        JOIN recipes r ON r.id = ri.recipe_id
+        WHERE ri.recipe_id IN (
+            SELECT recipe_id FROM recipe_ingredients WHERE name IN ({placeholders})
+        )
+        """,
+        pantry_names,
+    ).fetchall()
+
+    # Optional ingredients never count as missing, so only required ones enter the masks.
+    required: dict[str, int] = {}
+    meta: dict[str, tuple[str, str]] = {}
+    for row in rows:
+        recipe_id = str(row["recipe_id"])
+        bit = bits.get(row["name"])
+        if bit is None:
+            bit = 1 << len(bits)
+            bits[row["name"]] = bit
+        if not row["optional"]:
+            required[recipe_id] = required.get(recipe_id, 0) | bit
+        meta[recipe_id] = (str(row["title"]), str(row["created_at"]))
+
+    names_by_bit = {bit: name for name, bit in bits.items()}
+
+    def _names(mask: int) -> list[str]:
+        return [names_by_bit[1 << index] for index in range(mask.bit_length()) if mask >> index & 1]
+
+    scored = []
+    for recipe_id, (title, created_at) in meta.items():
+        needed = required.get(recipe_id, 0)
+        have = needed & pantry_mask
+        needed_count = needed.bit_count()
+        coverage = have.bit_count() / needed_count if needed_count else 1.0
+        if coverage < min_coverage:
+            continue
+        missing = needed & ~pantry_mask
+        scored.append((coverage, -missing.bit_count(), created_at, recipe_id, title, have, missing))
+
+    scored.sort(reverse=True)
+    return [
+        {
+            "id": recipe_id,
+            "title": title,
+            "coverage": round(coverage, 4),
+            "matched": _names(have),
+            "missing": _names(missing),
+        }
+        for coverage, _, _, recipe_id, title, have, missing in scored[:limit]
+    ]
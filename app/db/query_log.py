@@ -0,0 +1,208 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE_PREFIXES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+_SLOW_QUERY_LOG_SIZE = 200
+
+# Keyed by whitespace-normalized SQL; values are plain counters like the rest of the app.
+query_stats: dict[str, dict[str, float]] = {}
+slow_query_log: deque[dict[str, Any]] = deque(maxlen=_SLOW_QUERY_LOG_SIZE)
+_stats_lock = threading.Lock()
+
+
+def _normalize_sql(sql: str) -> str:
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def _value_shape(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, str | bytes):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def param_shapes(parameters: Any) -> Any:
+    if isinstance(parameters, Mapping):
+        return {str(key): _value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, list | tuple):
+        return [_value_shape(value) for value in parameters]
+    return type(parameters).__name__
+
+
+def _record(sql_key: str, elapsed_ms: float, slow: bool) -> None:
+    with _stats_lock:
+        stats = query_stats.get(sql_key)
+        if stats is None:
+            stats = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "slow_calls": 0}
+            query_stats[sql_key] = stats
+        stats["calls"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        if slow:
+            stats["slow_calls"] += 1
+
+
+def _explain(conn: sqlite3.Connection, sql: str, parameters: Any) -> list[str]:
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE_PREFIXES):
+        return []
+    try:
+        # A plain cursor keeps the EXPLAIN itself out of the statistics.
+        rows = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+    except sqlite3.Error as exc:
+        return [f"explain failed: {exc.__class__.__name__}"]
+    return [str(row[3]) for row in rows]
+
+
+def _log_slow_query(
+    conn: sqlite3.Connection,
+    sql: str,
+    parameters: Any,
+    elapsed_ms: float,
+    explain: bool,
+) -> None:
+    entry = {
+        "sql": _normalize_sql(sql),
+        "param_shapes": param_shapes(parameters),
+        "elapsed_ms": round(elapsed_ms, 3),
+        "query_plan": _explain(conn, sql, parameters) if explain else [],
+    }
+    slow_query_log.append(entry)
+    # The statement is in the message too, so plain formatters show which one was slow.
+    logger.warning("slow_query %.1f ms: %s", elapsed_ms, entry["sql"], extra=entry)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Times each statement from execute until its rows are read.
+
+    A statement without a result set is recorded as soon as it has run. A query is recorded
+    once its rows are exhausted, or when the cursor is reused, closed or dropped, so the
+    time spent stepping through rows counts towards its total, max and slow threshold.
+    """
+
+    _pending: tuple[str, Any, bool] | None = None
+    _elapsed_ms = 0.0
+
+    def execute(self, sql: str, parameters: Any = (), /) -> "InstrumentedCursor":
+        self._finish()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._begin(sql, parameters, start)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any], /) -> "InstrumentedCursor":
+        self._finish()
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        # Parameter batches may be one-shot iterators, so neither shapes nor plans are captured.
+        self._begin(sql, "executemany", start, explain=False)
+        return self
+
+    def fetchone(self) -> Any:
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, done=row is None)
+        return row
+
+    def fetchmany(self, size: int | None = None) -> list[Any]:
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(start, done=len(rows) < size)
+        return rows
+
+    def fetchall(self) -> list[Any]:
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, done=True)
+        return rows
+
+    def __next__(self) -> Any:
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(start, done=True)
+            raise
+        self._fetched(start, done=False)
+        return row
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+    def __del__(self) -> None:
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def _begin(self, sql: str, parameters: Any, start: float, explain: bool = True) -> None:
+        self._pending = (sql, parameters, explain)
+        self._elapsed_ms = (time.perf_counter() - start) * 1000
+        if self.description is None:
+            self._finish()
+
+    def _fetched(self, start: float, done: bool) -> None:
+        if self._pending is None:
+            return
+        self._elapsed_ms += (time.perf_counter() - start) * 1000
+        if done:
+            self._finish()
+
+    def _finish(self) -> None:
+        if self._pending is None:
+            return
+        sql, parameters, explain = self._pending
+        self._pending = None
+        sql_key = _normalize_sql(sql)
+        threshold_ms = getattr(self.connection, "slow_query_threshold_ms", None)
+        slow = threshold_ms is not None and self._elapsed_ms >= threshold_ms
+        _record(sql_key, self._elapsed_ms, slow)
+        if slow:
+            _log_slow_query(self.connection, sql, parameters, self._elapsed_ms, explain)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    slow_query_threshold_ms: float | None = None
+
+    def cursor(self, factory: Any = InstrumentedCursor) -> Any:  # type: ignore[override]
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = (), /) -> InstrumentedCursor:  # type: ignore[override]
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, parameters: Iterable[Any], /) -> InstrumentedCursor:  # type: ignore[override]
+        return self.cursor().executemany(sql, parameters)
+
+
+def top_queries(limit: int = 10) -> list[dict[str, Any]]:
+    with _stats_lock:
+        snapshot = [(sql, dict(stats)) for sql, stats in query_stats.items()]
+    snapshot.sort(key=lambda item: item[1]["total_ms"], reverse=True)
+    return [
+        {
+            "sql": sql,
+            "calls": int(stats["calls"]),
+            "total_ms": round(stats["total_ms"], 3),
+            "mean_ms": round(stats["total_ms"] / stats["calls"], 3),
+            "max_ms": round(stats["max_ms"], 3),
+            "slow_calls": int(stats["slow_calls"]),
+        }
+        for sql, stats in snapshot[:limit]
+    ]
+
+
+def reset_query_stats() -> None:
+    with _stats_lock:
+        query_stats.clear()
+        slow_query_log.clear()
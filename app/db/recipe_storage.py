@@ -0,0 +1,70 @@
+import sqlite3
+
+from pydantic_core import from_json, to_json
+
+from app.core.http_cache import content_hash
+from app.db.codec import decode_recipe_json, reencode_recipe_json
+from app.schemas.recipe import RECIPE_SCHEMA_VERSION, CookMode, Recipe
+
+# cook_mode repeats the ingredients and step texts, so rows store it only when it differs from
+# CookMode.derive. Within recipe JSON this byte sequence can only be the top-level key: a
+# quote inside any string value is escaped.
+_COOK_MODE_KEY = b'"cook_mode":'
+_BATCH_SIZE = 500
+
+
+def pack_recipe_json(recipe: Recipe) -> str:
+    if recipe.cook_mode == CookMode.derive(recipe.ingredients, recipe.steps):
+        return recipe.model_dump_json(exclude={"cook_mode"})
+    return recipe.model_dump_json()
+
+
+def unpack_recipe_json(stored: bytes) -> bytes:
+    if _COOK_MODE_KEY in stored:
+        return stored
+    # Rebuilt from plain dicts rather than a validated Recipe; cook_mode is the last field,
+    # so the output is byte-identical to Recipe.model_dump_json() and content hashes hold.
+    data = from_json(stored)
+    data["cook_mode"] = {
+        "ingredients_checklist": data["ingredients"],
+        "step_cards": [step["text"] for step in data["steps"]],
+    }
+    return to_json(data)
+
+
+def pack_stored_recipes(conn: sqlite3.Connection, db_path: str) -> None:
+    last_doc_id = 0
+    while True:
+        rows = conn.execute(
+            "SELECT doc_id, id, recipe_json FROM recipes WHERE doc_id > ? ORDER BY doc_id LIMIT ?",
+            (last_doc_id, _BATCH_SIZE),
+        ).fetchall()
+        if not rows:
+            return
+        updates = []
+        for row in rows:
+            stored = decode_recipe_json(conn, db_path, row["recipe_json"])
+            if _COOK_MODE_KEY not in stored:
+                continue
+            recipe = Recipe.model_validate_json(stored)
+            packed = pack_recipe_json(recipe)
+            if _COOK_MODE_KEY in packed.encode():
+                continue
+            # Rows are validated here, so they are re-serialized and trusted from now on; only
+            # rows saved before RECIPE_SCHEMA_VERSION existed get a new content hash.
+            updates.append(
+                (
+                    reencode_recipe_json(conn, db_path, row["recipe_json"], packed),
+                    content_hash(recipe.model_dump_json().encode()),
+                    RECIPE_SCHEMA_VERSION,
+                    row["id"],
+                )
+            )
+        conn.executemany(
+            """
+            UPDATE recipes SET recipe_json = ?, content_hash = ?, schema_version = ?
+            WHERE id = ?
+            """,
+            updates,
+        )
+        last_doc_id = int(rows[-1]["doc_id"])
@@ -0,0 +1,44 @@
+"""Compact row types for the library and notes list views.
+
+Each record is a slotted dataclass built positionally by a cursor row factory, so a listed
+row costs one small object instead of a sqlite3.Row plus a dict of converted values. The
+``dump_*`` encoders serialize lists of them in pydantic-core without building dicts.
+"""
+
+import sqlite3
+from dataclasses import dataclass
+
+from pydantic import TypeAdapter
+
+
+@dataclass(slots=True)
+class RecipeSummary:
+    id: str
+    title: str
+    created_at: str
+    note_count: int
+    last_note_at: str | None
+
+
+@dataclass(slots=True)
+class NoteRecord:
+    note_id: str
+    note_text: str
+    created_at: str
+
+
+# SELECT lists in field order, for the row factories below.
+RECIPE_SUMMARY_COLUMNS = "id, title, created_at, note_count, last_note_at"
+NOTE_RECORD_COLUMNS = "id, note_text, created_at"
+
+
+def recipe_summary_row(cursor: sqlite3.Cursor, row: tuple) -> RecipeSummary:
+    return RecipeSummary(*row)
+
+
+def note_record_row(cursor: sqlite3.Cursor, row: tuple) -> NoteRecord:
+    return NoteRecord(*row)
+
+
+dump_recipe_summaries = TypeAdapter(list[RecipeSummary]).dump_json
+dump_note_records = TypeAdapter(list[NoteRecord]).dump_json
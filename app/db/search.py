@@ -0,0 +1,238 @@
+import html
+import re
+import sqlite3
+from typing import Any
+
+from app.schemas.recipe import Recipe
+
+_TOKEN = re.compile(r"\w+")
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+# Column weights for bm25(), in recipes_fts column order: title first, notes last.
+_RANK_FUNCTION = "bm25(10.0, 4.0, 3.0, 1.0, 1.0)"
+# Search scores a candidate by the weights of the columns holding every query word. The title
+# is checked against recipe_titles_fts, whose posting lists stay short for words that fill
+# the recipe bodies.
+_TITLE_WEIGHT = 10.0
+_BODY_WEIGHTS = (("dish_summary", 4.0), ("ingredients", 3.0), ("steps", 1.0), ("notes", 1.0))
+# Newest title matches plus newest matches anywhere; only these are ranked and paged.
+_RANK_CANDIDATES = 200
+_SNIPPET_TOKENS = 12
+
+
+def create_search_index(conn: sqlite3.Connection) -> None:
+    # rowid is recipes.doc_id; prefix indexes keep type-ahead prefix queries cheap.
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5(
+            title,
+            dish_summary,
+            ingredients,
+            steps,
+            notes,
+            tokenize = 'porter unicode61 remove_diacritics 2',
+            prefix = '2 3 4'
+        )
+        """
+    )
+    conn.execute(
+        "INSERT INTO recipes_fts (recipes_fts, rank) VALUES ('rank', ?)",
+        (_RANK_FUNCTION,),
+    )
+    create_title_index(conn)
+
+    rows = conn.execute(
+        """
+        SELECT recipes.doc_id, recipes.recipe_json, group_concat(notes.note_text, char(10)) AS notes
+        FROM recipes
+        LEFT JOIN notes ON notes.recipe_id = recipes.id
+        GROUP BY recipes.id
+        """
+    ).fetchall()
+    for row in rows:
+        recipe = Recipe.model_validate_json(row["recipe_json"])
+        index_recipe(conn, int(row["doc_id"]), recipe, row["notes"] or "")
+
+
+def create_title_index(conn: sqlite3.Connection) -> None:
+    # Title-only twin of recipes_fts, so title matches are found without walking the long
+    # posting lists of words that appear in every recipe's steps.
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS recipe_titles_fts USING fts5(
+            title,
+            tokenize = 'porter unicode61 remove_diacritics 2',
+            prefix = '2 3 4'
+        )
+        """
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO recipe_titles_fts (rowid, title) SELECT doc_id, title FROM recipes"
+    )
+
+
+def index_recipe(conn: sqlite3.Connection, doc_id: int, recipe: Recipe, notes: str = "") -> None:
+    index_recipes(conn, [(doc_id, recipe, notes)])
+
+
+def index_recipes(conn: sqlite3.Connection, entries: list[tuple[int, Recipe, str]]) -> None:
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO recipes_fts (rowid, title, dish_summary, ingredients, steps, notes)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                doc_id,
+                recipe.title,
+                recipe.dish_summary,
+                "\n".join(ingredient.name for ingredient in recipe.ingredients),
+                "\n".join(step.text for step in recipe.steps),
+                notes,
+            )
+            for doc_id, recipe, notes in entries
+        ],
+    )
+    conn.executemany(
+        "INSERT OR REPLACE INTO recipe_titles_fts (rowid, title) VALUES (?, ?)",
+        [(doc_id, recipe.title) for doc_id, recipe, _ in entries],
+    )
+
+
+def unindex_recipes(conn: sqlite3.Connection, doc_ids: list[int]) -> None:
+    params = [(doc_id,) for doc_id in doc_ids]
+    conn.executemany("DELETE FROM recipes_fts WHERE rowid = ?", params)
+    conn.executemany("DELETE FROM recipe_titles_fts WHERE rowid = ?", params)
+
+
+def index_note(conn: sqlite3.Connection, recipe_id: str, note_text: str) -> None:
+    conn.execute(
+        """
+        UPDATE recipes_fts
+        SET notes = notes || char(10) || ?
+        WHERE rowid = (SELECT doc_id FROM recipes WHERE id = ?)
+        """,
+        (note_text, recipe_id),
+    )
+
+
+def build_match_terms(raw_query: str) -> list[str]:
+    # Quote every token so user input can never be parsed as FTS5 syntax.
+    return [f'"{token}"' for token in _TOKEN.findall(raw_query.lower())]
+
+
+def _render_snippet(raw_snippet: str) -> str:
+    return (
+        html.escape(raw_snippet)
+        .replace(_MARK_START, "<mark>")
+        .replace(_MARK_END, "</mark>")
+    )
+
+
+def _matching_rowids(
+    conn: sqlite3.Connection, table: str, match_query: str, min_rowid: int
+) -> set[int]:
+    return {
+        int(row[0])
+        for row in conn.execute(
+            f"SELECT rowid FROM {table} WHERE {table} MATCH ? AND rowid >= ?",
+            (match_query, min_rowid),
+        )
+    }
+
+
+def _rank_candidates(conn: sqlite3.Connection, match_query: str) -> list[tuple[int, float]]:
+    # bm25 scans each term's whole posting list for its document frequency, which costs tens
+    # of milliseconds for words found in most recipes. Instead a fixed candidate set is scored
+    # by column weights, so every page is cut from the same order whatever the offset.
+    title_matches = [
+        int(row[0])
+        for row in conn.execute(
+            """
+            SELECT rowid FROM recipe_titles_fts
+            WHERE recipe_titles_fts MATCH ?
+            ORDER BY rowid DESC LIMIT ?
+            """,
+            (match_query, _RANK_CANDIDATES),
+        )
+    ]
+    newest = [
+        int(row[0])
+        for row in conn.execute(
+            "SELECT rowid FROM recipes_fts WHERE recipes_fts MATCH ? ORDER BY rowid DESC LIMIT ?",
+            (match_query, _RANK_CANDIDATES),
+        )
+    ]
+    scores = dict.fromkeys(title_matches, _TITLE_WEIGHT)
+    if newest:
+        # Every full match at or above the oldest newest-candidate is itself a candidate, so
+        # these rowid-bounded lookups touch nothing else; older title matches are scored by
+        # their title alone.
+        floor = newest[-1]
+        in_title = _matching_rowids(conn, "recipe_titles_fts", match_query, floor)
+        body_hits = [
+            (_matching_rowids(conn, "recipes_fts", f"{column} : ({match_query})", floor), weight)
+            for column, weight in _BODY_WEIGHTS
+        ]
+        for doc_id in newest:
+            score = _TITLE_WEIGHT if doc_id in in_title else 0.0
+            score += sum(weight for hits, weight in body_hits if doc_id in hits)
+            scores[doc_id] = score
+    return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+
+
+def search_recipes(
+    conn: sqlite3.Connection, raw_query: str, limit: int, offset: int
+) -> tuple[list[dict[str, Any]], bool]:
+    terms = build_match_terms(raw_query)
+    if not terms:
+        return [], False
+    match_query = " ".join(terms)
+    # Whole words first; only when nothing matches is the last word treated as a prefix,
+    # because long prefixes are not covered by the prefix indexes and expand to many terms.
+    has_exact_match = conn.execute(
+        "SELECT 1 FROM recipes_fts WHERE recipes_fts MATCH ? LIMIT 1", (match_query,)
+    ).fetchone()
+    if has_exact_match is None:
+        terms[-1] = f"{terms[-1]}*"
+        match_query = " ".join(terms)
+
+    ranked = _rank_candidates(conn, match_query)
+    page = ranked[offset : offset + limit]
+    if not page:
+        return [], False
+
+    # Snippets are only built for the rows on this page, not for every ranked candidate. The
+    # recipes lookup is a separate statement so the planner cannot re-run MATCH per recipe.
+    doc_ids = [doc_id for doc_id, _ in page]
+    placeholders = ", ".join("?" for _ in doc_ids)
+    snippets = dict(
+        conn.execute(
+            f"""
+            SELECT rowid, snippet(recipes_fts, -1, ?, ?, '…', ?)
+            FROM recipes_fts
+            WHERE recipes_fts MATCH ? AND rowid IN ({placeholders})
+            """,
+            (_MARK_START, _MARK_END, _SNIPPET_TOKENS, match_query, *doc_ids),
+        ).fetchall()
+    )
+    recipes = {
+        int(row["doc_id"]): row
+        for row in conn.execute(
+            f"SELECT doc_id, id, title, created_at FROM recipes WHERE doc_id IN ({placeholders})",
+            doc_ids,
+        ).fetchall()
+    }
+
+    results = [
+        {
+            "id": str(recipes[doc_id]["id"]),
+            "title": str(recipes[doc_id]["title"]),
+            "created_at": str(recipes[doc_id]["created_at"]),
+            "snippet": _render_snippet(str(snippets.get(doc_id, ""))),
+            "score": float(score),
+        }
+        for doc_id, score in page
+        if doc_id in recipes
+    ]
+    return results, len(ranked) > offset + limit
@@ -1,14 +1,32 @@
 import os
 import sqlite3
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
+from app.core.config import get_settings
+from app.core.http_cache import content_hash
+from app.db.codec import create_codec_tables
+from app.db.ingredients import add_ingredient_quantities, create_ingredient_index
+from app.db.query_log import InstrumentedConnection
+from app.db.recipe_storage import pack_stored_recipes
+from app.db.search import create_search_index, create_title_index
+
 
 def get_db_path() -> str:
     return os.getenv("RECIPE_DB_PATH", "data/recipes.db")
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def to_epoch_us(value: datetime) -> int:
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
 def get_conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(get_db_path())
+    conn = sqlite3.connect(get_db_path(), factory=InstrumentedConnection)
+    conn.slow_query_threshold_ms = get_settings().slow_query_threshold_ms
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
     return conn
@@ -19,6 +37,9 @@ def init_db() -> None:
     db_path.parent.mkdir(parents=True, exist_ok=True)
 
     with get_conn() as conn:
+        # WAL lets readers in every worker proceed while the group-commit writer holds the
+        # write lock; the mode is persistent, so setting it once per start is enough.
+        conn.execute("PRAGMA journal_mode = WAL")
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS recipes (
@@ -40,3 +61,159 @@ def init_db() -> None:
             )
             """
         )
+
+    _apply_migrations()
+
+
+def _index_notes_by_recipe_and_time(conn: sqlite3.Connection) -> None:
+    conn.execute("ALTER TABLE notes ADD COLUMN created_at_us INTEGER")
+    notes = conn.execute("SELECT id, created_at FROM notes").fetchall()
+    conn.executemany(
+        "UPDATE notes SET created_at_us = ? WHERE id = ?",
+        [
+            (to_epoch_us(datetime.fromisoformat(str(row["created_at"]))), row["id"])
+            for row in notes
+        ],
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_notes_recipe_created
+        ON notes (recipe_id, created_at_us)
+        """
+    )
+
+    conn.execute("ALTER TABLE recipes ADD COLUMN note_count INTEGER NOT NULL DEFAULT 0")
+    conn.execute("ALTER TABLE recipes ADD COLUMN last_note_at TEXT")
+    conn.execute(
+        """
+        UPDATE recipes
+        SET note_count = (SELECT COUNT(*) FROM notes WHERE notes.recipe_id = recipes.id),
+            last_note_at = (
+                SELECT created_at
+                FROM notes
+                WHERE notes.recipe_id = recipes.id
+                ORDER BY created_at_us DESC
+                LIMIT 1
+            )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS notes_update_recipe_aggregates
+        AFTER INSERT ON notes
+        BEGIN
+            UPDATE recipes
+            SET note_count = note_count + 1,
+                last_note_at = MAX(COALESCE(last_note_at, ''), NEW.created_at)
+            WHERE id = NEW.recipe_id;
+        END
+        """
+    )
+
+
+def _add_stable_doc_ids(conn: sqlite3.Connection) -> None:
+    # recipes has a TEXT primary key, so its implicit rowid may change on VACUUM. Secondary
+    # indexes (full-text search, similarity) key on this explicit integer instead.
+    conn.execute("ALTER TABLE recipes ADD COLUMN doc_id INTEGER")
+    conn.execute("UPDATE recipes SET doc_id = rowid")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_recipes_doc_id ON recipes (doc_id)")
+
+
+def _add_recipe_schema_version(conn: sqlite3.Connection) -> None:
+    # Existing rows stay at 0, so they are validated on read rather than served as stored.
+    conn.execute("ALTER TABLE recipes ADD COLUMN schema_version INTEGER NOT NULL DEFAULT 0")
+
+
+def _add_recipe_content_hash(conn: sqlite3.Connection) -> None:
+    conn.execute("ALTER TABLE recipes ADD COLUMN content_hash TEXT NOT NULL DEFAULT ''")
+    rows = conn.execute("SELECT id, recipe_json FROM recipes").fetchall()
+    conn.executemany(
+        "UPDATE recipes SET content_hash = ? WHERE id = ?",
+        [(content_hash(str(row["recipe_json"]).encode()), row["id"]) for row in rows],
+    )
+
+
+def _create_recipe_drafts(conn: sqlite3.Connection) -> None:
+    # Generated-but-unsaved recipes when DRAFT_STORE=sqlite; rows expire after DRAFT_TTL_SECONDS.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS recipe_drafts (
+            id TEXT PRIMARY KEY,
+            recipe_json TEXT NOT NULL,
+            expires_at_us INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_recipe_drafts_expires ON recipe_drafts (expires_at_us)"
+    )
+
+
+def _add_draft_schema_version(conn: sqlite3.Connection) -> None:
+    # Like recipes.schema_version: drafts at the current version are read without validation.
+    conn.execute("ALTER TABLE recipe_drafts ADD COLUMN schema_version INTEGER NOT NULL DEFAULT 0")
+
+
+def _index_recipes_by_created_at(conn: sqlite3.Connection) -> None:
+    # The recipe list reads this index backwards, so a streamed list starts sending without
+    # sorting the whole table first.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_recipes_created_at ON recipes (created_at)")
+
+
+def _create_recipe_imports(conn: sqlite3.Connection) -> None:
+    # Progress of recent imports, readable by whichever worker a polling client reaches.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS recipe_imports (
+            id TEXT PRIMARY KEY,
+            progress_json TEXT NOT NULL,
+            updated_at_us INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_recipe_imports_updated ON recipe_imports (updated_at_us)"
+    )
+
+
+def _pack_stored_recipes(conn: sqlite3.Connection) -> None:
+    pack_stored_recipes(conn, get_db_path())
+
+
+# Applied in order; PRAGMA user_version records how many have run against a database.
+_MIGRATIONS: tuple[Callable[[sqlite3.Connection], None], ...] = (
+    _index_notes_by_recipe_and_time,
+    _add_stable_doc_ids,
+    create_search_index,
+    create_ingredient_index,
+    add_ingredient_quantities,
+    _add_recipe_schema_version,
+    _add_recipe_content_hash,
+    create_codec_tables,
+    _pack_stored_recipes,
+    _create_recipe_drafts,
+    _index_recipes_by_created_at,
+    _create_recipe_imports,
+    create_title_index,
+    _add_draft_schema_version,
+)
+
+
+def _apply_migrations() -> None:
+    conn = get_conn()
+    try:
+        for version, migration in enumerate(_MIGRATIONS, start=1):
+            # IMMEDIATE takes the write lock before re-checking, so concurrent workers
+            # starting together run each migration exactly once.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = int(conn.execute("PRAGMA user_version").fetchone()[0])
+                if current < version:
+                    migration(conn)
+                    conn.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    finally:
+        conn.close()
@@ -0,0 +1,235 @@
+"""Compress stored recipes with the trained codec, and report on the storage format.
+
+Usage: python -m app.db.storage_migration {report,train,migrate}
+"""
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import sys
+import threading
+import time
+from typing import Any
+
+from app.db.codec import (
+    Dictionary,
+    decode_recipe_json,
+    encode_recipe_json,
+    forget_dictionaries,
+    latest_dictionary,
+    stored_dictionary_id,
+    train_from_database,
+)
+from app.db.recipe_storage import unpack_recipe_json
+from app.db.sqlite import get_conn, get_db_path, init_db
+from app.schemas.recipe import Recipe
+
+logger = logging.getLogger(__name__)
+
+_BATCH_SIZE = 200
+_BACKGROUND_PAUSE_SECONDS = 0.05
+_REPORT_SAMPLE = 200
+
+
+def _dictionary_for_migration(retrain: bool) -> Dictionary | None:
+    db_path = get_db_path()
+    conn = get_conn()
+    try:
+        # IMMEDIATE serializes training, so workers starting together train at most once.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            forget_dictionaries(db_path)
+            dictionary = latest_dictionary(conn, db_path)
+            if dictionary is None or retrain:
+                if train_from_database(conn, db_path) is not None:
+                    dictionary = latest_dictionary(conn, db_path)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    finally:
+        conn.close()
+    return dictionary
+
+
+def migrate_recipe_storage(
+    stop: threading.Event | None = None,
+    full: bool = False,
+    retrain: bool = False,
+    pause_seconds: float = 0.0,
+) -> int:
+    dictionary = _dictionary_for_migration(retrain)
+    if dictionary is None:
+        return 0
+
+    db_path = get_db_path()
+    with get_conn() as conn:
+        last_doc_id = 0
+        if not full:
+            last_doc_id = int(
+                conn.execute(
+                    "SELECT migrated_through FROM recipe_codec_dictionaries WHERE id = ?",
+                    (dictionary.id,),
+                ).fetchone()[0]
+            )
+
+    converted = 0
+    started = time.perf_counter()
+    while stop is None or not stop.is_set():
+        with get_conn() as conn:
+            rows = conn.execute(
+                """
+                SELECT doc_id, id, recipe_json
+                FROM recipes
+                WHERE doc_id > ?
+                ORDER BY doc_id
+                LIMIT ?
+                """,
+                (last_doc_id, _BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                break
+            updates = [
+                (
+                    encode_recipe_json(
+                        decode_recipe_json(conn, db_path, row["recipe_json"]).decode(),
+                        dictionary,
+                    ),
+                    row["id"],
+                    row["recipe_json"],
+                )
+                for row in rows
+                if stored_dictionary_id(row["recipe_json"]) != dictionary.id
+            ]
+            # Compare-and-set, so a row rewritten concurrently is left alone.
+            conn.executemany(
+                "UPDATE recipes SET recipe_json = ? WHERE id = ? AND recipe_json = ?", updates
+            )
+            last_doc_id = int(rows[-1]["doc_id"])
+            conn.execute(
+                """
+                UPDATE recipe_codec_dictionaries
+                SET migrated_through = MAX(migrated_through, ?)
+                WHERE id = ?
+                """,
+                (last_doc_id, dictionary.id),
+            )
+        converted += len(updates)
+        if stop is not None and pause_seconds:
+            stop.wait(pause_seconds)
+
+    logger.info(
+        "recipe_storage_migration",
+        extra={
+            "outcome": "stopped" if stop is not None and stop.is_set() else "complete",
+            "dictionary_id": dictionary.id,
+            "converted": converted,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    )
+    return converted
+
+
+class BackgroundStorageMigration:
+    def __init__(self) -> None:
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="recipe-storage-migration", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            migrate_recipe_storage(self._stop, pause_seconds=_BACKGROUND_PAUSE_SECONDS)
+        except Exception as exc:
+            logger.warning(
+                "recipe_storage_migration",
+                extra={"outcome": "failure", "error_class": exc.__class__.__name__},
+            )
+
+
+def storage_report(sample_size: int = _REPORT_SAMPLE) -> dict[str, Any]:
+    db_path = get_db_path()
+    formats: dict[str, int] = {}
+    stored_bytes = 0
+    json_bytes = 0
+    with get_conn() as conn:
+        for row in conn.execute("SELECT recipe_json FROM recipes"):
+            value = row["recipe_json"]
+            dictionary_id = stored_dictionary_id(value)
+            label = "text" if dictionary_id is None else f"zlib-dictionary-{dictionary_id}"
+            formats[label] = formats.get(label, 0) + 1
+            stored_bytes += len(value.encode() if isinstance(value, str) else value)
+            json_bytes += len(decode_recipe_json(conn, db_path, value))
+
+        page_size = int(conn.execute("PRAGMA page_size").fetchone()[0])
+        page_count = int(conn.execute("PRAGMA page_count").fetchone()[0])
+        free_pages = int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+
+        ids = [str(row[0]) for row in conn.execute("SELECT id FROM recipes")]
+        read_us: list[float] = []
+        decode_us: list[float] = []
+        unpack_us: list[float] = []
+        validate_us: list[float] = []
+        for recipe_id in random.sample(ids, min(sample_size, len(ids))):
+            t0 = time.perf_counter()
+            value = conn.execute(
+                "SELECT recipe_json FROM recipes WHERE id = ?", (recipe_id,)
+            ).fetchone()[0]
+            t1 = time.perf_counter()
+            data = decode_recipe_json(conn, db_path, value)
+            t2 = time.perf_counter()
+            data = unpack_recipe_json(data)
+            t3 = time.perf_counter()
+            Recipe.model_validate_json(data)
+            t4 = time.perf_counter()
+            read_us.append((t1 - t0) * 1_000_000)
+            decode_us.append((t2 - t1) * 1_000_000)
+            unpack_us.append((t3 - t2) * 1_000_000)
+            validate_us.append((t4 - t3) * 1_000_000)
+
+    def _median(values: list[float]) -> float | None:
+        return round(statistics.median(values), 1) if values else None
+
+    return {
+        "rows": sum(formats.values()),
+        "formats": formats,
+        "stored_bytes": stored_bytes,
+        "json_bytes": json_bytes,
+        "ratio": round(json_bytes / stored_bytes, 2) if stored_bytes else None,
+        "database_bytes": page_size * page_count,
+        "free_bytes": page_size * free_pages,
+        "median_read_us": _median(read_us),
+        "median_decode_us": _median(decode_us),
+        "median_unpack_us": _median(unpack_us),
+        "median_validate_us": _median(validate_us),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.db.storage_migration")
+    parser.add_argument("command", choices=["report", "train", "migrate"])
+    args = parser.parse_args(argv)
+
+    init_db()
+    if args.command == "train":
+        # Training a new dictionary re-encodes every row with it.
+        converted = migrate_recipe_storage(full=True, retrain=True)
+        print(f"re-encoded {converted} recipes with a new dictionary")
+    elif args.command == "migrate":
+        converted = migrate_recipe_storage(full=True)
+        print(f"encoded {converted} recipes")
+    json.dump(storage_report(), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
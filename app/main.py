@@ -2,14 +2,26 @@ from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 
+from app.api.admin import router as admin_router
 from app.api.generate import router as generate_router
+from app.api.grocery import router as grocery_router
+from app.api.library import router as library_router
 from app.api.recipes import router as recipes_router
+from app.api.ui import render_recipe_pages, templates
 from app.api.ui import router as ui_router
+from app.core.assets import AssetStaticFiles
+from app.core.compression import CompressionMiddleware
 from app.core.config import get_settings
+from app.core.profiler import RequestProfilerMiddleware
+from app.core.templating import precompile_templates
+from app.db.group_commit import start_group_commit, stop_group_commit
 from app.db.sqlite import init_db
+from app.db.storage_migration import BackgroundStorageMigration
 from app.services.generator_factory import get_generator
+from app.services.prerender import start_prerender, stop_prerender
+from app.services.recipe_cache import close_recipe_caches, get_recipe_cache
+from app.services.similarity import get_similarity_index, persist_similarity_indexes
 
 
 @asynccontextmanager
@@ -17,14 +29,36 @@ async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     settings = get_settings()
     get_generator(settings)
     init_db()
+    if settings.group_commit:
+        start_group_commit(settings.group_commit_window_ms, settings.group_commit_max_batch)
+    get_similarity_index()
+    get_recipe_cache()
+    precompile_templates(templates)
+    start_prerender(render_recipe_pages)
+    storage_migration = BackgroundStorageMigration() if settings.recipe_compression else None
+    if storage_migration is not None:
+        storage_migration.start()
     yield
+    if storage_migration is not None:
+        storage_migration.stop()
+    stop_prerender()
+    stop_group_commit()
+    persist_similarity_indexes()
+    close_recipe_caches()
 
 
 app = FastAPI(title="Recipe Chat App", version="0.1.0", lifespan=lifespan)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.add_middleware(RequestProfilerMiddleware)
+# Added last, so it is outermost and also compresses profiler output.
+app.add_middleware(CompressionMiddleware)
+app.mount("/static", AssetStaticFiles(directory="app/static"), name="static")
 app.include_router(ui_router)
 app.include_router(generate_router)
+# Before the recipes router, so /recipes/export is not matched as /recipes/{recipe_id}.
+app.include_router(library_router)
 app.include_router(recipes_router)
+app.include_router(grocery_router)
+app.include_router(admin_router)
 
 
 @app.get("/health")
@@ -2,6 +2,10 @@ from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
+# Stored with every saved recipe. Bump it whenever Recipe changes shape or validation, so rows
+# written under an older schema are re-validated on read instead of served verbatim.
+RECIPE_SCHEMA_VERSION = 1
+
 
 class RecipeRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
@@ -36,6 +40,10 @@ class CookMode(BaseModel):
     ingredients_checklist: list[RecipeIngredient]
     step_cards: list[str]
 
+    @classmethod
+    def derive(cls, ingredients: list[RecipeIngredient], steps: list[RecipeStep]) -> "CookMode":
+        return cls(ingredients_checklist=ingredients, step_cards=[step.text for step in steps])
+
 
 class Recipe(BaseModel):
     model_config = ConfigDict(extra="forbid")
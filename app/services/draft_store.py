@@ -0,0 +1,172 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import UTC, datetime
+from typing import Protocol
+
+from app.core.config import get_settings
+from app.db.group_commit import run_write
+from app.db.sqlite import get_conn, to_epoch_us
+from app.schemas.recipe import RECIPE_SCHEMA_VERSION, Recipe
+from app.services.recipe_cache import CachedRecipe
+
+draft_store_counters: dict[str, int] = {
+    "stores": 0,
+    "hits": 0,
+    "misses": 0,
+    "expired": 0,
+    "evictions": 0,
+}
+
+
+class DraftStore(Protocol):
+    async def put(self, recipe: Recipe) -> None: ...
+
+    def get(self, recipe_id: str) -> CachedRecipe | None: ...
+
+    async def discard(self, recipe_id: str) -> None: ...
+
+
+class MemoryDraftStore:
+    """Generated recipes awaiting a save, bounded by count and expired after ttl_seconds."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, CachedRecipe]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def put(self, recipe: Recipe) -> None:
+        now = time.monotonic()
+        entry = CachedRecipe(recipe.model_dump_json().encode(), recipe)
+        with self._lock:
+            self._entries[recipe.id] = (now + self.ttl_seconds, entry)
+            self._entries.move_to_end(recipe.id)
+            # Entries are kept in expiry order, so expired drafts are always at the front.
+            while self._entries:
+                oldest_id, (expires_at, _) = next(iter(self._entries.items()))
+                if expires_at > now and len(self._entries) <= self.max_entries:
+                    break
+                del self._entries[oldest_id]
+                if expires_at > now:
+                    draft_store_counters["evictions"] += 1
+                else:
+                    draft_store_counters["expired"] += 1
+        draft_store_counters["stores"] += 1
+
+    def get(self, recipe_id: str) -> CachedRecipe | None:
+        with self._lock:
+            entry = self._entries.get(recipe_id)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[recipe_id]
+                draft_store_counters["expired"] += 1
+                entry = None
+        if entry is None:
+            draft_store_counters["misses"] += 1
+            return None
+        draft_store_counters["hits"] += 1
+        return entry[1]
+
+    async def discard(self, recipe_id: str) -> None:
+        with self._lock:
+            self._entries.pop(recipe_id, None)
+
+
+class SQLiteDraftStore:
+    """Drafts in the recipe database, so any worker can save a draft another one generated.
+
+    Writes go through the group-commit writer, and each put trims the table to max_entries
+    drafts, oldest first. Drafts stored under the current RECIPE_SCHEMA_VERSION are returned
+    as trusted JSON, validated only if a caller needs the model.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+    async def put(self, recipe: Recipe) -> None:
+        recipe_json = recipe.model_dump_json()
+
+        def write(conn: sqlite3.Connection) -> tuple[int, int]:
+            now_us = to_epoch_us(datetime.now(UTC))
+            expired = conn.execute(
+                "DELETE FROM recipe_drafts WHERE expires_at_us <= ?", (now_us,)
+            ).rowcount
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO recipe_drafts (
+                    id, recipe_json, expires_at_us, schema_version
+                )
+                VALUES (?, ?, ?, ?)
+                """,
+                (
+                    recipe.id,
+                    recipe_json,
+                    now_us + int(self.ttl_seconds * 1_000_000),
+                    RECIPE_SCHEMA_VERSION,
+                ),
+            )
+            # Every draft gets the same TTL, so the newest expire last; keep max_entries.
+            evicted = conn.execute(
+                """
+                DELETE FROM recipe_drafts
+                WHERE expires_at_us <= (
+                    SELECT expires_at_us FROM recipe_drafts
+                    ORDER BY expires_at_us DESC
+                    LIMIT 1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            ).rowcount
+            return expired, evicted
+
+        expired, evicted = await run_write(write)
+        draft_store_counters["expired"] += max(expired, 0)
+        draft_store_counters["evictions"] += max(evicted, 0)
+        draft_store_counters["stores"] += 1
+
+    def get(self, recipe_id: str) -> CachedRecipe | None:
+        with get_conn() as conn:
+            row = conn.execute(
+                """
+                SELECT recipe_json, schema_version FROM recipe_drafts
+                WHERE id = ? AND expires_at_us > ?
+                """,
+                (recipe_id, to_epoch_us(datetime.now(UTC))),
+            ).fetchone()
+        if row is None:
+            draft_store_counters["misses"] += 1
+            return None
+        draft_store_counters["hits"] += 1
+        recipe_json = str(row["recipe_json"]).encode()
+        if row["schema_version"] == RECIPE_SCHEMA_VERSION:
+            return CachedRecipe(recipe_json)
+        recipe = Recipe.model_validate_json(recipe_json)
+        return CachedRecipe(recipe.model_dump_json().encode(), recipe)
+
+    async def discard(self, recipe_id: str) -> None:
+        await run_write(
+            lambda conn: conn.execute("DELETE FROM recipe_drafts WHERE id = ?", (recipe_id,))
+        )
+
+
+_stores: dict[tuple[str, int, float], DraftStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_draft_store() -> DraftStore:
+    settings = get_settings()
+    config = (settings.draft_store, settings.draft_store_size, settings.draft_ttl_seconds)
+    with _stores_lock:
+        store = _stores.get(config)
+        if store is None:
+            if settings.draft_store == "sqlite":
+                store = SQLiteDraftStore(settings.draft_store_size, settings.draft_ttl_seconds)
+            else:
+                store = MemoryDraftStore(settings.draft_store_size, settings.draft_ttl_seconds)
+            _stores[config] = store
+    return store
@@ -25,10 +25,7 @@ class StubRecipeGenerator:
             f"Use any available alternative for {name}." for name in ingredient_names[:2]
         ]
 
-        cook_mode = CookMode(
-            ingredients_checklist=ingredients,
-            step_cards=[step.text for step in steps],
-        )
+        cook_mode = CookMode.derive(ingredients, steps)
         summary_ingredients = ", ".join(ingredient_names[:2])
         dish_summary = (
             f"A {title_theme.lower()} dish featuring {summary_ingredients} with straightforward prep."
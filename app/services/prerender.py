@@ -0,0 +1,176 @@
+"""On-disk cache of rendered recipe pages.
+
+Each file holds the HTML of one page (``detail`` for /recipes/ui/{id}, ``cook`` for
+/cook/{id}) under a name made from the recipe id and the page's ETag. A request whose ETag
+has a file is answered straight from disk; anything that changes the page (a note, a new
+recipe for the similar panel, a template deploy) changes the ETag, so a stale file is never
+served, only replaced. Files are written atomically, and a background thread re-renders pages
+after saves and notes so the next view finds them ready.
+"""
+
+import logging
+import os
+import queue
+import threading
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.core.assets import write_atomic
+from app.core.config import get_settings
+from app.core.http_cache import content_hash
+from app.db.sqlite import get_db_path
+
+logger = logging.getLogger(__name__)
+
+PAGE_KINDS = ("detail", "cook")
+
+prerender_counters = {
+    "hits": 0,
+    "misses": 0,
+    "writes": 0,
+    "scheduled": 0,
+    "rendered": 0,
+    "errors": 0,
+}
+
+_STOP = object()
+
+
+class PrerenderStore:
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def _key(self, recipe_id: str) -> str:
+        return content_hash(recipe_id.encode())
+
+    def _path(self, kind: str, recipe_id: str, etag: str) -> Path:
+        version = content_hash(etag.encode())[:16]
+        return self.directory / kind / f"{self._key(recipe_id)}.{version}.html"
+
+    def read(self, kind: str, recipe_id: str, etag: str) -> bytes | None:
+        try:
+            body = self._path(kind, recipe_id, etag).read_bytes()
+        except OSError:
+            prerender_counters["misses"] += 1
+            return None
+        prerender_counters["hits"] += 1
+        return body
+
+    def write(self, kind: str, recipe_id: str, etag: str, body: bytes) -> None:
+        path = self._path(kind, recipe_id, etag)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, body)
+        prerender_counters["writes"] += 1
+        # Older versions of the page can never be served again.
+        for stale in path.parent.glob(f"{self._key(recipe_id)}.*.html"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+
+    def clear(self) -> int:
+        removed = 0
+        for kind in PAGE_KINDS:
+            for path in (self.directory / kind).glob("*.html"):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        files = sum(len(list((self.directory / kind).glob("*.html"))) for kind in PAGE_KINDS)
+        return {
+            "enabled": True,
+            "directory": str(self.directory),
+            "files": files,
+            "worker": _worker is not None,
+            **prerender_counters,
+        }
+
+
+@lru_cache
+def _store_for(directory: str) -> PrerenderStore:
+    return PrerenderStore(Path(directory))
+
+
+def get_prerender_store() -> PrerenderStore | None:
+    settings = get_settings()
+    if not settings.prerender:
+        return None
+    # Next to the database by default, so each database gets its own pages.
+    directory = settings.prerender_dir or os.path.join(
+        os.path.dirname(get_db_path()) or ".", "prerendered"
+    )
+    return _store_for(directory)
+
+
+PageRenderer = Callable[[PrerenderStore, str], object]
+
+
+class PrerenderWorker:
+    """One thread that re-renders the pages of queued recipe ids.
+
+    Ids already waiting are not queued twice, so a burst of notes on one recipe renders its
+    pages once or twice rather than once per note.
+    """
+
+    def __init__(self, store: PrerenderStore, render: PageRenderer) -> None:
+        self.store = store
+        self.render = render
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="prerender", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def schedule(self, recipe_id: str) -> None:
+        with self._lock:
+            if recipe_id in self._pending:
+                return
+            self._pending.add(recipe_id)
+        prerender_counters["scheduled"] += 1
+        self._queue.put(recipe_id)
+
+    def _run(self) -> None:
+        while (recipe_id := self._queue.get()) is not _STOP:
+            with self._lock:
+                self._pending.discard(recipe_id)
+            try:
+                self.render(self.store, recipe_id)
+                prerender_counters["rendered"] += 1
+            except Exception as exc:
+                prerender_counters["errors"] += 1
+                logger.warning(
+                    "prerender",
+                    extra={"outcome": "failure", "error_class": exc.__class__.__name__},
+                )
+
+
+_worker: PrerenderWorker | None = None
+
+
+def start_prerender(render: PageRenderer) -> None:
+    global _worker
+    store = get_prerender_store()
+    if _worker is None and store is not None:
+        _worker = PrerenderWorker(store, render)
+        _worker.start()
+
+
+def stop_prerender() -> None:
+    global _worker
+    worker, _worker = _worker, None
+    if worker is not None:
+        worker.stop()
+
+
+def schedule_prerender(recipe_id: str) -> None:
+    # Without a running worker (scripts, tests without the lifespan) pages are written the
+    # first time they are viewed instead.
+    if _worker is not None:
+        _worker.schedule(recipe_id)
@@ -0,0 +1,48 @@
+"""Rebuild the pre-rendered detail and cook page of every saved recipe.
+
+Run after a deploy that changes templates or static assets: the old files no longer match
+any page ETag, so without a rebuild each page would be rendered again on its first view.
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any
+
+from app.api.ui import render_recipe_pages
+from app.db.sqlite import get_conn, init_db
+from app.services.prerender import PrerenderStore, get_prerender_store
+
+
+def rebuild_site(store: PrerenderStore, clear: bool = False) -> dict[str, Any]:
+    start = time.perf_counter()
+    removed = store.clear() if clear else 0
+    with get_conn() as conn:
+        recipe_ids = [row["id"] for row in conn.execute("SELECT id FROM recipes ORDER BY id")]
+    pages = sum(render_recipe_pages(store, recipe_id) for recipe_id in recipe_ids)
+    return {
+        "recipes": len(recipe_ids),
+        "pages": pages,
+        "removed": removed,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.services.prerender_site")
+    parser.add_argument(
+        "--clear", action="store_true", help="delete every pre-rendered page before rebuilding"
+    )
+    args = parser.parse_args(argv)
+
+    store = get_prerender_store()
+    if store is None:
+        parser.error("pre-rendering is disabled (PRERENDER=0)")
+    init_db()
+    json.dump({"directory": str(store.directory), **rebuild_site(store, args.clear)}, sys.stdout)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+import hashlib
+import logging
+import sqlite3
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+from app.core.config import get_settings
+from app.core.http_cache import content_hash
+from app.db.codec import decode_recipe_json
+from app.db.recipe_storage import unpack_recipe_json
+from app.db.sqlite import get_conn, get_db_path
+from app.schemas.recipe import RECIPE_SCHEMA_VERSION, Recipe
+
+logger = logging.getLogger(__name__)
+
+recipe_cache_counters = {
+    "hits": 0,
+    "shared_hits": 0,
+    "misses": 0,
+    "evictions": 0,
+    "invalidations": 0,
+    "shared_stores": 0,
+    "shared_oversized": 0,
+}
+
+
+class SharedRecipeTier:
+    """Fixed-slot shared-memory table of recipe JSON, shared by workers on one host.
+
+    Each key hashes to one slot. Writers bump the slot's sequence number to odd, write, then
+    bump it to even. Readers treat an odd or changed sequence, a different key or a CRC
+    mismatch as a miss, so racing writers in several processes cost a miss, never a torn read.
+    """
+
+    # sequence, crc32 of key + payload, key length, payload length
+    _HEADER = struct.Struct("<QIHI")
+    _SEQUENCE = struct.Struct("<Q")
+
+    def __init__(self, name: str, slots: int = 512, slot_size: int = 16 * 1024) -> None:
+        self.slots = slots
+        self.slot_size = slot_size
+        try:
+            self._memory = SharedMemory(name=name, create=True, size=slots * slot_size)
+        except FileExistsError:
+            self._memory = SharedMemory(name=name)
+            # Only the creating worker unlinks the segment at exit; attached workers keep
+            # their mapping, and later workers create a fresh segment under the same name.
+            resource_tracker.unregister(self._memory._name, "shared_memory")  # type: ignore[attr-defined]
+        buffer = self._memory.buf
+        if buffer is None:
+            raise ValueError("Shared memory segment is not mapped")
+        self._buffer = buffer
+        self._write_lock = threading.Lock()
+
+    def _slot_offset(self, key: bytes) -> int:
+        digest = hashlib.blake2b(key, digest_size=8).digest()
+        return int.from_bytes(digest, "little") % self.slots * self.slot_size
+
+    def get(self, key: str) -> bytes | None:
+        key_bytes = key.encode()
+        offset = self._slot_offset(key_bytes)
+        before, crc, key_length, payload_length = self._HEADER.unpack_from(self._buffer, offset)
+        if before % 2 or key_length != len(key_bytes):
+            return None
+        start = offset + self._HEADER.size
+        if payload_length > self.slot_size - self._HEADER.size - key_length:
+            return None
+        stored_key = bytes(self._buffer[start : start + key_length])
+        payload = bytes(
+            self._buffer[start + key_length : start + key_length + payload_length]
+        )
+        (after,) = self._SEQUENCE.unpack_from(self._buffer, offset)
+        if after != before or stored_key != key_bytes:
+            return None
+        if zlib.crc32(payload, zlib.crc32(stored_key)) != crc:
+            return None
+        return payload
+
+    def _write(self, offset: int, key_bytes: bytes, payload: bytes) -> None:
+        with self._write_lock:
+            (sequence,) = self._SEQUENCE.unpack_from(self._buffer, offset)
+            sequence += 1 if sequence % 2 == 0 else 0
+            self._SEQUENCE.pack_into(self._buffer, offset, sequence)
+            start = offset + self._HEADER.size
+            self._buffer[start : start + len(key_bytes)] = key_bytes
+            self._buffer[start + len(key_bytes) : start + len(key_bytes) + len(payload)] = payload
+            self._HEADER.pack_into(
+                self._buffer,
+                offset,
+                sequence + 1,
+                zlib.crc32(payload, zlib.crc32(key_bytes)),
+                len(key_bytes),
+                len(payload),
+            )
+
+    def put(self, key: str, payload: bytes) -> bool:
+        key_bytes = key.encode()
+        if len(key_bytes) + len(payload) > self.slot_size - self._HEADER.size:
+            return False
+        self._write(self._slot_offset(key_bytes), key_bytes, payload)
+        return True
+
+    def invalidate(self, key: str) -> None:
+        if self.get(key) is not None:
+            self._write(self._slot_offset(key.encode()), b"", b"")
+
+    def close(self) -> None:
+        self._buffer = memoryview(b"")
+        self._memory.close()
+
+
+class CachedRecipe:
+    """Trusted recipe JSON; the Recipe model is only validated when a caller needs it.
+
+    ``stored_hash`` is the ``recipes.content_hash`` of the row the JSON was read from, so
+    callers can tell which version of the recipe they hold.
+    """
+
+    __slots__ = ("recipe_json", "stored_hash", "_recipe", "_content_hash")
+
+    def __init__(self, recipe_json: bytes, recipe: Recipe | None = None) -> None:
+        self.recipe_json = recipe_json
+        self.stored_hash: str | None = None
+        self._recipe = recipe
+        self._content_hash: str | None = None
+
+    @property
+    def recipe(self) -> Recipe:
+        if self._recipe is None:
+            self._recipe = Recipe.model_validate_json(self.recipe_json)
+        return self._recipe
+
+    @property
+    def content_hash(self) -> str:
+        if self._content_hash is None:
+            self._content_hash = content_hash(self.recipe_json)
+        return self._content_hash
+
+
+class RecipeCache:
+    """Bounded LRU of recipe entries, optionally backed by a shared-memory tier.
+
+    It also remembers which content hash each cached recipe id currently has. That map is
+    only trusted until the next commit to the database (see ``known_version``), so a recipe
+    replaced by another worker is looked up again rather than served stale.
+    """
+
+    def __init__(self, max_entries: int, shared: SharedRecipeTier | None = None) -> None:
+        self.max_entries = max_entries
+        self.shared = shared
+        self._entries: OrderedDict[str, CachedRecipe] = OrderedDict()
+        self._versions: dict[str, str] = {}
+        self._signature: bytes | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CachedRecipe | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                recipe_cache_counters["hits"] += 1
+                return entry
+
+        if self.shared is not None:
+            payload = self.shared.get(key)
+            if payload is not None:
+                entry = CachedRecipe(payload)
+                self._store_local(key, entry)
+                recipe_cache_counters["shared_hits"] += 1
+                return entry
+
+        recipe_cache_counters["misses"] += 1
+        return None
+
+    def _store_local(self, key: str, entry: CachedRecipe) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                version_key, _, stored_hash = evicted_key.rpartition("\x00")
+                if self._versions.get(version_key) == stored_hash:
+                    del self._versions[version_key]
+                recipe_cache_counters["evictions"] += 1
+
+    def put(self, key: str, entry: CachedRecipe) -> None:
+        self._store_local(key, entry)
+        if self.shared is not None:
+            if self.shared.put(key, entry.recipe_json):
+                recipe_cache_counters["shared_stores"] += 1
+            else:
+                recipe_cache_counters["shared_oversized"] += 1
+
+    def known_version(self, version_key: str, signature: bytes | None) -> str | None:
+        """The remembered content hash, or None once the database has changed."""
+        with self._lock:
+            if signature is None or signature != self._signature:
+                # Any worker may have replaced any recipe; revalidate each one on next read.
+                self._versions.clear()
+                self._signature = signature
+                return None
+            return self._versions.get(version_key)
+
+    def remember_version(self, version_key: str, stored_hash: str, signature: bytes | None) -> None:
+        """Record a recipe's content hash, read after the database matched ``signature``."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if signature is not None and signature == self._signature:
+                self._versions[version_key] = stored_hash
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.shared is not None:
+            self.shared.invalidate(key)
+        recipe_cache_counters["invalidations"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        lookups = (
+            recipe_cache_counters["hits"]
+            + recipe_cache_counters["shared_hits"]
+            + recipe_cache_counters["misses"]
+        )
+        hits = recipe_cache_counters["hits"] + recipe_cache_counters["shared_hits"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "shared": self.shared is not None,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            **recipe_cache_counters,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
+
+
+_WAL_INDEX_HEADER_SIZE = 48
+
+_caches: dict[tuple[int, str | None], RecipeCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_recipe_cache() -> RecipeCache:
+    settings = get_settings()
+    config = (settings.recipe_cache_size, settings.recipe_cache_shared_name)
+    with _caches_lock:
+        cache = _caches.get(config)
+        if cache is None:
+            shared = None
+            if settings.recipe_cache_shared_name:
+                try:
+                    shared = SharedRecipeTier(settings.recipe_cache_shared_name)
+                except (OSError, ValueError) as exc:
+                    logger.warning(
+                        "recipe_cache_shared_tier",
+                        extra={"outcome": "disabled", "error_class": exc.__class__.__name__},
+                    )
+            cache = RecipeCache(settings.recipe_cache_size, shared)
+            _caches[config] = cache
+    return cache
+
+
+def close_recipe_caches() -> None:
+    with _caches_lock:
+        caches = list(_caches.values())
+        _caches.clear()
+    for cache in caches:
+        cache.close()
+
+
+def _version_key(recipe_id: str) -> str:
+    # Keyed by database too, so workers or tests pointed at different files never mix.
+    return f"{get_db_path()}\x00{recipe_id}"
+
+
+def _cache_key(recipe_id: str, stored_hash: str) -> str:
+    # The row's content hash is part of the key: once another worker replaces a recipe, its
+    # old entries here can no longer be found and simply age out of the LRU.
+    return f"{_version_key(recipe_id)}\x00{stored_hash}"
+
+
+def _database_signature() -> bytes | None:
+    # The wal-index header at the start of the -shm file changes with every commit by any
+    # connection in any process (https://www.sqlite.org/walformat.html). Reading it is a
+    # plain file read, far cheaper than a query.
+    try:
+        with open(f"{get_db_path()}-shm", "rb") as shm:
+            return shm.read(_WAL_INDEX_HEADER_SIZE)
+    except OSError:
+        return None
+
+
+def load_recipe_entry(recipe_id: str, stored_hash: str | None = None) -> CachedRecipe | None:
+    """The current version of a recipe, from the cache when it holds that version.
+
+    Pass the ``recipes.content_hash`` a caller has already read to skip looking it up. If
+    the row has changed since, the newer version is returned; check ``entry.stored_hash``.
+    Without a hash, a recipe cached since the database last changed is served without
+    touching SQLite.
+    """
+    cache = get_recipe_cache()
+    version_key = _version_key(recipe_id)
+    # Taken before any read, so a write racing with this lookup changes it for the next one.
+    signature = _database_signature()
+    if stored_hash is None:
+        stored_hash = cache.known_version(version_key, signature)
+        if stored_hash is None:
+            with get_conn() as conn:
+                row = conn.execute(
+                    "SELECT content_hash FROM recipes WHERE id = ?", (recipe_id,)
+                ).fetchone()
+            if row is None:
+                return None
+            stored_hash = str(row["content_hash"])
+            cache.remember_version(version_key, stored_hash, signature)
+
+    entry = cache.get(_cache_key(recipe_id, stored_hash))
+    if entry is not None:
+        # Entries copied from the shared tier only carry the JSON; the key names the version.
+        entry.stored_hash = stored_hash
+        return entry
+
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT recipe_json, schema_version, content_hash FROM recipes WHERE id = ?",
+            (recipe_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        entry = entry_from_row(conn, row["recipe_json"], row["schema_version"])
+    entry.stored_hash = str(row["content_hash"])
+    cache.put(_cache_key(recipe_id, entry.stored_hash), entry)
+    cache.remember_version(version_key, entry.stored_hash, signature)
+    return entry
+
+
+def entry_from_row(
+    conn: sqlite3.Connection, stored_json: str | bytes, schema_version: int
+) -> CachedRecipe:
+    # Rows omit a derived cook_mode; the rebuilt JSON is what callers (and the cache) see.
+    recipe_json = unpack_recipe_json(decode_recipe_json(conn, get_db_path(), stored_json))
+    if schema_version == RECIPE_SCHEMA_VERSION:
+        # Written by save_recipe from a validated model under the current schema.
+        return CachedRecipe(recipe_json)
+    recipe = Recipe.model_validate_json(recipe_json)
+    return CachedRecipe(recipe.model_dump_json().encode(), recipe)
+
+
+def load_recipe(recipe_id: str) -> Recipe | None:
+    entry = load_recipe_entry(recipe_id)
+    return entry.recipe if entry is not None else None
+
+
+def store_recipe(recipe: Recipe, recipe_json: str) -> None:
+    # save_recipe stores content_hash(recipe_json) in the row, which is this entry's hash.
+    entry = CachedRecipe(recipe_json.encode(), recipe)
+    entry.stored_hash = entry.content_hash
+    get_recipe_cache().put(_cache_key(recipe.id, entry.stored_hash), entry)
@@ -0,0 +1,329 @@
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from operator import itemgetter
+from pathlib import Path
+from typing import Any
+
+from app.db.ingredients import normalize_ingredient
+from app.db.sqlite import get_conn, get_db_path
+from app.schemas.recipe import Recipe
+
+logger = logging.getLogger(__name__)
+
+_TITLE_TOKEN = re.compile(r"[^\W\d_]{3,}")
+_TITLE_STOPWORDS = frozenset({"recipe", "with", "and", "the", "for"})
+_INGREDIENT_WEIGHT = 1.0
+_TITLE_WEIGHT = 0.5
+
+similarity_counters = {
+    "queries": 0,
+    "loads": 0,
+    "persists": 0,
+    "caught_up_docs": 0,
+}
+
+
+def recipe_features(title: str, ingredient_names: list[str]) -> dict[str, float]:
+    features = {f"i:{name}": _INGREDIENT_WEIGHT for name in ingredient_names if name}
+    for token in _TITLE_TOKEN.findall(title.lower()):
+        if token not in _TITLE_STOPWORDS:
+            features[f"t:{token}"] = _TITLE_WEIGHT
+    return features
+
+
+class SimilarityIndex:
+    """Sparse ingredient/title vectors with an inverted index for top-k cosine search.
+
+    Vectors are keyed by ``recipes.doc_id``. The on-disk snapshot records the highest doc_id
+    it covers, so anything saved after the last snapshot (including by other workers) is
+    caught up from SQLite instead of being lost.
+    """
+
+    _FORMAT_VERSION = 1
+    _PERSIST_EVERY = 50
+    # In large indexes, features shared by more than this fraction of recipes (salt, oil, a
+    # theme word) are left out of candidate generation and only used when rescoring.
+    _MAX_POSTING_SHARE = 0.05
+    _MIN_DOCS_FOR_SKIP = 1000
+    _MIN_RESCORE_CANDIDATES = 100
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.last_doc_id = 0
+        self._vectors: dict[int, dict[str, float]] = {}
+        self._norms: dict[int, float] = {}
+        self._postings: defaultdict[str, dict[int, float]] = defaultdict(dict)
+        self._unsaved = 0
+        self._lock = threading.RLock()
+        self._persist_lock = threading.Lock()
+        self._persist_pending = False
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    @property
+    def has_unsaved_changes(self) -> bool:
+        return self._unsaved > 0
+
+    def add(self, doc_id: int, features: dict[str, float]) -> None:
+        with self._lock:
+            self._add(doc_id, features)
+            self.last_doc_id = max(self.last_doc_id, doc_id)
+
+    def add_saved(self, doc_id: int, features: dict[str, float]) -> None:
+        """Adds a recipe this worker just saved, without asking SQLite what else is new.
+
+        ``last_doc_id`` only moves when the new doc_id directly follows it. After a gap (saves
+        by other workers) it stays put, so the next query's catch-up still reads those rows.
+        """
+        with self._lock:
+            self._add(doc_id, features)
+            if doc_id == self.last_doc_id + 1:
+                self.last_doc_id = doc_id
+
+    def _add(self, doc_id: int, features: dict[str, float]) -> None:
+        self._remove(doc_id)
+        self._vectors[doc_id] = features
+        self._norms[doc_id] = math.sqrt(sum(weight * weight for weight in features.values()))
+        for feature, weight in features.items():
+            self._postings[feature][doc_id] = weight
+        self._unsaved += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.last_doc_id = 0
+            self._vectors.clear()
+            self._norms.clear()
+            self._postings.clear()
+            self._unsaved = 0
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            if doc_id in self._vectors:
+                self._remove(doc_id)
+                self._unsaved += 1
+
+    def _remove(self, doc_id: int) -> None:
+        previous = self._vectors.pop(doc_id, None)
+        if previous is None:
+            return
+        self._norms.pop(doc_id, None)
+        for feature in previous:
+            posting = self._postings.get(feature)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[feature]
+
+    def most_similar(self, doc_id: int, k: int) -> list[tuple[int, float]]:
+        with self._lock:
+            query = self._vectors.get(doc_id)
+            query_norm = self._norms.get(doc_id, 0.0)
+            if not query or not query_norm:
+                return []
+
+            postings = [(feature, self._postings.get(feature, {})) for feature in query]
+            if len(self._vectors) >= self._MIN_DOCS_FOR_SKIP:
+                rare_limit = len(self._vectors) * self._MAX_POSTING_SHARE
+                rare = [item for item in postings if len(item[1]) <= rare_limit]
+                postings = rare or postings
+
+            partial: defaultdict[int, float] = defaultdict(float)
+            for feature, posting in postings:
+                weight = query[feature]
+                for other_id, other_weight in posting.items():
+                    partial[other_id] += weight * other_weight
+            partial.pop(doc_id, None)
+
+            # Candidates come from the rare features only; the best of them are rescored
+            # exactly against the full vectors so common features still count.
+            candidates = heapq.nlargest(
+                max(k * 10, self._MIN_RESCORE_CANDIDATES), partial.items(), key=itemgetter(1)
+            )
+            scored = []
+            for other_id, _ in candidates:
+                other = self._vectors[other_id]
+                dot = sum(weight * other.get(feature, 0.0) for feature, weight in query.items())
+                scored.append((dot / (query_norm * self._norms[other_id]), other_id))
+            ranked = heapq.nlargest(k, scored)
+        return [(other_id, cosine) for cosine, other_id in ranked]
+
+    def catch_up(self, conn: sqlite3.Connection) -> int:
+        rows = conn.execute(
+            """
+            SELECT recipes.doc_id, recipes.title, recipe_ingredients.name
+            FROM recipes
+            LEFT JOIN recipe_ingredients ON recipe_ingredients.recipe_id = recipes.id
+            WHERE recipes.doc_id > ?
+            ORDER BY recipes.doc_id
+            """,
+            (self.last_doc_id,),
+        ).fetchall()
+        grouped: dict[int, tuple[str, list[str]]] = {}
+        for row in rows:
+            title, names = grouped.setdefault(int(row["doc_id"]), (str(row["title"]), []))
+            if row["name"] is not None:
+                names.append(str(row["name"]))
+        for doc_id, (title, names) in grouped.items():
+            self.add(doc_id, recipe_features(title, names))
+        similarity_counters["caught_up_docs"] += len(grouped)
+        return len(grouped)
+
+    def load(self) -> None:
+        try:
+            payload = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            logger.warning(
+                "similarity_index_load",
+                extra={"outcome": "rebuild", "error_class": exc.__class__.__name__},
+            )
+            return
+        if payload.get("version") != self._FORMAT_VERSION:
+            return
+        for doc_id, features in payload["vectors"].items():
+            self.add(int(doc_id), dict(features))
+        self.last_doc_id = int(payload["last_doc_id"])
+        self._unsaved = 0
+        similarity_counters["loads"] += 1
+
+    def persist(self) -> None:
+        with self._persist_lock:
+            with self._lock:
+                payload: dict[str, Any] = {
+                    "version": self._FORMAT_VERSION,
+                    "last_doc_id": self.last_doc_id,
+                    "vectors": {
+                        str(doc_id): features for doc_id, features in self._vectors.items()
+                    },
+                }
+                self._unsaved = 0
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(payload, separators=(",", ":")))
+            os.replace(tmp_path, self.path)
+            similarity_counters["persists"] += 1
+
+    def persist_if_needed(self) -> None:
+        # The snapshot grows with the library, so it is written on its own thread rather than
+        # in the request (and event loop) that happened to make the 50th change.
+        with self._lock:
+            if self._unsaved < self._PERSIST_EVERY or self._persist_pending:
+                return
+            self._persist_pending = True
+        threading.Thread(
+            target=self._persist_in_background, name="similarity-snapshot", daemon=True
+        ).start()
+
+    def _persist_in_background(self) -> None:
+        try:
+            self.persist()
+        except Exception as exc:
+            logger.warning(
+                "similarity_index_persist",
+                extra={"outcome": "failure", "error_class": exc.__class__.__name__},
+            )
+        finally:
+            with self._lock:
+                self._persist_pending = False
+
+
+_indexes: dict[str, SimilarityIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def similarity_index_path(db_path: str) -> Path:
+    return Path(f"{db_path}.similarity.json")
+
+
+def _loaded_index() -> SimilarityIndex:
+    db_path = get_db_path()
+    with _indexes_lock:
+        index = _indexes.get(db_path)
+        if index is None:
+            index = SimilarityIndex(similarity_index_path(db_path))
+            index.load()
+            _indexes[db_path] = index
+    return index
+
+
+def get_similarity_index(conn: sqlite3.Connection | None = None) -> SimilarityIndex:
+    index = _loaded_index()
+    if conn is None:
+        with get_conn() as own_conn:
+            _catch_up_if_behind(index, own_conn)
+    else:
+        _catch_up_if_behind(index, conn)
+    return index
+
+
+def _catch_up_if_behind(index: SimilarityIndex, conn: sqlite3.Connection) -> None:
+    newest = int(conn.execute("SELECT COALESCE(MAX(doc_id), 0) FROM recipes").fetchone()[0])
+    if newest < index.last_doc_id:
+        # The snapshot is ahead of the database, so it belongs to a database that was replaced.
+        index.reset()
+    if newest > index.last_doc_id:
+        index.catch_up(conn)
+
+
+def add_recipe_to_index(doc_id: int, recipe: Recipe) -> None:
+    # No catch-up here: saves stay free of index queries, and queries catch up themselves.
+    index = _loaded_index()
+    index.add_saved(
+        doc_id,
+        recipe_features(
+            recipe.title, [normalize_ingredient(item.name) for item in recipe.ingredients]
+        ),
+    )
+    index.persist_if_needed()
+
+
+def remove_recipes_from_index(doc_ids: list[int]) -> None:
+    # Other workers keep a removed vector until their next rebuild; similar_recipes drops
+    # doc_ids that no longer exist, so it only costs them a result slot.
+    index = _loaded_index()
+    for doc_id in doc_ids:
+        index.remove(doc_id)
+    index.persist_if_needed()
+
+
+def similar_recipes(recipe_id: str, limit: int) -> list[dict[str, Any]]:
+    similarity_counters["queries"] += 1
+    with get_conn() as conn:
+        row = conn.execute("SELECT doc_id FROM recipes WHERE id = ?", (recipe_id,)).fetchone()
+        if row is None:
+            return []
+        index = get_similarity_index(conn)
+        neighbours = index.most_similar(int(row["doc_id"]), limit)
+        if not neighbours:
+            return []
+
+        placeholders = ", ".join("?" for _ in neighbours)
+        titles = {
+            int(item["doc_id"]): (str(item["id"]), str(item["title"]))
+            for item in conn.execute(
+                f"SELECT doc_id, id, title FROM recipes WHERE doc_id IN ({placeholders})",
+                [doc_id for doc_id, _ in neighbours],
+            ).fetchall()
+        }
+
+    return [
+        {"id": titles[doc_id][0], "title": titles[doc_id][1], "score": round(score, 4)}
+        for doc_id, score in neighbours
+        if doc_id in titles
+    ]
+
+
+def persist_similarity_indexes() -> None:
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        if index.has_unsaved_changes:
+            index.persist()
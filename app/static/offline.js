@@ -0,0 +1,29 @@
+(() => {
+  if (!("serviceWorker" in navigator)) {
+    return;
+  }
+
+  const prefetch = (worker) => {
+    const urls = Array.from(document.querySelectorAll("[data-offline-prefetch]")).flatMap(
+      (element) => (element.dataset.offlinePrefetch || "").split(" ").filter(Boolean),
+    );
+    if (urls.length) {
+      worker.postMessage({ type: "prefetch", urls });
+    }
+    if (document.querySelector("[data-offline-recent]")) {
+      worker.postMessage({ type: "prefetch-recent" });
+    }
+  };
+
+  window.addEventListener("load", () => {
+    navigator.serviceWorker
+      .register("/sw.js")
+      .then(() => navigator.serviceWorker.ready)
+      .then((registration) => {
+        if (registration.active) {
+          prefetch(registration.active);
+        }
+      })
+      .catch(() => undefined);
+  });
+})();
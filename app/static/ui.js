@@ -17,3 +17,157 @@
     });
   });
 })();
+
+(() => {
+  const input = document.querySelector("[data-pantry-input]");
+  const hint = document.querySelector("[data-pantry-hint]");
+  if (!(input instanceof HTMLTextAreaElement) || !(hint instanceof HTMLElement)) {
+    return;
+  }
+
+  let timer = 0;
+  let latestRequest = 0;
+
+  const parseIngredients = (raw) =>
+    raw
+      .split(/[\n,]/)
+      .map((item) => item.trim())
+      .filter(Boolean);
+
+  const render = (results) => {
+    hint.replaceChildren();
+    if (!results.length) {
+      hint.hidden = true;
+      return;
+    }
+    const noun = results.length === 1 ? "recipe" : "recipes";
+    hint.append(`You already have ${results.length} saved ${noun} that fit: `);
+    results.slice(0, 3).forEach((recipe, i) => {
+      const link = document.createElement("a");
+      link.href = `/recipes/ui/${encodeURIComponent(recipe.id)}`;
+      link.textContent = recipe.title;
+      hint.append(i ? ", " : "", link);
+    });
+    hint.hidden = false;
+  };
+
+  const lookup = async () => {
+    const ingredients = parseIngredients(input.value);
+    const requestId = ++latestRequest;
+    if (!ingredients.length) {
+      render([]);
+      return;
+    }
+    try {
+      const resp = await fetch("/recipes/match", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ ingredients, min_coverage: 1, limit: 20 }),
+      });
+      if (!resp.ok || requestId !== latestRequest) {
+        return;
+      }
+      const body = await resp.json();
+      render(Array.isArray(body.results) ? body.results : []);
+    } catch (_error) {
+      render([]);
+    }
+  };
+
+  input.addEventListener("input", () => {
+    window.clearTimeout(timer);
+    timer = window.setTimeout(lookup, 300);
+  });
+})();
+
+(() => {
+  // Ask for just the changed fragment; any failure falls back to the plain form post or link.
+  const PARTIAL_HEADERS = { "X-Partial": "1" };
+
+  const parseFragment = async (resp) => {
+    const template = document.createElement("template");
+    template.innerHTML = await resp.text();
+    return template.content;
+  };
+
+  document.querySelectorAll("form[data-note-form]").forEach((form) => {
+    const submit = form.querySelector("button[type='submit']");
+    const idleLabel = submit?.textContent ?? "";
+
+    form.addEventListener("submit", async (event) => {
+      event.preventDefault();
+      try {
+        const resp = await fetch(form.action, {
+          method: "POST",
+          headers: PARTIAL_HEADERS,
+          body: new URLSearchParams(new FormData(form)),
+        });
+        if (!resp.ok) {
+          throw new Error(`note not saved: ${resp.status}`);
+        }
+        if (resp.status === 200) {
+          let list = document.querySelector("[data-note-list]");
+          if (!list) {
+            list = document.createElement("ul");
+            list.className = "note-list";
+            list.setAttribute("aria-label", "Saved notes");
+            list.dataset.noteList = "";
+            document.querySelector("[data-notes-empty]")?.replaceWith(list);
+          }
+          list.prepend(await parseFragment(resp));
+        }
+        form.reset();
+      } catch (_error) {
+        form.submit();
+        return;
+      }
+      if (submit instanceof HTMLButtonElement) {
+        submit.disabled = false;
+        submit.removeAttribute("aria-busy");
+        submit.textContent = idleLabel;
+      }
+    });
+  });
+
+  document.addEventListener("click", async (event) => {
+    const link = event.target instanceof Element ? event.target.closest("[data-load-more] a") : null;
+    const control = link?.closest("[data-load-more]");
+    const list = document.querySelector("[data-recipe-list]");
+    if (!(link instanceof HTMLAnchorElement) || !control || !list) {
+      return;
+    }
+    event.preventDefault();
+    link.setAttribute("aria-busy", "true");
+    try {
+      const resp = await fetch(link.href, { headers: PARTIAL_HEADERS });
+      if (!resp.ok) {
+        throw new Error(`page not loaded: ${resp.status}`);
+      }
+      const fragment = await parseFragment(resp);
+      const next = fragment.querySelector("[data-load-more]");
+      next?.remove();
+      list.append(fragment);
+      if (next) {
+        control.replaceWith(next);
+      } else {
+        control.remove();
+      }
+    } catch (_error) {
+      window.location.assign(link.href);
+    }
+  });
+
+  // The similar-recipes panel has its own URL and ETag; until it loads, or if it cannot,
+  // the placeholder link opens it as a page.
+  const similar = document.querySelector("[data-similar-panel]");
+  const similarLink = similar?.querySelector("a");
+  if (similar && similarLink instanceof HTMLAnchorElement) {
+    fetch(similarLink.href, { headers: PARTIAL_HEADERS })
+      .then(async (resp) => {
+        if (resp.ok) {
+          similar.replaceWith(await parseFragment(resp));
+        }
+      })
+      .catch(() => undefined);
+  }
+})();
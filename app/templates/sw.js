@@ -0,0 +1,137 @@
+// Rendered by GET /sw.js. VERSION changes with every template or static asset change, which
+// makes the browser install this worker again and drop caches built for the old pages.
+const VERSION = {{ version | tojson }};
+const SHELL_CACHE = `shell-${VERSION}`;
+const RECIPE_CACHE = `recipes-${VERSION}`;
+const SHELL_URLS = {{ shell_urls | tojson }};
+const PREFETCH_RECIPES = {{ prefetch_recipes | tojson }};
+// Cook pages and recipe JSON are answered from the cache at once and refreshed behind it.
+const STALE_WHILE_REVALIDATE = [
+  /^\/cook\/[^/]+$/,
+  /^\/recipes\/(?!ui$|search$|export$|match$)[^/]+$/,
+];
+const RECIPE_PAGE = /^\/recipes\/ui\/[^/]+$/;
+
+const prefetchRecent = async () => {
+  if (!PREFETCH_RECIPES) {
+    return;
+  }
+  const resp = await fetch(`/recipes?limit=${PREFETCH_RECIPES}`);
+  if (!resp.ok) {
+    return;
+  }
+  const recipes = await resp.json();
+  const cache = await caches.open(RECIPE_CACHE);
+  await Promise.all(
+    recipes.flatMap((recipe) => {
+      const id = encodeURIComponent(recipe.id);
+      return [`/cook/${id}`, `/recipes/${id}`].map(async (url) => {
+        if (!(await cache.match(url))) {
+          await cache.add(url).catch(() => undefined);
+        }
+      });
+    }),
+  );
+};
+
+const refresh = async (request, cache) => {
+  const resp = await fetch(request);
+  if (resp.ok) {
+    await cache.put(request, resp.clone());
+  }
+  return resp;
+};
+
+const staleWhileRevalidate = async (event) => {
+  const cache = await caches.open(RECIPE_CACHE);
+  const cached = await cache.match(event.request);
+  const network = refresh(event.request, cache);
+  if (cached) {
+    event.waitUntil(network.catch(() => undefined));
+    return cached;
+  }
+  return network;
+};
+
+const cacheFirst = async (request) => {
+  const cached = await caches.match(request);
+  if (cached) {
+    return cached;
+  }
+  return refresh(request, await caches.open(SHELL_CACHE));
+};
+
+const networkFirst = async (request) => {
+  const cache = await caches.open(RECIPE_CACHE);
+  try {
+    return await refresh(request, cache);
+  } catch (error) {
+    const cached = await caches.match(request);
+    if (cached) {
+      return cached;
+    }
+    // Offline and never opened: the saved-recipes list links to everything that is cached.
+    const fallback = await caches.match("/recipes/ui");
+    if (fallback && request.mode === "navigate") {
+      return fallback;
+    }
+    throw error;
+  }
+};
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches
+      .open(SHELL_CACHE)
+      .then((cache) => cache.addAll(SHELL_URLS))
+      .then(() => self.skipWaiting()),
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  const keep = new Set([SHELL_CACHE, RECIPE_CACHE]);
+  event.waitUntil(
+    caches
+      .keys()
+      .then((names) =>
+        Promise.all(names.filter((name) => !keep.has(name)).map((name) => caches.delete(name))),
+      )
+      .then(() => self.clients.claim())
+      .then(() => prefetchRecent().catch(() => undefined)),
+  );
+});
+
+self.addEventListener("message", (event) => {
+  const data = event.data || {};
+  if (data.type === "prefetch" && Array.isArray(data.urls)) {
+    event.waitUntil(
+      caches.open(RECIPE_CACHE).then((cache) =>
+        Promise.all(
+          data.urls
+            .filter((url) => STALE_WHILE_REVALIDATE.some((pattern) => pattern.test(url)))
+            .map((url) => cache.add(url).catch(() => undefined)),
+        ),
+      ),
+    );
+  } else if (data.type === "prefetch-recent") {
+    event.waitUntil(prefetchRecent().catch(() => undefined));
+  }
+});
+
+self.addEventListener("fetch", (event) => {
+  const { request } = event;
+  const url = new URL(request.url);
+  if (request.method !== "GET" || url.origin !== self.location.origin || url.search) {
+    return;
+  }
+  if (url.pathname.startsWith("/static/build/")) {
+    event.respondWith(cacheFirst(request));
+  } else if (STALE_WHILE_REVALIDATE.some((pattern) => pattern.test(url.pathname))) {
+    event.respondWith(staleWhileRevalidate(event));
+  } else if (
+    request.mode === "navigate" &&
+    (RECIPE_PAGE.test(url.pathname) || SHELL_URLS.includes(url.pathname))
+  ) {
+    event.respondWith(networkFirst(request));
+  }
+});
@@ -0,0 +1,57 @@
+"""Static asset bytes on the wire and requests per repeat page view.
+
+Usage: python -m benchmarks.bench_assets [repeats]
+
+For each built asset: bytes sent for Accept-Encoding identity, gzip and br (br is served as
+identity unless the optional brotli package was installed at build time), and median request
+time. A repeat view needs no asset requests while the hashed URLs are fresh; the old unhashed
+paths needed one conditional request per asset.
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+async def _run(app, urls: list[str], repeats: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'asset':<38} {'accept':<9} {'served':<9} {'wire bytes':>10} {'median ms':>10}")
+        for url in urls:
+            for encoding in ("identity", "gzip", "br"):
+                timings = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    resp = await client.get(url, headers={"Accept-Encoding": encoding})
+                    timings.append((time.perf_counter() - start) * 1000)
+                wire = resp.num_bytes_downloaded
+                served = resp.headers.get("content-encoding", "identity")
+                print(
+                    f"{url:<38} {encoding:<9} {served:<9} {wire:>10} "
+                    f"{statistics.median(timings):>10.2f}"
+                )
+        print(f"repeat view asset requests: hashed 0, unhashed {len(urls)}")
+
+
+def main() -> None:
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RECIPE_DB_PATH"] = os.path.join(tmp, "bench.db")
+        from app.core.assets import build_assets, get_asset_manifest
+        from app.db.sqlite import init_db
+        from app.main import app
+
+        build_assets()
+        get_asset_manifest.cache_clear()
+        init_db()
+        asyncio.run(_run(app, get_asset_manifest().urls(), repeats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Sequential POST /recipes calls against POST /recipes/batch, through the ASGI app.
+
+Usage: python -m benchmarks.bench_batch [recipe_count] [batch_size]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+from app.schemas.recipe import RecipeRequest
+from app.services.generator_stub import StubRecipeGenerator
+
+_INGREDIENTS = ["chicken", "spinach", "lemon", "garlic", "tomato", "basil", "rice", "beans"]
+
+
+def _payloads(prefix: str, count: int) -> list[dict]:
+    payloads = []
+    for index in range(count):
+        ingredients = [_INGREDIENTS[(index + offset) % len(_INGREDIENTS)] for offset in range(5)]
+        recipe = StubRecipeGenerator().generate(
+            RecipeRequest(theme=f"Bench {index}", ingredients=ingredients)
+        )
+        payloads.append(recipe.model_copy(update={"id": f"{prefix}-{index}"}).model_dump())
+    return payloads
+
+
+async def _run(app, count: int, batch_size: int) -> None:
+    sequential = _payloads("seq", count)
+    batched = _payloads("batch", count)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        for payload in sequential:
+            resp = await client.post("/recipes", json=payload)
+            assert resp.status_code == 200, resp.text
+        sequential_rate = count / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for offset in range(0, count, batch_size):
+            resp = await client.post("/recipes/batch", json=batched[offset : offset + batch_size])
+            assert resp.status_code == 200, resp.text
+        batch_rate = count / (time.perf_counter() - start)
+
+    print(f"sequential: {sequential_rate:8,.0f} recipes/s")
+    print(f"batch/{batch_size:<5} {batch_rate:8,.0f} recipes/s ({batch_rate / sequential_rate:.1f}x)")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RECIPE_DB_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ["SLOW_QUERY_THRESHOLD_MS"] = "60000"
+        from app.db.sqlite import init_db
+        from app.main import app
+
+        init_db()
+        asyncio.run(_run(app, count, batch_size))
+
+
+if __name__ == "__main__":
+    main()
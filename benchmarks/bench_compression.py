@@ -0,0 +1,67 @@
+"""Bytes on the wire and server time with and without response compression.
+
+Usage: python -m benchmarks.bench_compression [recipe_count] [repeats]
+
+Requests go straight to the ASGI app (see bench_list_memory), so the byte counts are the
+encoded body as sent. "gzip, cached" repeats a request whose ETag is unchanged, so the
+compressed body comes from the cache instead of the compressor.
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+
+from benchmarks.bench_list_memory import _request, _seed
+
+_ENCODINGS = (
+    ("identity", [(b"accept-encoding", b"identity")]),
+    ("gzip", [(b"accept-encoding", b"gzip")]),
+    ("br", [(b"accept-encoding", b"br")]),
+)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RECIPE_DB_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ["SLOW_QUERY_THRESHOLD_MS"] = "60000"
+        from app.core.compression import brotli_module, compression_counters
+        from app.db.sqlite import init_db
+        from app.main import app
+
+        init_db()
+        _seed(count, 0)
+        paths = (
+            ("detail page", "/recipes/ui/bench-0", b""),
+            ("cook page", "/cook/bench-0", b""),
+            ("recipe list", "/recipes", b""),
+            ("notes list", "/recipes/bench-0/notes", b""),
+            ("list stream", "/recipes", b"stream=true"),
+            ("export", "/recipes/export", b""),
+        )
+        encodings = _ENCODINGS if brotli_module() is not None else _ENCODINGS[:2]
+        print(f"{count} recipes, median of {repeats} requests")
+        print(f"{'response':<12} {'encoding':<14} {'bytes':>11} {'ratio':>6} {'median ms':>10}")
+        for label, path, query in paths:
+            baseline = None
+            for encoding, headers in encodings:
+                results = []
+                for _ in range(repeats):
+                    hits = compression_counters["cache_hits"]
+                    results.append(asyncio.run(_request(app, path, query, headers)))
+                cached = compression_counters["cache_hits"] > hits
+                sent = results[-1][0]
+                baseline = baseline or sent
+                median = statistics.median(result[2] for result in results)
+                name = f"{encoding}, cached" if cached else encoding
+                print(
+                    f"{label:<12} {name:<14} {sent:>11,} {baseline / sent:>6.1f} {median:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Requests, bytes and server time per UI interaction: full pages against X-Partial fragments.
+
+Usage: python -m benchmarks.bench_fragments [recipe_count] [repeats]
+
+- add note: the form post and its redirected detail page, against the one new list item
+- load more: the next saved-recipes page, against just its rows
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.bench_batch import _payloads
+
+
+async def _interaction(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> tuple:
+    start = time.perf_counter()
+    resp = await client.request(method, url, follow_redirects=True, **kwargs)
+    elapsed = (time.perf_counter() - start) * 1000
+    assert resp.status_code == 200, resp.text
+    responses = [*resp.history, resp]
+    return len(responses), sum(len(item.content) for item in responses), elapsed
+
+
+async def _run(app, count: int, repeats: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        payloads = _payloads("frag", count)
+        for offset in range(0, count, 500):
+            await client.post("/recipes/batch", json=payloads[offset : offset + 500])
+        note_url = "/recipes/ui/frag-0/notes"
+        cases = (
+            ("add note", "full", "POST", note_url, {}),
+            ("add note", "partial", "POST", note_url, {"X-Partial": "1"}),
+            ("load more", "full", "GET", "/recipes/ui?offset=50", {}),
+            ("load more", "partial", "GET", "/recipes/ui?offset=50", {"X-Partial": "1"}),
+        )
+        print(f"{'interaction':<11} {'mode':<8} {'requests':>8} {'bytes':>8} {'median ms':>10}")
+        for interaction, mode, method, url, headers in cases:
+            results = []
+            for index in range(repeats):
+                data = {"note_text": f"Bench note {index}"} if method == "POST" else None
+                results.append(await _interaction(client, method, url, data=data, headers=headers))
+            requests, size, _ = results[-1]
+            median = statistics.median(result[2] for result in results)
+            print(f"{interaction:<11} {mode:<8} {requests:>8} {size:>8} {median:>10.2f}")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RECIPE_DB_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ["SLOW_QUERY_THRESHOLD_MS"] = "60000"
+        from app.db.sqlite import init_db
+        from app.main import app
+
+        init_db()
+        asyncio.run(_run(app, count, repeats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Time GET /recipes/{id} through the ASGI app, before and after the raw JSON path.
+
+Usage: python -m benchmarks.bench_get_recipe [request_count]
+
+- before: replica of the previous handler (model_validate_json + response_model validation)
+- stale: rows at an old schema_version, validated once per read and re-serialized
+- raw: current rows, stored JSON bytes sent as-is
+- cached: raw plus the in-process recipe cache
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+from app.schemas.recipe import RecipeRequest
+from app.services.generator_stub import StubRecipeGenerator
+
+_RECIPES = 200
+_INGREDIENTS = [f"ingredient {index}" for index in range(15)]
+
+
+async def _measure(app, path: str, recipe_ids: list[str], count: int) -> list[float]:
+    timings = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for index in range(count):
+            t0 = time.perf_counter()
+            resp = await client.get(path.format(recipe_ids[index % len(recipe_ids)]))
+            timings.append((time.perf_counter() - t0) * 1000)
+            assert resp.status_code == 200
+    return timings
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    generator = StubRecipeGenerator()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RECIPE_DB_PATH"] = os.path.join(tmp, "bench.db")
+        from app.api.recipes import save_recipe
+        from app.core.config import get_settings
+        from app.db.codec import decode_recipe_json
+        from app.db.recipe_storage import unpack_recipe_json
+        from app.db.sqlite import get_conn, get_db_path, init_db
+        from app.main import app
+        from app.schemas.recipe import RECIPE_SCHEMA_VERSION, Recipe
+
+        @app.get("/bench/before/{recipe_id}", response_model=Recipe)
+        async def previous_get_recipe(recipe_id: str) -> Recipe:
+            with get_conn() as conn:
+                row = conn.execute(
+                    "SELECT recipe_json FROM recipes WHERE id = ?", (recipe_id,)
+                ).fetchone()
+                stored = decode_recipe_json(conn, get_db_path(), row["recipe_json"])
+            recipe_json = unpack_recipe_json(stored)
+            return Recipe.model_validate_json(recipe_json)
+
+        init_db()
+        recipe_ids = []
+        for index in range(_RECIPES):
+            recipe = generator.generate(
+                RecipeRequest(theme=f"Bench {index}", ingredients=_INGREDIENTS)
+            )
+            asyncio.run(save_recipe(recipe))
+            recipe_ids.append(recipe.id)
+
+        modes = (
+            ("before", "/bench/before/{}", RECIPE_SCHEMA_VERSION, "0"),
+            ("stale", "/recipes/{}", 0, "0"),
+            ("raw", "/recipes/{}", RECIPE_SCHEMA_VERSION, "0"),
+            ("cached", "/recipes/{}", RECIPE_SCHEMA_VERSION, "256"),
+        )
+        for label, path, schema_version, cache_size in modes:
+            os.environ["RECIPE_CACHE_SIZE"] = cache_size
+            get_settings.cache_clear()
+            with get_conn() as conn:
+                conn.execute("UPDATE recipes SET schema_version = ?", (schema_version,))
+
+            start = time.perf_counter()
+            timings = asyncio.run(_measure(app, path, recipe_ids, count))
+            elapsed = time.perf_counter() - start
+            timings.sort()
+            print(
+                f"{label:>6}: {count / elapsed:6.0f} req/s, "
+                f"median {statistics.median(timings):.3f} ms, "
+                f"p95 {timings[int(len(timings) * 0.95)]:.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Seed a throwaway database and time grocery-list aggregation over many recipes.
+
+Usage: python -m benchmarks.bench_grocery [recipe_count] [selected_count]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime
+
+from app.db.grocery import build_grocery_list
+from app.db.ingredients import index_ingredients
+from app.schemas.recipe import Recipe, RecipeIngredient, RecipeRequest
+from app.services.generator_stub import StubRecipeGenerator
+
+_INGREDIENTS = [
+    "chicken", "spinach", "lemon", "garlic", "tomato", "basil", "tofu", "rice", "beans",
+    "onion", "carrot", "ginger", "chili", "mushroom", "potato", "salmon", "lime", "feta",
+]
+_AMOUNTS = [
+    ("1", "item"), ("2", "tbsp"), ("1/2", "cup"), ("200", "g"), ("1 1/2", "lb"),
+    ("to taste", ""), ("3", "cloves"), ("250", "ml"),
+]
+
+
+def _with_amounts(recipe: Recipe, rng: random.Random) -> Recipe:
+    ingredients = [
+        RecipeIngredient(name=item.name, amount=amount, unit=unit, optional=item.optional)
+        for item in recipe.ingredients
+        for amount, unit in [rng.choice(_AMOUNTS)]
+    ]
+    return recipe.model_copy(update={"ingredients": ingredients})
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    selected = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    rng = random.Random(5)
+    generator = StubRecipeGenerator()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RECIPE_DB_PATH"] = os.path.join(tmp, "bench.db")
+        from app.db.sqlite import get_conn, init_db
+
+        init_db()
+        created_at = datetime.now(UTC).isoformat()
+        recipe_ids = []
+        start = time.perf_counter()
+        with get_conn() as conn:
+            for doc_id in range(1, count + 1):
+                recipe = _with_amounts(
+                    generator.generate(
+                        RecipeRequest(
+                            theme=f"Bench {doc_id}", ingredients=rng.sample(_INGREDIENTS, 6)
+                        )
+                    ),
+                    rng,
+                )
+                conn.execute(
+                    "INSERT INTO recipes (id, title, recipe_json, created_at, doc_id) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (recipe.id, recipe.title, recipe.model_dump_json(), created_at, doc_id),
+                )
+                index_ingredients(conn, recipe)
+                recipe_ids.append(recipe.id)
+        print(f"seeded {count} recipes in {time.perf_counter() - start:.1f}s")
+
+        with get_conn() as conn:
+            timings = []
+            for _ in range(20):
+                selections = [(recipe_id, 1.5) for recipe_id in rng.sample(recipe_ids, selected)]
+                t0 = time.perf_counter()
+                items = build_grocery_list(conn, selections)
+                timings.append((time.perf_counter() - t0) * 1000)
+            print(
+                f"{selected} recipes -> {len(items)} items: "
+                f"median {statistics.median(timings):.2f} ms, max {max(timings):.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
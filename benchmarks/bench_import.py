@@ -0,0 +1,82 @@
+"""Time POST /recipes/import and GET /recipes/export through the ASGI app.
+
+Usage: python -m benchmarks.bench_import [recipe_count]
+
+The import body is streamed in 64 KiB pieces, the way a large upload arrives.
+"""
+
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator
+
+import httpx
+
+from app.schemas.recipe import RecipeRequest
+from app.services.generator_stub import StubRecipeGenerator
+
+_INGREDIENTS = ["chicken", "spinach", "lemon", "garlic", "tomato", "basil", "rice", "beans"]
+_PIECE_BYTES = 64 * 1024
+
+
+def _ndjson_line(index: int) -> bytes:
+    ingredients = [_INGREDIENTS[(index + offset) % len(_INGREDIENTS)] for offset in range(5)]
+    recipe = StubRecipeGenerator().generate(
+        RecipeRequest(theme=f"Bench {index}", ingredients=ingredients)
+    )
+    return b'{"recipe":' + recipe.model_dump_json().encode() + b"}\n"
+
+
+async def _body(count: int) -> AsyncIterator[bytes]:
+    piece = bytearray()
+    for index in range(count):
+        piece += _ndjson_line(index)
+        if len(piece) >= _PIECE_BYTES:
+            yield bytes(piece)
+            piece.clear()
+    if piece:
+        yield bytes(piece)
+
+
+async def _run(app, count: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        start = time.perf_counter()
+        resp = await client.post("/recipes/import", content=_body(count))
+        elapsed = time.perf_counter() - start
+        summary = resp.json()
+        print(
+            f"import: {summary['created']} created in {elapsed:.1f} s "
+            f"({summary['created'] / elapsed:,.0f} recipes/s, body generation included)"
+        )
+
+        start = time.perf_counter()
+        exported = 0
+        async with client.stream("GET", "/recipes/export") as stream:
+            async for line in stream.aiter_lines():
+                exported += bool(line)
+        elapsed = time.perf_counter() - start
+        print(f"export: {exported} recipes in {elapsed:.1f} s ({exported / elapsed:,.0f}/s)")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RECIPE_DB_PATH"] = os.path.join(tmp, "bench.db")
+        from app.db.sqlite import init_db
+        from app.main import app
+
+        init_db()
+        asyncio.run(_run(app, count))
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"peak RSS: {peak_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare JSON serialization paths for API responses.
+
+Usage: python -m benchmarks.bench_json [list_size]
+
+- jsonable_encoder: FastAPI's generic path (dict conversion, then json.dumps)
+- response_model: FastAPI's current response_model path (validate, then dump_json)
+- FastJSONResponse: app.core.json_response, models and plain data straight to bytes
+"""
+
+import json
+import sys
+import timeit
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.json_response import FastJSONResponse
+from app.schemas.recipe import Recipe, RecipeRequest
+from app.services.generator_stub import StubRecipeGenerator
+
+
+def _time_us(func, number: int) -> float:
+    return timeit.timeit(func, number=number) / number * 1_000_000
+
+
+def main() -> None:
+    list_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    recipe = StubRecipeGenerator().generate(
+        RecipeRequest(theme="Bench", ingredients=[f"ingredient {index}" for index in range(15)])
+    )
+    summaries = [
+        {
+            "id": f"recipe-{index}",
+            "title": f"Recipe {index}",
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "note_count": index % 4,
+            "last_note_at": None,
+        }
+        for index in range(list_size)
+    ]
+    cases: list[tuple[str, Any, TypeAdapter[Any], int]] = [
+        ("recipe", recipe, TypeAdapter(Recipe), 2_000),
+        (f"{list_size} summaries", summaries, TypeAdapter(list[dict[str, Any]]), 50),
+    ]
+
+    for label, content, adapter, number in cases:
+        encoder = _time_us(
+            lambda content=content: json.dumps(
+                jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")
+            ).encode(),
+            number,
+        )
+        response_model = _time_us(
+            lambda content=content, adapter=adapter: adapter.dump_json(
+                adapter.validate_python(content)
+            ),
+            number,
+        )
+        fast = _time_us(lambda content=content: FastJSONResponse(content).body, number)
+        print(
+            f"{label:>16}: jsonable_encoder {encoder:9.1f} us, "
+            f"response_model {response_model:8.1f} us, FastJSONResponse {fast:8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
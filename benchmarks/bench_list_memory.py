@@ -0,0 +1,156 @@
+"""Peak Python memory and time to first byte for GET /recipes and GET /recipes/{id}/notes.
+
+Usage: python -m benchmarks.bench_list_memory [row_count ...]
+
+Requests go straight to the ASGI app with a send() that counts and drops body chunks, so
+tracemalloc sees only what the server holds (httpx's ASGI transport buffers whole bodies).
+- buffered: the default JSON response, built from the full row list
+- stream: ?stream=true, the same JSON array written as rows are read
+- ndjson: Accept: application/x-ndjson
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import UTC, datetime, timedelta
+
+_MODES = (
+    ("buffered", b"", []),
+    ("stream", b"stream=true", []),
+    ("ndjson", b"", [(b"accept", b"application/x-ndjson")]),
+)
+
+
+async def _request(app, path: str, query: bytes, headers: list) -> tuple[int, float, float]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query,
+        "root_path": "",
+        "headers": [(b"host", b"bench"), *headers],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    sent = 0
+    first_byte: float | None = None
+    start = time.perf_counter()
+
+    requested = False
+
+    async def receive() -> dict:
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Streaming responses wait for a disconnect that this client never sends.
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        nonlocal sent, first_byte
+        if message["type"] == "http.response.body" and message.get("body"):
+            if first_byte is None:
+                first_byte = time.perf_counter()
+            sent += len(message["body"])
+
+    await app(scope, receive, send)
+    end = time.perf_counter()
+    return sent, ((first_byte or end) - start) * 1000, (end - start) * 1000
+
+
+def _seed(total: int, seeded: int) -> None:
+    from app.api.recipes import save_recipe
+    from app.db.sqlite import get_conn, to_epoch_us
+    from app.schemas.recipe import RecipeRequest
+    from app.services.generator_stub import StubRecipeGenerator
+
+    notes_from = seeded
+    if seeded == 0:
+        recipe = StubRecipeGenerator().generate(RecipeRequest(theme="Bench", ingredients=["leek"]))
+        asyncio.run(save_recipe(recipe.model_copy(update={"id": "bench-0"})))
+        seeded = 1
+
+    base = datetime(2024, 1, 1, tzinfo=UTC)
+    with get_conn() as conn:
+        template = conn.execute(
+            "SELECT title, recipe_json, schema_version, content_hash FROM recipes WHERE id = ?",
+            ("bench-0",),
+        ).fetchone()
+        conn.executemany(
+            """
+            INSERT INTO recipes (
+                id, title, recipe_json, created_at, schema_version, content_hash, doc_id
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    f"bench-{index}",
+                    f"{template['title']} {index}",
+                    template["recipe_json"],
+                    (base + timedelta(seconds=index)).isoformat(),
+                    template["schema_version"],
+                    template["content_hash"],
+                    index + 1,
+                )
+                for index in range(seeded, total)
+            ),
+        )
+        conn.executemany(
+            """
+            INSERT INTO notes (id, recipe_id, note_text, created_at, created_at_us)
+            VALUES (?, 'bench-0', ?, ?, ?)
+            """,
+            (
+                (
+                    f"note-{index}",
+                    f"Bench note {index}: a little more salt next time.",
+                    (base + timedelta(seconds=index)).isoformat(),
+                    to_epoch_us(base + timedelta(seconds=index)),
+                )
+                for index in range(notes_from, total)
+            ),
+        )
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000, 100_000]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RECIPE_DB_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ["SLOW_QUERY_THRESHOLD_MS"] = "60000"
+        from app.db.sqlite import init_db
+        from app.main import app
+
+        init_db()
+        seeded = 0
+        print(f"{'rows':>8} {'endpoint':<7} {'mode':<9} {'peak MB':>8} {'first ms':>9} {'total ms':>9}")
+        for size in sorted(sizes):
+            _seed(size, seeded)
+            seeded = size
+            for endpoint, path in (("recipes", "/recipes"), ("notes", "/recipes/bench-0/notes")):
+                # Untraced first pass, so one-time imports and caches are not counted.
+                for _, query, headers in _MODES:
+                    asyncio.run(_request(app, path, query, headers))
+                for mode, query, headers in _MODES:
+                    tracemalloc.start()
+                    sent, first_ms, total_ms = asyncio.run(_request(app, path, query, headers))
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    assert sent > size * 20, (endpoint, mode, sent)
+                    print(
+                        f"{size:>8} {endpoint:<7} {mode:<9} {peak / 2**20:>8.1f} "
+                        f"{first_ms:>9.1f} {total_ms:>9.1f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Per-row memory and list-endpoint latency: sqlite3.Row + dict rows against slotted records.
+
+Usage: python -m benchmarks.bench_list_rows [row_count] [repeats]
+
+- before: replica of the previous handlers (sqlite3.Row, a dict of str() values per row,
+  FastJSONResponse)
+- records: the current handlers (row factory building RecipeSummary / NoteRecord, encoded
+  by a TypeAdapter)
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import tracemalloc
+from typing import Any
+
+from benchmarks.bench_list_memory import _request, _seed
+
+
+def _held(build) -> tuple[float, float]:
+    tracemalloc.start()
+    rows = build()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = snapshot.statistics("filename")
+    blocks = sum(stat.count for stat in stats)
+    size = sum(stat.size for stat in stats)
+    return size / len(rows), blocks / len(rows)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RECIPE_DB_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ["SLOW_QUERY_THRESHOLD_MS"] = "60000"
+        from app.api.recipes import list_notes, list_recipes
+        from app.core.json_response import FastJSONResponse
+        from app.db.sqlite import get_conn, init_db
+        from app.main import app
+
+        def previous_recipes() -> list[dict[str, Any]]:
+            with get_conn() as conn:
+                rows = conn.execute(
+                    """
+                    SELECT id, title, created_at, note_count, last_note_at
+                    FROM recipes
+                    ORDER BY created_at DESC
+                    """
+                ).fetchall()
+            return [
+                {
+                    "id": str(row["id"]),
+                    "title": str(row["title"]),
+                    "created_at": str(row["created_at"]),
+                    "note_count": int(row["note_count"]),
+                    "last_note_at": row["last_note_at"],
+                }
+                for row in rows
+            ]
+
+        def previous_notes(recipe_id: str) -> list[dict[str, str]]:
+            with get_conn() as conn:
+                rows = conn.execute(
+                    """
+                    SELECT id, note_text, created_at
+                    FROM notes
+                    WHERE recipe_id = ?
+                    ORDER BY created_at_us DESC
+                    """,
+                    (recipe_id,),
+                ).fetchall()
+            return [
+                {
+                    "note_id": str(row["id"]),
+                    "note_text": str(row["note_text"]),
+                    "created_at": str(row["created_at"]),
+                }
+                for row in rows
+            ]
+
+        @app.get("/bench/before/recipes")
+        async def before_recipes() -> FastJSONResponse:
+            return FastJSONResponse(previous_recipes())
+
+        @app.get("/bench/before/notes/{recipe_id}")
+        async def before_notes(recipe_id: str) -> FastJSONResponse:
+            return FastJSONResponse(previous_notes(recipe_id))
+
+        init_db()
+        _seed(count, 0)
+
+        cases = (
+            ("recipes", "before", previous_recipes, "/bench/before/recipes"),
+            ("recipes", "records", lambda: asyncio.run(list_recipes()), "/recipes"),
+            ("notes", "before", lambda: previous_notes("bench-0"), "/bench/before/notes/bench-0"),
+            (
+                "notes",
+                "records",
+                lambda: asyncio.run(list_notes("bench-0")),
+                "/recipes/bench-0/notes",
+            ),
+        )
+        print(f"{count} rows, median of {repeats} requests")
+        print(f"{'endpoint':<8} {'rows':<8} {'bytes/row':>9} {'blocks/row':>10} {'median ms':>10}")
+        for endpoint, label, build, path in cases:
+            build()
+            bytes_per_row, blocks_per_row = _held(build)
+            timings = [asyncio.run(_request(app, path, b"", []))[2] for _ in range(repeats)]
+            print(
+                f"{endpoint:<8} {label:<8} {bytes_per_row:>9.0f} {blocks_per_row:>10.2f} "
+                f"{statistics.median(timings):>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
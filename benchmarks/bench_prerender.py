@@ -0,0 +1,72 @@
+"""Recipe page views rendered from templates against pre-rendered files read from disk.
+
+Usage: python -m benchmarks.bench_prerender [recipe_count] [views]
+
+Each view asks for a different recipe, without If-None-Match, so every one is a full 200.
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.bench_batch import _payloads
+
+
+async def _views(client: httpx.AsyncClient, urls: list[str]) -> list[float]:
+    timings = []
+    for url in urls:
+        start = time.perf_counter()
+        resp = await client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert resp.status_code == 200, resp.text
+    return timings
+
+
+async def _run(app, count: int, views: int) -> None:
+    from app.core.config import get_settings
+    from app.services.prerender import get_prerender_store
+    from app.services.prerender_site import rebuild_site
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        payloads = _payloads("pre", count)
+        for offset in range(0, count, 500):
+            await client.post("/recipes/batch", json=payloads[offset : offset + 500])
+
+        store = get_prerender_store()
+        assert store is not None
+        summary = rebuild_site(store)
+        print(f"rebuild: {summary['pages']} pages in {summary['elapsed_ms']:.1f} ms")
+
+        print(f"{'page':<7} {'mode':<12} {'median ms':>10} {'p95 ms':>8}")
+        for page, prefix in (("detail", "/recipes/ui/"), ("cook", "/cook/")):
+            urls = [f"{prefix}pre-{index % count}" for index in range(views)]
+            for mode, enabled in (("rendered", "0"), ("pre-rendered", "1")):
+                os.environ["PRERENDER"] = enabled
+                get_settings.cache_clear()
+                timings = sorted(await _views(client, urls))
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                print(f"{page:<7} {mode:<12} {statistics.median(timings):>10.2f} {p95:>8.2f}")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    views = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RECIPE_DB_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ["SLOW_QUERY_THRESHOLD_MS"] = "60000"
+        from app.db.sqlite import init_db
+        from app.main import app
+
+        init_db()
+        asyncio.run(_run(app, count, views))
+
+
+if __name__ == "__main__":
+    main()
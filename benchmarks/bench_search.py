@@ -0,0 +1,68 @@
+"""Seed a throwaway database and time full-text search queries.
+
+Usage: python -m benchmarks.bench_search [recipe_count]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime
+
+from app.db.search import index_recipe, search_recipes
+from app.schemas.recipe import RecipeRequest
+from app.services.generator_stub import StubRecipeGenerator
+
+_THEMES = ["Italian", "Thai", "Mexican", "Weeknight", "Spicy", "Vegetarian", "Soup", "Brunch"]
+_INGREDIENTS = [
+    "chicken", "spinach", "lemon", "garlic", "tomato", "basil", "tofu", "rice", "beans",
+    "onion", "carrot", "ginger", "chili", "mushroom", "potato", "salmon", "lime", "feta",
+]
+_QUERIES = ["lemon", "chicken garlic", "spic", "mushroom risotto", "prepare tofu", "zzz"]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(7)
+    generator = StubRecipeGenerator()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RECIPE_DB_PATH"] = os.path.join(tmp, "bench.db")
+        from app.db.sqlite import get_conn, init_db
+
+        init_db()
+        created_at = datetime.now(UTC).isoformat()
+        start = time.perf_counter()
+        with get_conn() as conn:
+            for doc_id in range(1, count + 1):
+                recipe = generator.generate(
+                    RecipeRequest(
+                        theme=f"{rng.choice(_THEMES)} {doc_id}",
+                        ingredients=rng.sample(_INGREDIENTS, 4),
+                    )
+                )
+                conn.execute(
+                    "INSERT INTO recipes (id, title, recipe_json, created_at, doc_id) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (recipe.id, recipe.title, recipe.model_dump_json(), created_at, doc_id),
+                )
+                index_recipe(conn, doc_id, recipe)
+        print(f"seeded {count} recipes in {time.perf_counter() - start:.1f}s")
+
+        with get_conn() as conn:
+            for query in _QUERIES:
+                timings = []
+                for _ in range(20):
+                    t0 = time.perf_counter()
+                    search_recipes(conn, query, limit=20, offset=0)
+                    timings.append((time.perf_counter() - t0) * 1000)
+                print(
+                    f"{query!r:>20}: median {statistics.median(timings):.2f} ms, "
+                    f"max {max(timings):.2f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
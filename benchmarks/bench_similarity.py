@@ -0,0 +1,57 @@
+"""Build an in-memory similarity index and time top-k queries.
+
+Usage: python -m benchmarks.bench_similarity [recipe_count]
+"""
+
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.similarity import SimilarityIndex, recipe_features
+
+_VOCABULARY = [f"ingredient {index}" for index in range(400)] + [
+    "salt", "olive oil", "garlic", "onion", "pepper", "butter",
+]
+_STAPLES = ["salt", "olive oil", "garlic", "onion", "pepper", "butter"]
+_THEMES = ["italian", "thai", "mexican", "weeknight", "spicy", "vegetarian", "soup", "brunch"]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(11)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SimilarityIndex(Path(tmp) / "bench.db.similarity.json")
+        start = time.perf_counter()
+        for doc_id in range(1, count + 1):
+            names = rng.sample(_VOCABULARY, 6) + rng.sample(_STAPLES, 2)
+            index.add(doc_id, recipe_features(f"{rng.choice(_THEMES)} dish", names))
+        print(f"indexed {count} recipes in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        index.persist()
+        size_mb = index.path.stat().st_size / 1_000_000
+        print(f"persisted {size_mb:.1f} MB in {time.perf_counter() - start:.2f}s")
+
+        reloaded = SimilarityIndex(index.path)
+        start = time.perf_counter()
+        reloaded.load()
+        print(f"loaded snapshot in {time.perf_counter() - start:.2f}s")
+
+        timings = []
+        for doc_id in rng.sample(range(1, count + 1), 200):
+            t0 = time.perf_counter()
+            index.most_similar(doc_id, 5)
+            timings.append((time.perf_counter() - t0) * 1000)
+        timings.sort()
+        print(
+            f"top-5 query: median {statistics.median(timings):.2f} ms, "
+            f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Template cold start and per-render timings.
+
+Usage: python -m benchmarks.bench_templates [render_count]
+
+Cold start runs in fresh interpreters and times precompile_templates():
+- no bytecode cache: every template compiled from source
+- empty bytecode cache: compiled, then written to the cache directory
+- warm bytecode cache: loaded from the cache directory
+
+Per-render timings render recipe_detail.html and cook_mode.html for one recipe, with the
+fragment cache off and on.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_COLD_START = """
+from app.api.ui import templates
+from app.core.templating import precompile_templates
+print(precompile_templates(templates))
+"""
+
+
+def _cold_start_ms(env: dict[str, str]) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", _COLD_START],
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cases = (
+            ("no bytecode cache", {"TEMPLATE_BYTECODE_CACHE": "0"}),
+            ("empty bytecode cache", {"TEMPLATE_CACHE_DIR": cache_dir}),
+            ("warm bytecode cache", {"TEMPLATE_CACHE_DIR": cache_dir}),
+        )
+        for label, env in cases:
+            print(f"cold start, {label:<21} {_cold_start_ms(env):7.1f} ms")
+
+    from app.api.ui import templates
+    from app.core.http_cache import content_hash
+    from app.core.templating import get_fragment_cache
+    from app.schemas.recipe import RecipeRequest
+    from app.services.generator_stub import StubRecipeGenerator
+
+    recipe = StubRecipeGenerator().generate(
+        RecipeRequest(
+            theme="Bench",
+            ingredients=[f"ingredient {index}" for index in range(15)],
+        )
+    )
+    recipe_hash = content_hash(recipe.model_dump_json().encode())
+    pages = (
+        (
+            "recipe_detail.html",
+            {"recipe": recipe, "recipe_hash": recipe_hash, "notes": []},
+        ),
+        ("cook_mode.html", {"recipe": recipe, "recipe_hash": recipe_hash}),
+    )
+    fragments = get_fragment_cache(templates)
+    for label, size in (("fragments off", 0), ("fragments on", 512)):
+        fragments.max_entries = size
+        for name, context in pages:
+            template = templates.env.get_template(name)
+            template.render(context)
+            timings = []
+            for _ in range(count):
+                start = time.perf_counter()
+                template.render(context)
+                timings.append((time.perf_counter() - start) * 1_000_000)
+            print(f"render {name:<19} {label:<13} median {statistics.median(timings):7.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Note inserts from several worker processes sharing one SQLite file, with and without group commit.
+
+Usage: python -m benchmarks.bench_writes [workers] [notes_per_worker] [concurrency]
+
+Each worker process posts notes through the ASGI app with `concurrency` requests in flight.
+- direct: every request commits its own transaction (GROUP_COMMIT=0)
+- grouped: each worker's writer thread commits queued notes together (GROUP_COMMIT=1)
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+_RECIPE = {
+    "id": "bench",
+    "title": "Bench Soup",
+    "servings": 2,
+    "time_minutes": 30,
+    "difficulty": "easy",
+    "dish_summary": "A recipe the benchmark notes are attached to.",
+    "ingredients": [{"name": "leek", "amount": "2", "unit": "item", "optional": False}],
+    "steps": [{"step": 1, "text": "Simmer leeks.", "timer_minutes": 20}],
+    "substitutions": [],
+    "cook_mode": {
+        "ingredients_checklist": [
+            {"name": "leek", "amount": "2", "unit": "item", "optional": False}
+        ],
+        "step_cards": ["Simmer leeks."],
+    },
+}
+
+
+async def _post_notes(count: int, concurrency: int) -> tuple[int, int, float]:
+    from app.main import app, lifespan
+
+    failures = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    async with lifespan(app):
+        start = time.perf_counter()
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def post(index: int) -> None:
+                nonlocal failures
+                async with semaphore:
+                    resp = await client.post(
+                        "/recipes/bench/notes", json={"note_text": f"note {index}"}
+                    )
+                    if resp.status_code != 200:
+                        failures += 1
+
+            await asyncio.gather(*(post(index) for index in range(count)))
+        elapsed = time.perf_counter() - start
+    return count - failures, failures, elapsed
+
+
+def _worker(
+    count: int, concurrency: int, results: "multiprocessing.Queue[tuple[int, int, float]]"
+) -> None:
+    results.put(asyncio.run(_post_notes(count, concurrency)))
+
+
+def main() -> None:
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    per_worker = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+
+    for label, group_commit in (("direct", "0"), ("grouped", "1")):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["RECIPE_DB_PATH"] = os.path.join(tmp, "bench.db")
+            os.environ["GROUP_COMMIT"] = group_commit
+            os.environ["RECIPE_COMPRESSION"] = "0"
+            os.environ["SLOW_QUERY_THRESHOLD_MS"] = "60000"
+
+            from app.api.recipes import save_recipe
+            from app.core.config import get_settings
+            from app.db.sqlite import init_db
+            from app.schemas.recipe import Recipe
+
+            get_settings.cache_clear()
+            init_db()
+            asyncio.run(save_recipe(Recipe.model_validate(_RECIPE)))
+
+            context = multiprocessing.get_context("spawn")
+            results: multiprocessing.Queue[tuple[int, int, float]] = context.Queue()
+            processes = [
+                context.Process(target=_worker, args=(per_worker, concurrency, results))
+                for _ in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            outcomes = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+
+            # Workers start at slightly different times; the slowest bounds the run.
+            elapsed = max(seconds for _, _, seconds in outcomes)
+            saved = sum(ok for ok, _, _ in outcomes)
+            failed = sum(errors for _, errors, _ in outcomes)
+            print(
+                f"{label:>7}: {saved / elapsed:7.0f} notes/s, "
+                f"{saved} saved, {failed} failed, {elapsed:.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import asyncio
+import re
+
+import httpx
+
+from app.core.config import get_settings
+from app.main import app
+
+_COLLAPSED_LINE = re.compile(r"^\S.* \d+$")
+
+
+def _enable_admin(monkeypatch) -> None:
+    monkeypatch.setenv("ADMIN_ENABLED", "1")
+    get_settings.cache_clear()
+
+
+def test_admin_profile_is_hidden_when_admin_disabled() -> None:
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.get("/admin/profile", params={"seconds": 0.01})
+            assert resp.status_code == 404
+
+            profiled = await client.get("/health", headers={"X-Profile": "1"})
+            assert profiled.status_code == 200
+            assert profiled.json() == {"status": "ok"}
+
+    asyncio.run(run())
+
+
+def test_admin_profile_returns_collapsed_stacks(monkeypatch) -> None:
+    _enable_admin(monkeypatch)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.get("/admin/profile", params={"seconds": 0.1})
+            assert resp.status_code == 200
+            assert resp.headers["content-type"].startswith("text/plain")
+            assert ".collapsed" in resp.headers["content-disposition"]
+            lines = resp.text.splitlines()
+            assert lines
+            assert all(_COLLAPSED_LINE.match(line) for line in lines)
+            assert any(line.startswith("MainThread;") for line in lines)
+
+    asyncio.run(run())
+
+
+def test_profile_header_replaces_response_with_request_profile(monkeypatch) -> None:
+    _enable_admin(monkeypatch)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.get("/health", headers={"X-Profile": "1"})
+            assert resp.status_code == 200
+            assert resp.headers["content-type"].startswith("text/plain")
+            assert resp.headers["x-profiled-status"] == "200"
+            assert int(resp.headers["x-profile-samples"]) >= 0
+            assert all(_COLLAPSED_LINE.match(line) for line in resp.text.splitlines())
+
+    asyncio.run(run())
+
+
+def test_profile_rejects_out_of_range_duration(monkeypatch) -> None:
+    _enable_admin(monkeypatch)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.get("/admin/profile", params={"seconds": 600})
+            assert resp.status_code == 422
+
+    asyncio.run(run())
+
+
+def test_admin_token_is_required_when_configured(monkeypatch) -> None:
+    _enable_admin(monkeypatch)
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    get_settings.cache_clear()
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/admin/writes")).status_code == 403
+            wrong = await client.get("/admin/writes", headers={"X-Admin-Token": "nope"})
+            assert wrong.status_code == 403
+            allowed = await client.get("/admin/writes", headers={"X-Admin-Token": "s3cret"})
+            assert allowed.status_code == 200
+
+            unprofiled = await client.get("/health", headers={"X-Profile": "1"})
+            assert unprofiled.json() == {"status": "ok"}
+            profiled = await client.get(
+                "/health", headers={"X-Profile": "1", "X-Admin-Token": "s3cret"}
+            )
+            assert profiled.headers["x-profiled-status"] == "200"
+
+    asyncio.run(run())
+
+
+def test_admin_without_token_is_loopback_only(monkeypatch) -> None:
+    _enable_admin(monkeypatch)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app, client=("203.0.113.7", 50000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/admin/cache")).status_code == 403
+            profiled = await client.get("/health", headers={"X-Profile": "1"})
+            assert profiled.json() == {"status": "ok"}
+
+    asyncio.run(run())
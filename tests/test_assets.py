@@ -0,0 +1,110 @@
+import asyncio
+import gzip
+import re
+from pathlib import Path
+
+import httpx
+
+from app.core.assets import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    build_assets,
+    get_asset_manifest,
+    load_asset_manifest,
+)
+from app.db.sqlite import init_db
+from app.main import app
+
+
+def _set_db(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / "recipes.db"))
+    init_db()
+
+
+def test_build_assets_hashes_names_and_keeps_old_builds(tmp_path: Path) -> None:
+    (tmp_path / "app.css").write_text("body { color: red; }\n" * 50)
+    build_assets(tmp_path)
+    first = load_asset_manifest(tmp_path)
+    first_url = first.url("app.css")
+    assert re.fullmatch(r"/static/build/app\.[0-9a-f]{12}\.css", first_url)
+    built = tmp_path / "build" / first.files["app.css"]["path"]
+    assert gzip.decompress(Path(f"{built}.gz").read_bytes()) == built.read_bytes()
+
+    # An edit gets a new URL once rebuilt, and the old file stays.
+    (tmp_path / "app.css").write_text("body { color: blue; }\n" * 50)
+    build_assets(tmp_path)
+    second = load_asset_manifest(tmp_path)
+    assert second.url("app.css") != first_url
+    assert second.fingerprint != first.fingerprint
+    assert built.exists()
+
+
+def test_manifest_is_only_read_and_falls_back_to_plain_urls(tmp_path: Path) -> None:
+    (tmp_path / "app.css").write_text("body { color: red; }\n" * 50)
+    (tmp_path / "app.js").write_text("console.log(1);\n" * 50)
+    unbuilt = load_asset_manifest(tmp_path)
+    assert unbuilt.url("app.css") == "/static/app.css"
+    assert not (tmp_path / "build").exists()
+
+    build_assets(tmp_path)
+    # A source edited after the build is linked by its plain URL until the next build.
+    (tmp_path / "app.js").write_text("console.log(2);\n" * 50)
+    manifest = load_asset_manifest(tmp_path)
+    assert manifest.url("app.css").startswith("/static/build/app.")
+    assert manifest.url("app.js") == "/static/app.js"
+    assert manifest.fingerprint != unbuilt.fingerprint
+    assert sorted(manifest.urls()) == sorted([manifest.url("app.css"), "/static/app.js"])
+
+
+def test_build_assets_skips_variants_that_do_not_shrink(tmp_path: Path) -> None:
+    (tmp_path / "tiny.js").write_text("x")
+    entry = build_assets(tmp_path)["files"]["tiny.js"]
+    assert entry["encodings"] == {}
+    assert not (tmp_path / "build" / f"{entry['path']}.gz").exists()
+
+
+def test_pages_link_hashed_assets_served_precompressed_and_immutable(
+    monkeypatch, tmp_path: Path
+) -> None:
+    _set_db(monkeypatch, tmp_path)
+    # The deploy step; the app only reads what it wrote.
+    build_assets()
+    get_asset_manifest.cache_clear()
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            page = await client.get("/")
+            assert "/static/styles.css" not in page.text
+            match = re.search(r'href="(/static/build/styles\.[0-9a-f]{12}\.css)"', page.text)
+            assert match is not None
+            url = match.group(1)
+            source = Path("app/static/styles.css").read_bytes()
+
+            resp = await client.get(url, headers={"Accept-Encoding": "gzip"})
+            assert resp.status_code == 200
+            assert resp.headers["content-encoding"] == "gzip"
+            assert resp.headers["content-type"].startswith("text/css")
+            assert resp.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+            assert resp.headers["vary"] == "Accept-Encoding"
+            assert int(resp.headers["content-length"]) < len(source)
+            assert resp.content == source
+
+            identity = await client.get(url, headers={"Accept-Encoding": "identity"})
+            assert "content-encoding" not in identity.headers
+            assert identity.content == source
+
+            refused = await client.get(url, headers={"Accept-Encoding": "gzip;q=0"})
+            assert "content-encoding" not in refused.headers
+
+            revalidated = await client.get(
+                url, headers={"Accept-Encoding": "gzip", "If-None-Match": resp.headers["etag"]}
+            )
+            assert revalidated.status_code == 304
+            assert revalidated.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+            legacy = await client.get("/static/styles.css")
+            assert legacy.status_code == 200
+            assert legacy.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+
+    asyncio.run(run())
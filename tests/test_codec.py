@@ -0,0 +1,179 @@
+import asyncio
+from pathlib import Path
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from app.core.config import get_settings
+from app.db.codec import (
+    MIN_TRAINING_ROWS,
+    CodecError,
+    Dictionary,
+    decode_recipe_json,
+    encode_recipe_json,
+    forget_dictionaries,
+    stored_dictionary_id,
+    train_dictionary,
+)
+from app.db.sqlite import get_conn, get_db_path, init_db
+from app.db.storage_migration import migrate_recipe_storage, storage_report
+from app.main import app
+
+
+def _recipe_payload(recipe_id: str, index: int) -> dict:
+    ingredients = [
+        {"name": "lemon", "amount": str(index % 4 + 1), "unit": "item", "optional": False},
+        {"name": "olive oil", "amount": "2", "unit": "tbsp", "optional": False},
+    ]
+    return {
+        "id": recipe_id,
+        "title": f"Compressed recipe {index}",
+        "servings": 2,
+        "time_minutes": 10 + index,
+        "difficulty": "easy",
+        "dish_summary": "A recipe used by the storage codec tests.",
+        "ingredients": ingredients,
+        "steps": [{"step": 1, "text": "Slice lemon and dress with oil.", "timer_minutes": None}],
+        "substitutions": [],
+        "cook_mode": {
+            "ingredients_checklist": ingredients,
+            "step_cards": ["Slice lemon and dress with oil."],
+        },
+    }
+
+
+def _set_db(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / "recipes.db"))
+    # Reads must go through the codec rather than the write-through recipe cache.
+    monkeypatch.setenv("RECIPE_CACHE_SIZE", "0")
+    init_db()
+
+
+def test_codec_round_trips_with_trained_dictionary() -> None:
+    samples = [
+        f'{{"title":"Recipe {index}","ingredients":[{{"name":"lemon","unit":"item"}}]}}'
+        for index in range(30)
+    ]
+    dictionary = Dictionary(7, train_dictionary(samples))
+    assert 0 < len(dictionary.data) <= 32 * 1024
+
+    encoded = encode_recipe_json(samples[3], dictionary)
+    assert isinstance(encoded, bytes)
+    assert stored_dictionary_id(encoded) == 7
+    assert encode_recipe_json(samples[3], None) == samples[3]
+    assert stored_dictionary_id(samples[3]) is None
+
+
+def test_decode_rejects_unknown_dictionary_and_passes_text_through(
+    monkeypatch, tmp_path: Path
+) -> None:
+    _set_db(monkeypatch, tmp_path)
+    dictionary = Dictionary(99, b'"ingredients":[{"name":')
+    encoded = encode_recipe_json('{"ingredients":[{"name":"lemon"}]}', dictionary)
+
+    with get_conn() as conn:
+        assert decode_recipe_json(conn, get_db_path(), '{"a": 1}') == b'{"a": 1}'
+        with pytest.raises(CodecError):
+            decode_recipe_json(conn, get_db_path(), encoded)
+        with pytest.raises(CodecError):
+            decode_recipe_json(conn, get_db_path(), b"\x02\x00\x01payload")
+
+
+def test_migration_compresses_rows_and_api_returns_same_json(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # A library saved before compression was switched on.
+            monkeypatch.setenv("RECIPE_COMPRESSION", "0")
+            get_settings.cache_clear()
+            recipe_ids = [str(uuid4()) for _ in range(30)]
+            for index, recipe_id in enumerate(recipe_ids):
+                response = await client.post("/recipes", json=_recipe_payload(recipe_id, index))
+                assert response.status_code == 200
+            before = [(await client.get(f"/recipes/{rid}")).content for rid in recipe_ids]
+            monkeypatch.delenv("RECIPE_COMPRESSION")
+            get_settings.cache_clear()
+
+            assert migrate_recipe_storage() == 30
+            forget_dictionaries(get_db_path())
+            report = storage_report()
+            assert report["formats"] == {"zlib-dictionary-1": 30}
+            assert report["stored_bytes"] < report["json_bytes"]
+
+            after = [(await client.get(f"/recipes/{rid}")).content for rid in recipe_ids]
+            assert after == before
+
+            # New saves use the dictionary directly.
+            new_id = str(uuid4())
+            response = await client.post("/recipes", json=_recipe_payload(new_id, 31))
+            assert response.status_code == 200
+            with get_conn() as conn:
+                row = conn.execute(
+                    "SELECT recipe_json FROM recipes WHERE id = ?", (new_id,)
+                ).fetchone()
+            assert stored_dictionary_id(row["recipe_json"]) == 1
+            response = await client.get(f"/recipes/{new_id}")
+            assert response.json()["title"] == "Compressed recipe 31"
+
+    asyncio.run(run())
+
+
+def test_migration_leaves_small_libraries_uncompressed(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/recipes", json=_recipe_payload(str(uuid4()), 1))
+            assert response.status_code == 200
+
+    asyncio.run(run())
+    assert migrate_recipe_storage() == 0
+    assert storage_report()["formats"] == {"text": 1}
+
+
+def test_fresh_library_trains_its_first_dictionary_on_save(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            recipe_ids = [str(uuid4()) for _ in range(MIN_TRAINING_ROWS + 5)]
+            for index, recipe_id in enumerate(recipe_ids[: MIN_TRAINING_ROWS - 1]):
+                await client.post("/recipes", json=_recipe_payload(recipe_id, index))
+            assert storage_report()["formats"] == {"text": MIN_TRAINING_ROWS - 1}
+
+            # The save that reaches the minimum trains and compresses the earlier rows too.
+            await client.post(
+                "/recipes", json=_recipe_payload(recipe_ids[MIN_TRAINING_ROWS - 1], 99)
+            )
+            assert storage_report()["formats"] == {"zlib-dictionary-1": MIN_TRAINING_ROWS}
+
+            batch = [
+                _recipe_payload(recipe_id, index)
+                for index, recipe_id in enumerate(recipe_ids[MIN_TRAINING_ROWS:])
+            ]
+            assert (await client.post("/recipes/batch", json=batch)).status_code == 200
+            assert storage_report()["formats"] == {"zlib-dictionary-1": len(recipe_ids)}
+            assert migrate_recipe_storage() == 0
+
+            response = await client.get(f"/recipes/{recipe_ids[0]}")
+            assert response.json()["title"] == "Compressed recipe 0"
+
+    asyncio.run(run())
+
+
+def test_first_bulk_import_trains_a_dictionary(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    batch = [_recipe_payload(str(uuid4()), index) for index in range(MIN_TRAINING_ROWS)]
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.post("/recipes/batch", json=batch)).status_code == 200
+
+    asyncio.run(run())
+    assert storage_report()["formats"] == {"zlib-dictionary-1": MIN_TRAINING_ROWS}
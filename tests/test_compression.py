@@ -0,0 +1,133 @@
+import asyncio
+import gzip
+import json
+from pathlib import Path
+
+import httpx
+
+from app.core.compression import (
+    DEFAULT_POLICY,
+    compression_counters,
+    policy_for_path,
+)
+from app.core.config import get_settings
+from app.db.sqlite import init_db
+from app.main import app
+
+
+def _set_db(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / "recipes.db"))
+    init_db()
+
+
+def _recipe_payload(recipe_id: str) -> dict:
+    ingredients = [
+        {"name": f"ingredient {index}", "amount": "1", "unit": "cup", "optional": False}
+        for index in range(20)
+    ]
+    return {
+        "id": recipe_id,
+        "title": f"Compressed {recipe_id}",
+        "servings": 2,
+        "time_minutes": 30,
+        "difficulty": "easy",
+        "dish_summary": "A recipe long enough to be worth compressing.",
+        "ingredients": ingredients,
+        "steps": [{"step": 1, "text": "Combine everything.", "timer_minutes": None}],
+        "substitutions": [],
+        "cook_mode": {"ingredients_checklist": ingredients, "step_cards": ["Combine everything."]},
+    }
+
+
+def test_policies_match_by_path_prefix() -> None:
+    assert policy_for_path("/static/build/styles.css").enabled is False
+    assert policy_for_path("/recipes/export").gzip_level == 1
+    assert policy_for_path("/recipes/export").min_size == 0
+    assert policy_for_path("/recipes/ui/abc") == DEFAULT_POLICY
+
+
+def test_pages_are_gzipped_cached_and_still_revalidate(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    gzip_only = {"Accept-Encoding": "gzip"}
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("squash"))
+
+            identity = await client.get("/recipes/ui/squash", headers={"Accept-Encoding": "identity"})
+            assert "content-encoding" not in identity.headers
+            assert "Accept-Encoding" in identity.headers["vary"]
+
+            hits = compression_counters["cache_hits"]
+            page = await client.get("/recipes/ui/squash", headers=gzip_only)
+            assert page.headers["content-encoding"] == "gzip"
+            assert "Accept-Encoding" in page.headers["vary"]
+            assert int(page.headers["content-length"]) == page.num_bytes_downloaded
+            assert page.num_bytes_downloaded < len(identity.content) / 2
+            assert page.text == identity.text
+            assert page.headers["etag"] == identity.headers["etag"][:-1] + '-gzip"'
+
+            again = await client.get("/recipes/ui/squash", headers=gzip_only)
+            assert again.content == page.content
+            assert compression_counters["cache_hits"] == hits + 1
+
+            cached = await client.get(
+                "/recipes/ui/squash", headers={**gzip_only, "If-None-Match": page.headers["etag"]}
+            )
+            assert cached.status_code == 304
+            assert "content-encoding" not in cached.headers
+            assert cached.headers["etag"] == page.headers["etag"]
+
+            # Either copy's ETag validates the other coding.
+            for etag, accept in (
+                (page.headers["etag"], "identity"),
+                (identity.headers["etag"], "gzip"),
+            ):
+                cross = await client.get(
+                    "/recipes/ui/squash", headers={"Accept-Encoding": accept, "If-None-Match": etag}
+                )
+                assert cross.status_code == 304
+                assert cross.headers["etag"] == identity.headers["etag"]
+
+            small = await client.get("/health", headers=gzip_only)
+            assert "content-encoding" not in small.headers
+            assert "vary" not in small.headers
+
+    asyncio.run(run())
+
+
+def test_streamed_ndjson_is_compressed_chunk_by_chunk(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for index in range(3):
+                await client.post("/recipes", json=_recipe_payload(f"r{index}"))
+
+            async with client.stream(
+                "GET", "/recipes/export", headers={"Accept-Encoding": "gzip"}
+            ) as resp:
+                assert resp.headers["content-encoding"] == "gzip"
+                assert "content-length" not in resp.headers
+                raw = b"".join([chunk async for chunk in resp.aiter_raw()])
+            lines = gzip.decompress(raw).splitlines()
+            assert sorted(json.loads(line)["recipe"]["id"] for line in lines) == ["r0", "r1", "r2"]
+
+    asyncio.run(run())
+
+
+def test_compression_can_be_turned_off(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    monkeypatch.setenv("COMPRESSION", "0")
+    get_settings.cache_clear()
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.get("/", headers={"Accept-Encoding": "gzip"})
+            assert resp.status_code == 200
+            assert "content-encoding" not in resp.headers
+
+    asyncio.run(run())
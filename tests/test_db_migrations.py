@@ -0,0 +1,138 @@
+import json
+import sqlite3
+from pathlib import Path
+
+from app.db.search import search_recipes
+from app.db.sqlite import get_conn, init_db
+from app.schemas.recipe import RECIPE_SCHEMA_VERSION
+from app.services.recipe_cache import load_recipe_entry
+
+_LEGACY_RECIPE = {
+    "id": "legacy",
+    "title": "Legacy Soup",
+    "servings": 2,
+    "time_minutes": 30,
+    "difficulty": "easy",
+    "dish_summary": "A simple soup.",
+    "ingredients": [{"name": "leek", "amount": "2", "unit": "item", "optional": False}],
+    "steps": [{"step": 1, "text": "Simmer leeks.", "timer_minutes": 20}],
+    "substitutions": [],
+    "cook_mode": {
+        "ingredients_checklist": [
+            {"name": "leek", "amount": "2", "unit": "item", "optional": False}
+        ],
+        "step_cards": ["Simmer leeks."],
+    },
+}
+
+
+def _create_legacy_db(db_path: Path) -> None:
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute(
+            """
+            CREATE TABLE recipes (
+                id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                recipe_json TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE notes (
+                id TEXT PRIMARY KEY,
+                recipe_id TEXT NOT NULL,
+                note_text TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY(recipe_id) REFERENCES recipes(id)
+            )
+            """
+        )
+        conn.execute(
+            "INSERT INTO recipes VALUES ('legacy', 'Legacy Soup', ?, '2024-01-01T00:00:00+00:00')",
+            (json.dumps(_LEGACY_RECIPE),),
+        )
+        conn.executemany(
+            "INSERT INTO notes VALUES (?, 'legacy', ?, ?)",
+            [
+                ("n1", "first", "2024-01-02T08:00:00.000001+00:00"),
+                ("n2", "second", "2024-01-03T09:30:00+00:00"),
+            ],
+        )
+    conn.close()
+
+
+def test_init_db_migrates_legacy_notes_and_backfills_aggregates(
+    monkeypatch, tmp_path: Path
+) -> None:
+    db_path = tmp_path / "legacy.db"
+    _create_legacy_db(db_path)
+    monkeypatch.setenv("RECIPE_DB_PATH", str(db_path))
+
+    init_db()
+    init_db()
+
+    with get_conn() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] >= 1
+        notes = conn.execute(
+            "SELECT id, created_at_us FROM notes ORDER BY created_at_us"
+        ).fetchall()
+        assert [row["id"] for row in notes] == ["n1", "n2"]
+        assert notes[0]["created_at_us"] == 1704182400000001
+
+        recipe = conn.execute(
+            "SELECT note_count, last_note_at, content_hash FROM recipes WHERE id = 'legacy'"
+        ).fetchone()
+        assert len(recipe["content_hash"]) == 32
+        assert recipe["note_count"] == 2
+        assert recipe["last_note_at"] == "2024-01-03T09:30:00+00:00"
+
+        by_ingredient, _ = search_recipes(conn, "leeks", limit=5, offset=0)
+        by_note, _ = search_recipes(conn, "second", limit=5, offset=0)
+        assert [item["id"] for item in by_ingredient] == ["legacy"]
+        assert [item["id"] for item in by_note] == ["legacy"]
+
+        ingredients = conn.execute(
+            """
+            SELECT name, base_quantity, base_unit
+            FROM recipe_ingredients
+            WHERE recipe_id = 'legacy'
+            """
+        ).fetchall()
+        assert [tuple(row) for row in ingredients] == [("leek", 2.0, "item")]
+
+        stored = conn.execute(
+            "SELECT recipe_json, schema_version FROM recipes WHERE id = 'legacy'"
+        ).fetchone()
+        assert "cook_mode" not in stored["recipe_json"]
+        assert stored["schema_version"] == RECIPE_SCHEMA_VERSION
+
+    entry = load_recipe_entry("legacy")
+    assert entry is not None
+    assert json.loads(entry.recipe_json) == _LEGACY_RECIPE
+    assert entry.content_hash == recipe["content_hash"]
+
+
+def test_list_notes_query_uses_composite_index(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / "recipes.db"))
+    init_db()
+
+    with get_conn() as conn:
+        plan = " ".join(
+            str(row[3])
+            for row in conn.execute(
+                """
+                EXPLAIN QUERY PLAN
+                SELECT id, note_text, created_at
+                FROM notes
+                WHERE recipe_id = ?
+                ORDER BY created_at_us DESC
+                """,
+                ("x",),
+            )
+        )
+
+    assert "idx_notes_recipe_created" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,98 @@
+import asyncio
+from pathlib import Path
+
+from app.db.sqlite import get_conn, init_db
+from app.schemas.recipe import Recipe, RecipeRequest
+from app.services import draft_store
+from app.services.draft_store import MemoryDraftStore, SQLiteDraftStore, draft_store_counters
+from app.services.generator_stub import StubRecipeGenerator
+
+
+def _recipe(theme: str):
+    return StubRecipeGenerator().generate(RecipeRequest(theme=theme, ingredients=["leek"]))
+
+
+def test_memory_draft_store_expires_and_evicts(monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(draft_store.time, "monotonic", lambda: now[0])
+    store = MemoryDraftStore(max_entries=2, ttl_seconds=60)
+    first, second, third = _recipe("First"), _recipe("Second"), _recipe("Third")
+    evictions = draft_store_counters["evictions"]
+    expired = draft_store_counters["expired"]
+
+    async def run() -> None:
+        await store.put(first)
+        await store.put(second)
+        draft = store.get(first.id)
+        assert draft is not None and draft.recipe is first
+        await store.put(third)
+        assert store.get(first.id) is None
+        assert len(store) == 2
+        assert draft_store_counters["evictions"] == evictions + 1
+
+        now[0] += 61
+        assert store.get(second.id) is None
+        assert draft_store_counters["expired"] == expired + 1
+
+        await store.discard(third.id)
+        assert len(store) == 0
+
+    asyncio.run(run())
+
+
+def test_sqlite_draft_store_is_shared_bounded_and_expires(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / "recipes.db"))
+    init_db()
+    recipe = _recipe("Shared")
+
+    async def run() -> None:
+        await SQLiteDraftStore(max_entries=2, ttl_seconds=60).put(recipe)
+        draft = SQLiteDraftStore(max_entries=2, ttl_seconds=60).get(recipe.id)
+        assert draft is not None and draft.recipe == recipe
+
+        with get_conn() as conn:
+            conn.execute("UPDATE recipe_drafts SET expires_at_us = 0")
+        assert SQLiteDraftStore(max_entries=2, ttl_seconds=60).get(recipe.id) is None
+
+        store = SQLiteDraftStore(max_entries=2, ttl_seconds=60)
+        evictions = draft_store_counters["evictions"]
+        others = [_recipe(f"Other {index}") for index in range(3)]
+        for other in others:
+            await store.put(other)
+        with get_conn() as conn:
+            kept = [row[0] for row in conn.execute("SELECT id FROM recipe_drafts")]
+        assert sorted(kept) == sorted(other.id for other in others[1:])
+        assert draft_store_counters["evictions"] == evictions + 1
+
+        await store.discard(others[2].id)
+        assert store.get(others[2].id) is None
+
+    asyncio.run(run())
+
+
+def test_sqlite_draft_store_validates_only_drafts_from_older_schemas(
+    monkeypatch, tmp_path: Path
+) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / "recipes.db"))
+    init_db()
+    store = SQLiteDraftStore(max_entries=10, ttl_seconds=60)
+    recipe = _recipe("Trusted")
+    asyncio.run(store.put(recipe))
+
+    validated: list[str] = []
+    original = Recipe.model_validate_json
+
+    def counting_validate(data, *args, **kwargs):
+        validated.append("validate")
+        return original(data, *args, **kwargs)
+
+    monkeypatch.setattr(Recipe, "model_validate_json", counting_validate)
+    draft = store.get(recipe.id)
+    assert draft is not None and draft.recipe_json == recipe.model_dump_json().encode()
+    assert validated == []
+
+    with get_conn() as conn:
+        conn.execute("UPDATE recipe_drafts SET schema_version = 0")
+    draft = store.get(recipe.id)
+    assert draft is not None and validated == ["validate"]
+    assert draft.recipe == recipe
@@ -0,0 +1,126 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+
+from app.db.grocery import parse_quantity, resolve_unit
+from app.db.sqlite import init_db
+from app.main import app
+
+
+def _recipe_payload(recipe_id: str, ingredients: list[tuple[str, str, str, bool]]) -> dict:
+    items = [
+        {"name": name, "amount": amount, "unit": unit, "optional": optional}
+        for name, amount, unit, optional in ingredients
+    ]
+    return {
+        "id": recipe_id,
+        "title": f"Recipe {recipe_id}",
+        "servings": 2,
+        "time_minutes": 20,
+        "difficulty": "easy",
+        "dish_summary": "A quick dish for the grocery list tests.",
+        "ingredients": items,
+        "steps": [{"step": 1, "text": "Cook everything.", "timer_minutes": None}],
+        "substitutions": [],
+        "cook_mode": {"ingredients_checklist": items, "step_cards": ["Cook everything."]},
+    }
+
+
+def _set_db(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / "recipes.db"))
+    init_db()
+
+
+def test_parse_quantity_handles_fractions_and_ranges() -> None:
+    assert parse_quantity("2") == 2.0
+    assert parse_quantity("0.5") == 0.5
+    assert parse_quantity("1/2") == 0.5
+    assert parse_quantity("1 1/2") == 1.5
+    assert parse_quantity("1½") == 1.5
+    assert parse_quantity("2-3") == 3.0
+    assert parse_quantity("1 to 2") == 2.0
+    assert parse_quantity("to taste") is None
+    assert parse_quantity("1/0") is None
+
+
+def test_resolve_unit_maps_aliases_to_base_units() -> None:
+    assert resolve_unit("Tablespoons").unit == "tbsp"
+    assert resolve_unit("cups").base_unit == "ml"
+    assert resolve_unit("lbs").base_unit == "g"
+    assert resolve_unit("").unit == "item"
+    assert resolve_unit("Cans") == ("can", "can", 1.0)
+
+
+def test_grocery_list_merges_quantities_across_recipes(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    first = _recipe_payload(
+        "soup",
+        [
+            ("Onions", "1", "item", False),
+            ("olive oil", "2", "tbsp", False),
+            ("stock", "500", "ml", False),
+            ("salt", "to taste", "", False),
+            ("chili flakes", "1", "pinch", True),
+        ],
+    )
+    second = _recipe_payload(
+        "stew",
+        [
+            ("onion", "1 1/2", "", False),
+            ("olive oil", "1", "tbsp", False),
+            ("stock", "1", "cup", False),
+            ("salt", "1", "tsp", False),
+        ],
+    )
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for payload in (first, second):
+                assert (await client.post("/recipes", json=payload)).status_code == 200
+
+            resp = await client.post(
+                "/grocery-list",
+                json={
+                    "recipes": [
+                        {"recipe_id": "soup", "multiplier": 2},
+                        {"recipe_id": "stew"},
+                    ]
+                },
+            )
+            assert resp.status_code == 200
+            body = resp.json()
+            assert body["recipe_count"] == 2
+            items = {(item["name"], item["unit"]): item for item in body["items"]}
+
+            assert items[("onion", "item")]["quantity"] == 3.5
+            assert items[("onion", "item")]["recipe_count"] == 2
+            assert items[("olive oil", "tbsp")]["quantity"] == 5.0
+            assert items[("stock", "l")]["quantity"] == 1.24
+            assert items[("chili flake", "pinch")]["optional"] is True
+
+            salt_unparsed = items[("salt", "item")]
+            assert salt_unparsed["quantity"] is None
+            assert salt_unparsed["other_amounts"] == ["to taste"]
+            assert items[("salt", "tsp")]["quantity"] == 1.0
+
+    asyncio.run(run())
+
+
+def test_grocery_list_rejects_unknown_recipes(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            missing = await client.post(
+                "/grocery-list", json={"recipes": [{"recipe_id": "nope"}]}
+            )
+            assert missing.status_code == 404
+            assert "nope" in missing.json()["detail"]
+
+            empty = await client.post("/grocery-list", json={"recipes": []})
+            assert empty.status_code == 422
+
+    asyncio.run(run())
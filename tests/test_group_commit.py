@@ -0,0 +1,149 @@
+import asyncio
+import sqlite3
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.core.config import get_settings
+from app.db import group_commit
+from app.db.group_commit import (
+    GroupCommitWriter,
+    group_commit_counters,
+    run_write,
+    start_group_commit,
+    stop_group_commit,
+)
+from app.db.sqlite import get_conn, init_db
+from app.main import app
+
+
+def _recipe_payload(recipe_id: str) -> dict:
+    ingredients = [{"name": "leek", "amount": "2", "unit": "item", "optional": False}]
+    return {
+        "id": recipe_id,
+        "title": "Group Commit Soup",
+        "servings": 2,
+        "time_minutes": 30,
+        "difficulty": "easy",
+        "dish_summary": "A recipe used by the group commit tests.",
+        "ingredients": ingredients,
+        "steps": [{"step": 1, "text": "Simmer leeks.", "timer_minutes": 20}],
+        "substitutions": [],
+        "cook_mode": {"ingredients_checklist": ingredients, "step_cards": ["Simmer leeks."]},
+    }
+
+
+def _set_db(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / "recipes.db"))
+    init_db()
+
+
+def test_writer_batches_operations_and_isolates_failures(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    with get_conn() as conn:
+        conn.execute("CREATE TABLE items (value INTEGER UNIQUE)")
+
+    def insert(value: int):
+        def operation(conn: sqlite3.Connection) -> int:
+            conn.execute("INSERT INTO items (value) VALUES (?)", (value,))
+            return value
+
+        return operation
+
+    batches = group_commit_counters["batches"]
+    writer = GroupCommitWriter(window_ms=200, max_batch=64)
+    # Queued before the thread starts, so all of them land in the first batch.
+    futures = [writer.submit(insert(value)) for value in (1, 2, 2, 3)]
+    writer.start()
+    try:
+        assert [futures[index].result(timeout=5) for index in (0, 1, 3)] == [1, 2, 3]
+        with pytest.raises(sqlite3.IntegrityError):
+            futures[2].result(timeout=5)
+    finally:
+        writer.stop()
+
+    assert group_commit_counters["batches"] == batches + 1
+    with get_conn() as conn:
+        values = [row[0] for row in conn.execute("SELECT value FROM items ORDER BY value")]
+    assert values == [1, 2, 3]
+
+
+def test_api_writes_go_through_group_commit(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    monkeypatch.setenv("ADMIN_ENABLED", "1")
+    get_settings.cache_clear()
+    operations = group_commit_counters["operations"]
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            saved = await client.post("/recipes", json=_recipe_payload("grouped"))
+            assert saved.status_code == 200
+            duplicate = await client.post("/recipes", json=_recipe_payload("grouped"))
+            assert duplicate.status_code == 409
+
+            responses = await asyncio.gather(
+                *(
+                    client.post("/recipes/grouped/notes", json={"note_text": f"note {index}"})
+                    for index in range(20)
+                )
+            )
+            assert [resp.status_code for resp in responses] == [200] * 20
+            missing = await client.post("/recipes/nope/notes", json={"note_text": "lost"})
+            assert missing.status_code == 404
+
+            notes = await client.get("/recipes/grouped/notes")
+            assert len(notes.json()) == 20
+
+            stats = (await client.get("/admin/writes")).json()["group_commit"]
+            assert stats["enabled"] is True
+            assert stats["largest_batch"] >= 1
+            assert stats["mean_commit_ms"] is not None
+
+    start_group_commit(window_ms=5, max_batch=64)
+    try:
+        asyncio.run(run())
+    finally:
+        stop_group_commit()
+
+    assert group_commit_counters["operations"] == operations + 23
+
+
+class _WriterKilled(BaseException):
+    pass
+
+
+def test_dead_writer_fails_waiting_writes_and_falls_back(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    def kill(conn: sqlite3.Connection) -> None:
+        raise _WriterKilled
+
+    writer = GroupCommitWriter(window_ms=200, max_batch=64)
+    monkeypatch.setattr(group_commit, "_writer", writer)
+    futures = [writer.submit(kill), writer.submit(lambda conn: 1)]
+    writer.start()
+    for future in futures:
+        with pytest.raises(RuntimeError, match="writer has stopped"):
+            future.result(timeout=5)
+
+    assert group_commit._writer is None
+    with pytest.raises(RuntimeError):
+        writer.submit(lambda conn: 1).result(timeout=0)
+    assert asyncio.run(run_write(lambda conn: conn.execute("SELECT 7").fetchone()[0])) == 7
+
+
+def test_writer_that_cannot_connect_fails_queued_writes(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    def no_conn():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    monkeypatch.setattr(group_commit, "get_conn", no_conn)
+    writer = GroupCommitWriter(window_ms=1, max_batch=64)
+    future = writer.submit(lambda conn: 1)
+    writer.start()
+    with pytest.raises(RuntimeError) as info:
+        future.result(timeout=5)
+    assert isinstance(info.value.__cause__, sqlite3.OperationalError)
@@ -0,0 +1,115 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+
+from app.db.sqlite import init_db
+from app.main import app
+
+
+def _recipe_payload(recipe_id: str, title: str) -> dict:
+    ingredients = [{"name": "lemon", "amount": "1", "unit": "item", "optional": False}]
+    return {
+        "id": recipe_id,
+        "title": title,
+        "servings": 2,
+        "time_minutes": 10,
+        "difficulty": "easy",
+        "dish_summary": "A recipe used by the conditional GET tests.",
+        "ingredients": ingredients,
+        "steps": [{"step": 1, "text": "Slice lemon.", "timer_minutes": None}],
+        "substitutions": [],
+        "cook_mode": {"ingredients_checklist": ingredients, "step_cards": ["Slice lemon."]},
+    }
+
+
+def _set_db(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / "recipes.db"))
+    init_db()
+
+
+def test_recipe_json_and_cook_page_return_304_for_matching_etag(
+    monkeypatch, tmp_path: Path
+) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("etag", "Lemon Slices"))
+
+            for path in ("/recipes/etag", "/cook/etag"):
+                first = await client.get(path)
+                assert first.status_code == 200
+                etag = first.headers["etag"]
+                assert first.headers["cache-control"] == "private, max-age=300"
+
+                cached = await client.get(path, headers={"If-None-Match": etag})
+                assert cached.status_code == 304
+                assert cached.content == b""
+                assert cached.headers["etag"] == etag
+
+                weak = await client.get(path, headers={"If-None-Match": f'"x", W/{etag}'})
+                assert weak.status_code == 304
+
+                other = await client.get(path, headers={"If-None-Match": '"other"'})
+                assert other.status_code == 200
+
+            missing = await client.get("/cook/absent", headers={"If-None-Match": "*"})
+            assert missing.status_code == 404
+
+    asyncio.run(run())
+
+
+def test_detail_page_etag_follows_notes_and_similar_panel_follows_new_recipes(
+    monkeypatch, tmp_path: Path
+) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("detail", "Lemon Detail"))
+
+            page = await client.get("/recipes/ui/detail")
+            notes = await client.get("/recipes/detail/notes")
+            assert page.headers["cache-control"] == "private, no-cache"
+            assert notes.headers["cache-control"] == "private, no-cache"
+            page_etag, notes_etag = page.headers["etag"], notes.headers["etag"]
+            assert (
+                await client.get("/recipes/ui/detail", headers={"If-None-Match": page_etag})
+            ).status_code == 304
+            assert (
+                await client.get("/recipes/detail/notes", headers={"If-None-Match": notes_etag})
+            ).status_code == 304
+
+            await client.post("/recipes/detail/notes", json={"note_text": "More zest."})
+            page = await client.get("/recipes/ui/detail", headers={"If-None-Match": page_etag})
+            notes = await client.get("/recipes/detail/notes", headers={"If-None-Match": notes_etag})
+            assert page.status_code == 200
+            assert "More zest." in page.text
+            assert notes.status_code == 200
+            assert notes.json()[0]["note_text"] == "More zest."
+
+            # A new recipe only changes the separately loaded similar-recipes panel.
+            page_etag = page.headers["etag"]
+            partial = {"X-Partial": "1"}
+            panel = await client.get("/recipes/ui/detail/similar", headers=partial)
+            assert panel.headers["cache-control"] == "private, no-cache"
+            panel_etag = panel.headers["etag"]
+            assert (
+                await client.get(
+                    "/recipes/ui/detail/similar", headers={**partial, "If-None-Match": panel_etag}
+                )
+            ).status_code == 304
+
+            await client.post("/recipes", json=_recipe_payload("other", "Lemon Other"))
+            page = await client.get("/recipes/ui/detail", headers={"If-None-Match": page_etag})
+            assert page.status_code == 304
+            panel = await client.get(
+                "/recipes/ui/detail/similar", headers={**partial, "If-None-Match": panel_etag}
+            )
+            assert panel.status_code == 200
+            assert "Lemon Other" in panel.text
+
+    asyncio.run(run())
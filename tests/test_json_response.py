@@ -0,0 +1,47 @@
+import asyncio
+import json
+from typing import Any
+
+from app.core.json_response import FastJSONResponse, StreamingJSONResponse
+from app.schemas.recipe import RecipeRequest
+from app.services.generator_stub import StubRecipeGenerator
+
+
+def test_fast_json_response_serializes_models_and_nested_data() -> None:
+    recipe = StubRecipeGenerator().generate(RecipeRequest(theme="Soup", ingredients=["leek"]))
+
+    resp = FastJSONResponse({"recipe": recipe, "tags": ["café"]}, status_code=201)
+
+    assert resp.status_code == 201
+    assert resp.headers["content-type"] == "application/json"
+    assert json.loads(bytes(resp.body)) == {
+        "recipe": json.loads(recipe.model_dump_json()),
+        "tags": ["café"],
+    }
+    assert FastJSONResponse(recipe).body == recipe.model_dump_json().encode()
+
+
+def test_fast_json_response_encoder_is_pluggable() -> None:
+    class SortedJSONResponse(FastJSONResponse):
+        @staticmethod
+        def dumps(content: Any) -> bytes:
+            return json.dumps(content, sort_keys=True).encode()
+
+    assert SortedJSONResponse({"b": 1, "a": 2}).body == b'{"a": 2, "b": 1}'
+
+
+def test_streaming_json_response_matches_buffered_bytes_across_chunks() -> None:
+    async def body(resp: StreamingJSONResponse) -> bytes:
+        chunks = [chunk async for chunk in resp.body_iterator]
+        assert all(isinstance(chunk, bytes) for chunk in chunks)
+        return b"".join(chunk for chunk in chunks if isinstance(chunk, bytes))
+
+    for count in (0, 1, 2, 5):
+        items = [{"id": index, "name": "café"} for index in range(count)]
+        array = StreamingJSONResponse(iter(items), chunk_items=2)
+        assert array.media_type == "application/json"
+        assert asyncio.run(body(array)) == FastJSONResponse(items).body
+
+        ndjson = asyncio.run(body(StreamingJSONResponse(iter(items), ndjson=True, chunk_items=2)))
+        assert [json.loads(line) for line in ndjson.splitlines()] == items
+        assert ndjson.endswith(b"\n") or count == 0
@@ -0,0 +1,157 @@
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+
+from app.db.sqlite import get_conn, init_db
+from app.main import app
+
+
+def _recipe_payload(recipe_id: str, title: str) -> dict:
+    ingredients = [{"name": "leek", "amount": "2", "unit": "item", "optional": False}]
+    return {
+        "id": recipe_id,
+        "title": title,
+        "servings": 2,
+        "time_minutes": 30,
+        "difficulty": "easy",
+        "dish_summary": "A recipe used by the import and export tests.",
+        "ingredients": ingredients,
+        "steps": [{"step": 1, "text": "Simmer leeks.", "timer_minutes": 20}],
+        "substitutions": [],
+        "cook_mode": {"ingredients_checklist": ingredients, "step_cards": ["Simmer leeks."]},
+    }
+
+
+def _set_db(monkeypatch, tmp_path: Path, name: str) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / name))
+    init_db()
+
+
+def test_export_then_import_round_trips_library(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path, "source.db")
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for index in range(3):
+                payload = _recipe_payload(f"recipe-{index}", f"Soup {index}")
+                assert (await client.post("/recipes", json=payload)).status_code == 200
+            await client.post("/recipes/recipe-1/notes", json={"note_text": "Add saffron"})
+            originals = [(await client.get(f"/recipes/recipe-{i}")).content for i in range(3)]
+            listed = (await client.get("/recipes")).json()
+
+            export = await client.get("/recipes/export")
+            assert export.status_code == 200
+            assert export.headers["content-type"] == "application/x-ndjson"
+            lines = export.content.splitlines()
+            assert len(lines) == 3
+            assert json.loads(lines[1])["notes"][0]["note_text"] == "Add saffron"
+
+            _set_db(monkeypatch, tmp_path, "target.db")
+            body = export.content + b"not json\n" + lines[0] + b"\n"
+            imported = await client.post(
+                "/recipes/import", content=body, params={"import_id": "restore"}
+            )
+            assert imported.status_code == 200
+            summary = imported.json()
+            assert summary["import_id"] == "restore"
+            assert summary["done"] is True
+            assert summary["created"] == 3
+            assert summary["skipped"] == 1
+            assert summary["invalid"] == 1
+            assert summary["errors"][0]["line"] == 4
+            assert (await client.get("/recipes/import/restore")).json() == summary
+
+            assert [(await client.get(f"/recipes/recipe-{i}")).content for i in range(3)] == (
+                originals
+            )
+            assert (await client.get("/recipes")).json() == listed
+            notes = (await client.get("/recipes/recipe-1/notes")).json()
+            assert [note["note_text"] for note in notes] == ["Add saffron"]
+            found = (await client.get("/recipes/search", params={"q": "saffron"})).json()
+            assert [item["id"] for item in found["results"]] == ["recipe-1"]
+
+    asyncio.run(run())
+
+
+def test_batch_save_handles_conflicts_per_item(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path, "batch.db")
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = [_recipe_payload(f"week-{day}", f"Day {day} Stew") for day in range(3)]
+            saved = await client.post("/recipes/batch", json=first)
+            assert saved.status_code == 200
+            assert [item["status"] for item in saved.json()["items"]] == ["created"] * 3
+            await client.post("/recipes/week-0/notes", json={"note_text": "Double the leeks"})
+
+            second = [_recipe_payload("week-0", "Saffron Risotto"), _recipe_payload("week-3", "Pie")]
+            skipped = await client.post("/recipes/batch", json=second)
+            assert [item["status"] for item in skipped.json()["items"]] == ["skipped", "created"]
+            assert (await client.get("/recipes/week-0")).json()["title"] == "Day 0 Stew"
+
+            failed = await client.post(
+                "/recipes/batch",
+                json=[_recipe_payload("week-4", "Tacos"), second[0]],
+                params={"on_conflict": "fail"},
+            )
+            assert failed.status_code == 409
+            assert [item["status"] for item in failed.json()["detail"]["items"]] == [
+                "aborted",
+                "conflict",
+            ]
+            assert (await client.get("/recipes/week-4")).status_code == 404
+
+            replaced = await client.post(
+                "/recipes/batch", json=second[:1], params={"on_conflict": "replace"}
+            )
+            assert replaced.json()["items"] == [{"id": "week-0", "status": "replaced"}]
+            assert (await client.get("/recipes/week-0")).json()["title"] == "Saffron Risotto"
+            notes = (await client.get("/recipes/week-0/notes")).json()
+            assert [note["note_text"] for note in notes] == ["Double the leeks"]
+            found = (await client.get("/recipes/search", params={"q": "saffron"})).json()
+            assert [hit["id"] for hit in found["results"]] == ["week-0"]
+            stale = (await client.get("/recipes/search", params={"q": "day 0 stew"})).json()
+            assert stale["results"] == []
+            assert len((await client.get("/recipes")).json()) == 4
+
+            repeated = await client.post("/recipes/batch", json=[second[1], second[1]])
+            assert repeated.status_code == 422
+            empty = await client.post("/recipes/batch", json=[])
+            assert empty.status_code == 422
+            assert empty.json()["detail"][0]["loc"] == ["body"]
+
+    asyncio.run(run())
+
+
+def test_import_progress_is_shared_and_ends_on_failure(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path, "imports.db")
+    lines = [json.dumps({"recipe": _recipe_payload(f"imp-{i}", f"Stew {i}")}) for i in range(3)]
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("imp-2", "Existing Stew"))
+            failed = await client.post(
+                "/recipes/import",
+                content="\n".join(lines).encode(),
+                params={"import_id": "clash", "on_conflict": "fail"},
+            )
+            assert failed.status_code == 409
+
+            progress = (await client.get("/recipes/import/clash")).json()
+            assert progress["done"] is True
+            assert progress["conflicts"] == ["imp-2"]
+
+            missing = await client.get("/recipes/import/never")
+            assert missing.status_code == 404
+
+    asyncio.run(run())
+
+    # Progress lives in the database, so another worker answers the poll too.
+    with get_conn() as conn:
+        row = conn.execute("SELECT progress_json FROM recipe_imports WHERE id = 'clash'").fetchone()
+    assert json.loads(row["progress_json"])["done"] is True
@@ -0,0 +1,192 @@
+import asyncio
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import httpx
+
+from app.api import ui as ui_module
+from app.api.ui import render_recipe_pages
+from app.core.config import get_settings
+from app.db.bulk import BulkRecipe, insert_recipes
+from app.db.sqlite import get_conn, get_db_path, init_db
+from app.main import app
+from app.schemas.recipe import Recipe
+from app.services.prerender import (
+    get_prerender_store,
+    prerender_counters,
+    start_prerender,
+    stop_prerender,
+)
+from app.services.prerender_site import main as prerender_site_main
+from app.services.prerender_site import rebuild_site
+
+
+def _set_db(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / "recipes.db"))
+    init_db()
+
+
+def _recipe_payload(recipe_id: str, title: str) -> dict:
+    ingredients = [{"name": "leek", "amount": "2", "unit": "item", "optional": False}]
+    return {
+        "id": recipe_id,
+        "title": title,
+        "servings": 2,
+        "time_minutes": 25,
+        "difficulty": "easy",
+        "dish_summary": "A recipe used by the pre-render tests.",
+        "ingredients": ingredients,
+        "steps": [{"step": 1, "text": "Slice leeks.", "timer_minutes": None}],
+        "substitutions": [],
+        "cook_mode": {"ingredients_checklist": ingredients, "step_cards": ["Slice leeks."]},
+    }
+
+
+def _pages(tmp_path: Path, kind: str) -> list[Path]:
+    return sorted((tmp_path / "prerendered" / kind).glob("*.html"))
+
+
+def test_pages_are_written_on_first_view_and_served_from_disk(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("leek", "Leek Gratin"))
+
+            for path, kind in (("/recipes/ui/leek", "detail"), ("/cook/leek", "cook")):
+                rendered = await client.get(path)
+                assert rendered.status_code == 200
+                [page] = _pages(tmp_path, kind)
+                assert page.read_bytes() == rendered.content
+
+                hits = prerender_counters["hits"]
+                served = await client.get(path)
+                assert prerender_counters["hits"] == hits + 1
+                assert served.content == rendered.content
+                assert served.headers["etag"] == rendered.headers["etag"]
+                assert served.headers["cache-control"] == rendered.headers["cache-control"]
+                assert served.headers["content-type"].startswith("text/html")
+
+            # A note changes the detail page's ETag: the stale file is not served, and is
+            # replaced once the new page is rendered.
+            [before] = _pages(tmp_path, "detail")
+            await client.post("/recipes/leek/notes", json={"note_text": "Extra gruyere."})
+            page = await client.get("/recipes/ui/leek")
+            assert "Extra gruyere." in page.text
+            [after] = _pages(tmp_path, "detail")
+            assert after != before
+            assert b"Extra gruyere." in after.read_bytes()
+
+    asyncio.run(run())
+
+
+def test_worker_renders_pages_after_save_and_note(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    def wait_for(predicate) -> None:
+        deadline = time.monotonic() + 5
+        while not predicate():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("soup", "Leek Soup"))
+            wait_for(lambda: len(_pages(tmp_path, "detail")) == 1 and _pages(tmp_path, "cook"))
+
+            await client.post("/recipes/soup/notes", json={"note_text": "Add potato."})
+            wait_for(lambda: b"Add potato." in _pages(tmp_path, "detail")[0].read_bytes())
+
+            hits = prerender_counters["hits"]
+            page = await client.get("/recipes/ui/soup")
+            assert "Add potato." in page.text
+            assert prerender_counters["hits"] == hits + 1
+
+    start_prerender(render_recipe_pages)
+    try:
+        asyncio.run(run())
+    finally:
+        stop_prerender()
+
+
+def test_rebuild_site_renders_every_recipe(monkeypatch, tmp_path: Path, capsys) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for recipe_id in ("a", "b", "c"):
+                await client.post("/recipes", json=_recipe_payload(recipe_id, f"Leek {recipe_id}"))
+
+    asyncio.run(run())
+    store = get_prerender_store()
+    assert store is not None
+    assert render_recipe_pages(store, "missing") == 0
+
+    summary = rebuild_site(store)
+    assert summary["recipes"] == 3
+    assert summary["pages"] == 6
+    assert len(_pages(tmp_path, "detail")) == len(_pages(tmp_path, "cook")) == 3
+
+    prerender_site_main(["--clear"])
+    assert '"removed": 6' in capsys.readouterr().out
+    assert len(_pages(tmp_path, "detail")) == 3
+
+
+def test_prerender_can_be_turned_off(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    monkeypatch.setenv("PRERENDER", "0")
+    get_settings.cache_clear()
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("off", "Leek Off"))
+            assert (await client.get("/cook/off")).status_code == 200
+
+    asyncio.run(run())
+    assert get_prerender_store() is None
+    assert not (tmp_path / "prerendered").exists()
+
+
+def test_replaced_recipe_is_never_prerendered_under_a_stale_etag(
+    monkeypatch, tmp_path: Path
+) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("r1", "Simmer Old"))
+            old = await client.get("/recipes/ui/r1")
+            assert "Simmer Old" in old.text
+
+            # Replaced by another worker: nothing in this one is told about it.
+            replacement = Recipe.model_validate(_recipe_payload("r1", "Simmer New"))
+            with get_conn() as conn:
+                insert_recipes(
+                    conn,
+                    get_db_path(),
+                    [BulkRecipe(replacement, datetime.now(UTC), [])],
+                    compress=True,
+                    on_conflict="replace",
+                )
+            new = await client.get("/recipes/ui/r1")
+            assert "Simmer New" in new.text
+            assert new.headers["etag"] != old.headers["etag"]
+            [page] = _pages(tmp_path, "detail")
+            assert b"Simmer New" in page.read_bytes()
+            assert b"Simmer Old" not in page.read_bytes()
+
+    asyncio.run(run())
+
+    # A version read just before the replace renders the new row under the new row's ETag.
+    stale = {"content_hash": "before-replace", "note_count": 0}
+    page = ui_module._detail_page("r1", stale)
+    assert page is not None
+    etag, context = page
+    assert context["recipe"].title == "Simmer New"
+    assert etag != ui_module._detail_etag("before-replace", 0)
@@ -0,0 +1,98 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+
+from app.core.config import get_settings
+from app.db.query_log import (
+    param_shapes,
+    query_stats,
+    reset_query_stats,
+    slow_query_log,
+    top_queries,
+)
+from app.db.sqlite import get_conn, init_db
+from app.main import app
+
+
+def _set_db(monkeypatch, tmp_path: Path, threshold_ms: str) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / "recipes.db"))
+    monkeypatch.setenv("SLOW_QUERY_THRESHOLD_MS", threshold_ms)
+    get_settings.cache_clear()
+    init_db()
+    reset_query_stats()
+
+
+def test_param_shapes_hide_values() -> None:
+    assert param_shapes(("secret-id", 3, None, b"ab")) == ["str[9]", "int", "null", "bytes[2]"]
+    assert param_shapes({"recipe_id": "abc"}) == {"recipe_id": "str[3]"}
+
+
+def test_statements_are_timed_and_summarized(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path, "100000")
+
+    with get_conn() as conn:
+        for _ in range(3):
+            conn.execute("SELECT id FROM recipes WHERE id = ?", ("x",)).fetchall()
+
+    summary = {entry["sql"]: entry for entry in top_queries(50)}
+    entry = summary["SELECT id FROM recipes WHERE id = ?"]
+    assert entry["calls"] == 3
+    assert entry["slow_calls"] == 0
+    assert entry["total_ms"] >= entry["max_ms"] >= 0
+    assert not slow_query_log
+
+
+def test_slow_statements_capture_shapes_and_query_plan(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path, "0")
+
+    with get_conn() as conn:
+        conn.execute(
+            "SELECT id, note_text FROM notes WHERE recipe_id = ? ORDER BY created_at DESC",
+            ("private-recipe-id",),
+        ).fetchall()
+
+    entry = next(item for item in slow_query_log if item["sql"].startswith("SELECT id, note_text"))
+    assert entry["param_shapes"] == ["str[17]"]
+    assert "private-recipe-id" not in str(entry)
+    assert entry["query_plan"]
+    assert any("notes" in line for line in entry["query_plan"])
+
+
+def test_admin_queries_endpoint_reports_top_queries(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path, "0")
+    monkeypatch.setenv("ADMIN_ENABLED", "1")
+    get_settings.cache_clear()
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/recipes")
+            resp = await client.get("/admin/queries", params={"limit": 5})
+            assert resp.status_code == 200
+            body = resp.json()
+            assert any("FROM recipes" in item["sql"] for item in body["top_queries"])
+            assert body["slow_queries"]
+
+    asyncio.run(run())
+
+
+def test_row_fetching_counts_towards_statement_time(monkeypatch, tmp_path: Path, caplog) -> None:
+    _set_db(monkeypatch, tmp_path, "20")
+    sql = (
+        "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 200000) "
+        "SELECT x FROM c"
+    )
+
+    with get_conn() as conn:
+        cursor = conn.execute(sql)
+        execute_ms = query_stats.get(sql, {}).get("total_ms", 0.0)
+        with caplog.at_level("WARNING", logger="app.db.query_log"):
+            assert sum(1 for _ in cursor) == 200000
+
+    entry = {item["sql"]: item for item in top_queries(50)}[sql]
+    assert execute_ms == 0.0
+    assert entry["calls"] == 1
+    assert entry["max_ms"] >= 20
+    assert entry["slow_calls"] == 1
+    assert any(sql in record.getMessage() for record in caplog.records)
@@ -0,0 +1,199 @@
+import asyncio
+from datetime import UTC, datetime
+from pathlib import Path
+from uuid import uuid4
+
+import httpx
+
+from app.api import library
+from app.core.config import get_settings
+from app.db.bulk import BulkRecipe, insert_recipes
+from app.db.sqlite import get_conn, get_db_path, init_db
+from app.main import app
+from app.schemas.recipe import Recipe
+from app.services import recipe_cache
+from app.services.recipe_cache import (
+    CachedRecipe,
+    RecipeCache,
+    SharedRecipeTier,
+    load_recipe_entry,
+    recipe_cache_counters,
+)
+
+
+def _recipe_payload(recipe_id: str) -> dict:
+    ingredients = [{"name": "lemon", "amount": "1", "unit": "item", "optional": False}]
+    return {
+        "id": recipe_id,
+        "title": f"Cached {recipe_id}",
+        "servings": 2,
+        "time_minutes": 10,
+        "difficulty": "easy",
+        "dish_summary": "A recipe used by the cache tests.",
+        "ingredients": ingredients,
+        "steps": [{"step": 1, "text": "Slice lemon.", "timer_minutes": None}],
+        "substitutions": [],
+        "cook_mode": {"ingredients_checklist": ingredients, "step_cards": ["Slice lemon."]},
+    }
+
+
+def _set_db(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / "recipes.db"))
+    init_db()
+
+
+def test_recipe_cache_evicts_least_recently_used() -> None:
+    cache = RecipeCache(max_entries=2)
+    entries = {
+        key: CachedRecipe(Recipe.model_validate(_recipe_payload(key)).model_dump_json().encode())
+        for key in ("a", "b", "c")
+    }
+    evictions = recipe_cache_counters["evictions"]
+
+    cache.put("a", entries["a"])
+    cache.put("b", entries["b"])
+    assert cache.get("a") is entries["a"]
+    cache.put("c", entries["c"])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is entries["a"]
+    assert cache.get("c") is entries["c"]
+    assert entries["c"].recipe.id == "c"
+    assert len(cache) == 2
+    assert recipe_cache_counters["evictions"] == evictions + 1
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+
+def test_shared_tier_is_visible_across_attachments() -> None:
+    name = f"recipe-cache-test-{uuid4().hex[:12]}"
+    writer = SharedRecipeTier(name, slots=8, slot_size=4096)
+    reader = SharedRecipeTier(name, slots=8, slot_size=4096)
+    try:
+        payload = Recipe.model_validate(_recipe_payload("shared")).model_dump_json()
+        assert writer.put("db\x00shared", payload.encode())
+        assert reader.get("db\x00shared") == payload.encode()
+        assert reader.get("db\x00other") is None
+
+        # A slot left mid-write (odd sequence) reads as a miss rather than a torn entry.
+        offset = writer._slot_offset(b"db\x00shared")
+        writer._SEQUENCE.pack_into(writer._buffer, offset, 1)
+        assert reader.get("db\x00shared") is None
+
+        assert writer.put("db\x00shared", payload.encode())
+        cache = RecipeCache(max_entries=4, shared=reader)
+        shared_hits = recipe_cache_counters["shared_hits"]
+        entry = cache.get("db\x00shared")
+        assert entry is not None
+        assert entry.recipe == Recipe.model_validate_json(payload)
+        assert recipe_cache_counters["shared_hits"] == shared_hits + 1
+
+        writer.invalidate("db\x00shared")
+        assert reader.get("db\x00shared") is None
+        assert not writer.put("db\x00big", b"x" * 5000)
+    finally:
+        reader.close()
+        writer.close()
+        writer._memory.unlink()
+
+
+def test_get_recipe_is_served_from_cache_after_save(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    monkeypatch.setenv("ADMIN_ENABLED", "1")
+    get_settings.cache_clear()
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.post("/recipes", json=_recipe_payload("hot"))).status_code == 200
+            hits = recipe_cache_counters["hits"]
+
+            # Write-through on save means even the first read only checks the row's hash.
+            with get_conn() as conn:
+                conn.execute("UPDATE recipes SET recipe_json = '{}' WHERE id = 'hot'")
+            for path in ("/recipes/hot", "/cook/hot"):
+                assert (await client.get(path)).status_code == 200
+            assert recipe_cache_counters["hits"] == hits + 2
+
+            missing = await client.get("/recipes/absent")
+            assert missing.status_code == 404
+
+            stats = (await client.get("/admin/cache")).json()["recipe_cache"]
+            assert stats["entries"] >= 1
+            assert stats["shared"] is False
+            assert 0 < stats["hit_rate"] <= 1
+
+    asyncio.run(run())
+
+
+def test_repeated_read_skips_sqlite_until_the_database_changes(
+    monkeypatch, tmp_path: Path
+) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("r1"))
+            await client.post("/recipes", json=_recipe_payload("r2"))
+
+    asyncio.run(run())
+    first = load_recipe_entry("r1")
+    assert first is not None
+
+    def no_sqlite():
+        raise AssertionError("cache hit touched SQLite")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(recipe_cache, "get_conn", no_sqlite)
+        assert load_recipe_entry("r1") is first
+
+    # A write by any connection changes the database files, so the next read checks the row.
+    with get_conn() as conn:
+        conn.execute("UPDATE recipes SET title = 'Renamed' WHERE id = 'r2'")
+    lookups: list[str] = []
+
+    def counted_conn():
+        lookups.append("r1")
+        return get_conn()
+
+    monkeypatch.setattr(recipe_cache, "get_conn", counted_conn)
+    assert load_recipe_entry("r1") is first
+    assert load_recipe_entry("r1") is first
+    assert lookups == ["r1"]
+
+
+def test_recipe_replaced_by_another_worker_is_not_served_stale(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    scheduled: list[str] = []
+    monkeypatch.setattr(library, "schedule_prerender", scheduled.append)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("r1"))
+            assert (await client.get("/recipes/r1")).json()["title"] == "Cached r1"
+
+            # Another worker's replace: the row changes, but nothing here is invalidated.
+            replacement = Recipe.model_validate({**_recipe_payload("r1"), "title": "Simmer New"})
+            with get_conn() as conn:
+                insert_recipes(
+                    conn,
+                    get_db_path(),
+                    [BulkRecipe(replacement, datetime.now(UTC), [])],
+                    compress=True,
+                    on_conflict="replace",
+                )
+            assert (await client.get("/recipes/r1")).json()["title"] == "Simmer New"
+            assert "Simmer New" in (await client.get("/cook/r1")).text
+
+            replaced = await client.post(
+                "/recipes/batch",
+                params={"on_conflict": "replace"},
+                json=[{**_recipe_payload("r1"), "title": "Simmer Again"}],
+            )
+            assert replaced.json()["items"] == [{"id": "r1", "status": "replaced"}]
+            assert scheduled == ["r1"]
+
+    asyncio.run(run())
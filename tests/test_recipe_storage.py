@@ -0,0 +1,76 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+
+from app.db.recipe_storage import pack_recipe_json, unpack_recipe_json
+from app.db.sqlite import get_conn, init_db
+from app.main import app
+from app.schemas.recipe import CookMode, Recipe, RecipeIngredient, RecipeStep
+
+
+def _recipe(recipe_id: str, cook_mode: CookMode | None = None) -> Recipe:
+    ingredients = [
+        RecipeIngredient(name='jalapeño "hot"', amount="½", unit="item"),
+        RecipeIngredient(name="lime", amount="1", unit="item", optional=True),
+    ]
+    steps = [
+        RecipeStep(step=1, text="Slice the jalapeño.\nKeep the seeds.", timer_minutes=None),
+        RecipeStep(step=2, text="Squeeze </lime>.", timer_minutes=2),
+    ]
+    return Recipe(
+        id=recipe_id,
+        title="Crème salsa",
+        servings=2,
+        time_minutes=10,
+        difficulty="easy",
+        dish_summary="A recipe used by the storage tests.",
+        ingredients=ingredients,
+        steps=steps,
+        substitutions=[],
+        cook_mode=cook_mode or CookMode.derive(ingredients, steps),
+    )
+
+
+def _set_db(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("RECIPE_DB_PATH", str(tmp_path / "recipes.db"))
+    monkeypatch.setenv("RECIPE_CACHE_SIZE", "0")
+    monkeypatch.setenv("RECIPE_COMPRESSION", "0")
+    init_db()
+
+
+def test_packed_recipe_expands_to_identical_json() -> None:
+    recipe = _recipe("packed")
+
+    packed = pack_recipe_json(recipe)
+
+    assert "cook_mode" not in packed
+    assert unpack_recipe_json(packed.encode()) == recipe.model_dump_json().encode()
+
+
+def test_recipes_are_stored_without_derived_cook_mode(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    derived = _recipe("derived")
+    custom = _recipe("custom", CookMode(ingredients_checklist=[], step_cards=["Just eat it."]))
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for recipe in (derived, custom):
+                response = await client.post("/recipes", json=recipe.model_dump())
+                assert response.status_code == 200
+
+            with get_conn() as conn:
+                rows = dict(conn.execute("SELECT id, recipe_json FROM recipes").fetchall())
+            assert "cook_mode" not in rows["derived"]
+            assert "Just eat it." in rows["custom"]
+
+            for recipe in (derived, custom):
+                response = await client.get(f"/recipes/{recipe.id}")
+                assert response.content == recipe.model_dump_json().encode()
+
+            cook = await client.get("/cook/derived")
+            assert cook.status_code == 200
+            assert "Keep the seeds." in cook.text
+
+    asyncio.run(run())
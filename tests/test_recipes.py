@@ -1,9 +1,11 @@
 import asyncio
+import json
 from pathlib import Path
 
 import httpx
 
-from app.db.sqlite import init_db
+from app.core.http_cache import decoded_etag
+from app.db.sqlite import get_conn, init_db
 from app.main import app
 
 
@@ -142,6 +144,12 @@ def test_list_recipes_returns_newest_first(monkeypatch, tmp_path: Path) -> None:
             body = list_resp.json()
             assert [item["id"] for item in body] == ["newer", "older"]
 
+            limited = await client.get("/recipes", params={"limit": 1})
+            assert [item["id"] for item in limited.json()] == ["newer"]
+            streamed = await client.get("/recipes", params={"limit": 1, "stream": "true"})
+            assert [item["id"] for item in streamed.json()] == ["newer"]
+            assert (await client.get("/recipes", params={"limit": 0})).status_code == 422
+
     asyncio.run(run())
 
 
@@ -219,3 +227,230 @@ def test_unknown_recipe_id_returns_404_for_get_and_notes(monkeypatch, tmp_path:
             assert add_note_resp.status_code == 404
 
     asyncio.run(run())
+
+
+def test_list_recipes_includes_note_aggregates(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("with-notes"))
+            await client.post("/recipes", json=_recipe_payload("without-notes"))
+            for text in ("first", "second"):
+                resp = await client.post("/recipes/with-notes/notes", json={"note_text": text})
+                assert resp.status_code == 200
+
+            notes = (await client.get("/recipes/with-notes/notes")).json()
+            body = {item["id"]: item for item in (await client.get("/recipes")).json()}
+            assert body["with-notes"]["note_count"] == 2
+            assert body["with-notes"]["last_note_at"] == notes[0]["created_at"]
+            assert body["without-notes"]["note_count"] == 0
+            assert body["without-notes"]["last_note_at"] is None
+
+    asyncio.run(run())
+
+
+def test_list_endpoints_stream_json_arrays_and_ndjson(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    ndjson = {"Accept": "application/x-ndjson"}
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for recipe_id in ("first", "second"):
+                await client.post("/recipes", json=_recipe_payload(recipe_id))
+            for text in ("one", "two"):
+                await client.post("/recipes/first/notes", json={"note_text": text})
+
+            listed = await client.get("/recipes")
+            streamed = await client.get("/recipes", params={"stream": "true"})
+            assert streamed.content == listed.content
+            lines = (await client.get("/recipes", headers=ndjson)).content.splitlines()
+            assert [json.loads(line) for line in lines] == listed.json()
+
+            notes = await client.get("/recipes/first/notes")
+            streamed_notes = await client.get("/recipes/first/notes", params={"stream": "1"})
+            assert streamed_notes.json() == notes.json()
+            # The streamed body is compressed and the small buffered one is not.
+            assert decoded_etag(streamed_notes.headers["etag"]) == notes.headers["etag"]
+            ndjson_notes = await client.get("/recipes/first/notes", headers=ndjson)
+            assert ndjson_notes.headers["content-type"] == "application/x-ndjson"
+            assert ndjson_notes.headers["etag"] != notes.headers["etag"]
+            assert [json.loads(line) for line in ndjson_notes.content.splitlines()] == notes.json()
+
+            missing = await client.get("/recipes/nope/notes", headers=ndjson)
+            assert missing.status_code == 404
+
+    asyncio.run(run())
+
+
+def test_search_ranks_title_matches_and_paginates(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    title_match = _recipe_payload("lemon-title")
+    title_match["title"] = "Lemon Tart"
+    step_match = _recipe_payload("lemon-step")
+    step_match["title"] = "Chickpea Stew"
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=step_match)
+            await client.post("/recipes", json=title_match)
+
+            resp = await client.get("/recipes/search", params={"q": "lemon"})
+            assert resp.status_code == 200
+            body = resp.json()
+            assert [item["id"] for item in body["results"]] == ["lemon-title", "lemon-step"]
+            assert "<mark>" in body["results"][0]["snippet"]
+            assert body["has_more"] is False
+
+            first_page = (await client.get("/recipes/search", params={"q": "lem", "limit": 1})).json()
+            assert len(first_page["results"]) == 1
+            assert first_page["has_more"] is True
+            second_page = (
+                await client.get("/recipes/search", params={"q": "lem", "limit": 1, "offset": 1})
+            ).json()
+            assert second_page["results"][0]["id"] != first_page["results"][0]["id"]
+
+    asyncio.run(run())
+
+
+def test_search_pages_a_fixed_candidate_set_without_overlap(
+    monkeypatch, tmp_path: Path
+) -> None:
+    _set_db(monkeypatch, tmp_path)
+    oldest = _recipe_payload("saffron-title")
+    oldest["title"] = "Saffron Rice"
+    newer = []
+    for index in range(300):
+        payload = _recipe_payload(f"saffron-step-{index}")
+        payload["title"] = f"Stew {index}"
+        payload["steps"][1]["text"] = "Add a pinch of saffron and serve."
+        newer.append(payload)
+    newer[150]["dish_summary"] = "A saffron stew."
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=oldest)
+            resp = await client.post("/recipes/batch", json=newer)
+            assert resp.status_code == 200
+
+            first = (await client.get("/recipes/search", params={"q": "saffron"})).json()
+            assert [item["id"] for item in first["results"][:3]] == [
+                "saffron-title",
+                "saffron-step-150",
+                "saffron-step-299",
+            ]
+
+            seen: list[str] = []
+            page: dict = {"has_more": True}
+            offset = 0
+            while page["has_more"]:
+                page = (
+                    await client.get(
+                        "/recipes/search", params={"q": "saffron", "limit": 50, "offset": offset}
+                    )
+                ).json()
+                seen.extend(item["id"] for item in page["results"])
+                offset += 50
+            # The oldest title match plus the newest 200 matches; older step matches are cut.
+            assert len(seen) == len(set(seen)) == 201
+            assert "saffron-step-99" not in seen
+
+    asyncio.run(run())
+
+
+def test_search_finds_notes_and_tolerates_query_syntax(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("noted"))
+            await client.post("/recipes/noted/notes", json={"note_text": "Swap in smoked paprika"})
+
+            found = (await client.get("/recipes/search", params={"q": "paprika"})).json()
+            assert [item["id"] for item in found["results"]] == ["noted"]
+
+            odd = await client.get("/recipes/search", params={"q": 'paprika" OR (NEAR'})
+            assert odd.status_code == 200
+
+            nothing = await client.get("/recipes/search", params={"q": "!!!"})
+            assert nothing.status_code == 200
+            assert nothing.json()["results"] == []
+
+    asyncio.run(run())
+
+
+def test_match_ranks_saved_recipes_by_pantry_coverage(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    full = _recipe_payload("full-cover")
+    partial = _recipe_payload("half-cover")
+    partial["ingredients"] = [
+        {"name": "Chickpeas", "amount": "1", "unit": "can", "optional": False},
+        {"name": "tahini", "amount": "2", "unit": "tbsp", "optional": False},
+        {"name": "parsley", "amount": "1", "unit": "bunch", "optional": True},
+    ]
+    unrelated = _recipe_payload("no-cover")
+    unrelated["ingredients"] = [{"name": "rice", "amount": "1", "unit": "cup", "optional": False}]
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for payload in (full, partial, unrelated):
+                assert (await client.post("/recipes", json=payload)).status_code == 200
+
+            resp = await client.post(
+                "/recipes/match", json={"ingredients": ["chickpea", "Lemons", "salt"]}
+            )
+            assert resp.status_code == 200
+            results = resp.json()["results"]
+            assert [item["id"] for item in results] == ["full-cover", "half-cover"]
+            assert results[0]["coverage"] == 1.0
+            assert results[0]["missing"] == []
+            assert results[1]["coverage"] == 0.5
+            assert results[1]["matched"] == ["chickpea"]
+            assert results[1]["missing"] == ["tahini"]
+
+            fits = await client.post(
+                "/recipes/match", json={"ingredients": ["chickpeas", "lemon"], "min_coverage": 1}
+            )
+            assert [item["id"] for item in fits.json()["results"]] == ["full-cover"]
+
+            empty = await client.post("/recipes/match", json={"ingredients": []})
+            assert empty.status_code == 422
+
+    asyncio.run(run())
+
+
+def test_get_recipe_serves_current_rows_verbatim_and_validates_stale_rows(
+    monkeypatch, tmp_path: Path
+) -> None:
+    _set_db(monkeypatch, tmp_path)
+    current = json.dumps(_recipe_payload("current"), indent=1)
+    stale = json.dumps(_recipe_payload("stale"), indent=1)
+    with get_conn() as conn:
+        conn.executemany(
+            """
+            INSERT INTO recipes (id, title, recipe_json, created_at, schema_version, doc_id)
+            VALUES (?, 'Stored', ?, '2024-01-01T00:00:00+00:00', ?, ?)
+            """,
+            [("current", current, 1, 1), ("stale", stale, 0, 2)],
+        )
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            current_resp = await client.get("/recipes/current")
+            assert current_resp.status_code == 200
+            assert current_resp.headers["content-type"] == "application/json"
+            assert current_resp.text == current
+
+            stale_resp = await client.get("/recipes/stale")
+            assert stale_resp.status_code == 200
+            assert stale_resp.text != stale
+            assert stale_resp.json() == _recipe_payload("stale")
+
+    asyncio.run(run())
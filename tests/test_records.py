@@ -0,0 +1,53 @@
+import json
+import sqlite3
+
+from app.db.records import (
+    NOTE_RECORD_COLUMNS,
+    RECIPE_SUMMARY_COLUMNS,
+    RecipeSummary,
+    dump_note_records,
+    dump_recipe_summaries,
+    note_record_row,
+    recipe_summary_row,
+)
+
+
+def test_row_factories_build_records_that_dump_like_the_old_dicts() -> None:
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE recipes (id TEXT, title TEXT, created_at TEXT, note_count INTEGER, "
+        "last_note_at TEXT)"
+    )
+    conn.execute("CREATE TABLE notes (id TEXT, note_text TEXT, created_at TEXT)")
+    conn.execute("INSERT INTO recipes VALUES ('soup', 'Café Soup', '2024-01-02', 1, '2024-01-03')")
+    conn.execute("INSERT INTO recipes VALUES ('stew', 'Stew', '2024-01-01', 0, NULL)")
+    conn.execute("INSERT INTO notes VALUES ('n1', 'More \"salt\"', '2024-01-03')")
+
+    cursor = conn.cursor()
+    cursor.row_factory = recipe_summary_row
+    summaries = cursor.execute(f"SELECT {RECIPE_SUMMARY_COLUMNS} FROM recipes").fetchall()
+    assert summaries[0] == RecipeSummary("soup", "Café Soup", "2024-01-02", 1, "2024-01-03")
+    assert not hasattr(summaries[0], "__dict__")
+    assert json.loads(dump_recipe_summaries(summaries)) == [
+        {
+            "id": "soup",
+            "title": "Café Soup",
+            "created_at": "2024-01-02",
+            "note_count": 1,
+            "last_note_at": "2024-01-03",
+        },
+        {
+            "id": "stew",
+            "title": "Stew",
+            "created_at": "2024-01-01",
+            "note_count": 0,
+            "last_note_at": None,
+        },
+    ]
+
+    cursor = conn.cursor()
+    cursor.row_factory = note_record_row
+    notes = cursor.execute(f"SELECT {NOTE_RECORD_COLUMNS} FROM notes").fetchall()
+    assert dump_note_records(notes) == (
+        b'[{"note_id":"n1","note_text":"More \\"salt\\"","created_at":"2024-01-03"}]'
+    )
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from pathlib import Path
+
+import httpx
+
+from app.db.sqlite import init_db
+from app.main import app
+from app.schemas.recipe import Recipe
+from app.services import similarity
+from app.services.similarity import (
+    SimilarityIndex,
+    add_recipe_to_index,
+    get_similarity_index,
+    persist_similarity_indexes,
+    similarity_index_path,
+)
+
+
+def _set_db(monkeypatch, tmp_path: Path) -> Path:
+    db_path = tmp_path / "recipes.db"
+    monkeypatch.setenv("RECIPE_DB_PATH", str(db_path))
+    init_db()
+    return db_path
+
+
+def _recipe_payload(recipe_id: str, title: str, ingredient_names: list[str]) -> dict:
+    ingredients = [
+        {"name": name, "amount": "1", "unit": "item", "optional": False}
+        for name in ingredient_names
+    ]
+    return {
+        "id": recipe_id,
+        "title": title,
+        "servings": 2,
+        "time_minutes": 20,
+        "difficulty": "easy",
+        "dish_summary": "A quick dish.",
+        "ingredients": ingredients,
+        "steps": [{"step": 1, "text": "Cook.", "timer_minutes": None}],
+        "substitutions": [],
+        "cook_mode": {"ingredients_checklist": ingredients, "step_cards": ["Cook."]},
+    }
+
+
+async def _save_all(client: httpx.AsyncClient) -> None:
+    for payload in (
+        _recipe_payload("bowl", "Chickpea Bowl", ["chickpeas", "lemon", "spinach"]),
+        _recipe_payload("salad", "Chickpea Salad", ["chickpeas", "lemon", "cucumber"]),
+        _recipe_payload("stew", "Beef Stew", ["beef", "carrot", "potato"]),
+        _recipe_payload("wrap", "Spinach Wrap", ["tortilla", "spinach"]),
+    ):
+        assert (await client.post("/recipes", json=payload)).status_code == 200
+
+
+def test_similar_recipes_ranked_by_cosine(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await _save_all(client)
+
+            resp = await client.get("/recipes/bowl/similar", params={"limit": 3})
+            assert resp.status_code == 200
+            body = resp.json()
+            assert [item["id"] for item in body] == ["salad", "wrap"]
+            assert 0 < body[1]["score"] < body[0]["score"] <= 1
+
+            missing = await client.get("/recipes/missing/similar")
+            assert missing.status_code == 404
+
+            detail = await client.get("/recipes/ui/bowl")
+            assert 'href="/recipes/ui/bowl/similar"' in detail.text
+            assert "Similar Recipes" not in detail.text
+
+            panel = await client.get("/recipes/ui/bowl/similar", headers={"X-Partial": "1"})
+            assert "<html" not in panel.text
+            assert 'href="/recipes/ui/salad"' in panel.text
+            page = await client.get("/recipes/ui/bowl/similar")
+            assert "<html" in page.text
+            assert 'href="/recipes/ui/salad"' in page.text
+            assert page.headers["etag"] != panel.headers["etag"]
+            assert (await client.get("/recipes/ui/missing/similar")).status_code == 404
+
+    asyncio.run(run())
+
+
+def test_similarity_index_persists_next_to_db_and_catches_up(monkeypatch, tmp_path: Path) -> None:
+    db_path = _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await _save_all(client)
+
+    asyncio.run(run())
+    persist_similarity_indexes()
+
+    snapshot = similarity_index_path(str(db_path))
+    assert snapshot.exists()
+    reloaded = SimilarityIndex(snapshot)
+    reloaded.load()
+    assert len(reloaded) == 4
+    assert reloaded.last_doc_id == 4
+    assert [doc_id for doc_id, _ in reloaded.most_similar(1, 1)] == [2]
+
+
+def test_saves_skip_catch_up_and_snapshot_in_the_background(monkeypatch, tmp_path: Path) -> None:
+    db_path = _set_db(monkeypatch, tmp_path)
+    index = get_similarity_index()
+
+    def no_conn():
+        raise AssertionError("saves must not query SQLite for the similarity index")
+
+    monkeypatch.setattr(similarity, "get_conn", no_conn)
+    for doc_id in range(1, 51):
+        recipe = Recipe.model_validate(_recipe_payload(f"r{doc_id}", "Bean Soup", ["beans"]))
+        add_recipe_to_index(doc_id, recipe)
+    # A gap means another worker saved doc 51, so the catch-up point stays behind it.
+    add_recipe_to_index(52, recipe)
+    assert index.last_doc_id == 50
+
+    snapshot = similarity_index_path(str(db_path))
+    deadline = time.monotonic() + 5
+    while not snapshot.exists():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
@@ -1,11 +1,19 @@
 import asyncio
 import json
+import re
 from pathlib import Path
 
 import httpx
 
+from app.api import ui as ui_module
+from app.api.ui import templates
+from app.core.assets import get_asset_manifest
+from app.core.config import get_settings
+from app.core.http_cache import content_hash
+from app.core.templating import fragment_cache_counters, precompile_templates
 from app.db.sqlite import init_db
 from app.main import app
+from app.services import draft_store
 
 
 def _set_db(monkeypatch, tmp_path: Path) -> None:
@@ -37,6 +45,12 @@ def _recipe_payload(recipe_id: str, title: str, dish_summary: str = "A cozy, fas
     }
 
 
+def _draft_id(html: str) -> str:
+    match = re.search(r'name="recipe_id" value="([^"]+)"', html)
+    assert match is not None
+    return match.group(1)
+
+
 def test_root_includes_multiline_ingredients_placeholder(monkeypatch, tmp_path: Path) -> None:
     _set_db(monkeypatch, tmp_path)
 
@@ -60,28 +74,29 @@ def test_ui_save_redirects_to_recipe_detail(monkeypatch, tmp_path: Path) -> None
         transport = httpx.ASGITransport(app=app)
         async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
             generate_resp = await client.post(
-                "/generate",
-                json={
+                "/ui/generate",
+                data={
                     "theme": "Italian",
-                    "ingredients": ["chicken", "spinach"],
-                    "healthy": True,
-                    "quick_easy": True,
+                    "ingredients": "chicken\nspinach",
+                    "healthy": "on",
+                    "quick_easy": "on",
                 },
             )
             assert generate_resp.status_code == 200
-            recipe = generate_resp.json()
+            assert "recipe_json" not in generate_resp.text
+            recipe_id = _draft_id(generate_resp.text)
 
             save_resp = await client.post(
                 "/ui/save",
-                data={"recipe_json": json.dumps(recipe)},
+                data={"recipe_id": recipe_id},
                 follow_redirects=False,
             )
             assert save_resp.status_code == 303
-            assert save_resp.headers["location"] == f"/recipes/ui/{recipe['id']}"
+            assert save_resp.headers["location"] == f"/recipes/ui/{recipe_id}"
 
             detail_resp = await client.get(save_resp.headers["location"])
             assert detail_resp.status_code == 200
-            assert recipe["title"] in detail_resp.text
+            assert "Italian Recipe" in detail_resp.text
 
     asyncio.run(run())
 
@@ -154,6 +169,76 @@ def test_recipe_detail_ui_shows_notes_and_add_note_form(monkeypatch, tmp_path: P
     asyncio.run(run())
 
 
+def test_partial_note_post_returns_only_the_new_note(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    partial = {"X-Partial": "1"}
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("note-frag", "Fragment Soup"))
+
+            resp = await client.post(
+                "/recipes/ui/note-frag/notes",
+                data={"note_text": "  Less <b>salt</b>  "},
+                headers=partial,
+                follow_redirects=False,
+            )
+            assert resp.status_code == 200
+            assert resp.headers["content-type"].startswith("text/html")
+            fragment = resp.text.strip()
+            assert fragment.startswith("<li>") and fragment.endswith("</li>")
+            assert "Less &lt;b&gt;salt&lt;/b&gt;" in fragment
+            assert "<html" not in fragment
+
+            blank = await client.post(
+                "/recipes/ui/note-frag/notes", data={"note_text": " "}, headers=partial
+            )
+            assert blank.status_code == 204
+
+            missing = await client.post(
+                "/recipes/ui/nope/notes", data={"note_text": "x"}, headers=partial
+            )
+            assert missing.status_code == 404
+
+            notes = (await client.get("/recipes/note-frag/notes")).json()
+            assert [note["note_text"] for note in notes] == ["Less <b>salt</b>"]
+            assert "Less &lt;b&gt;salt&lt;/b&gt;" in (await client.get("/recipes/ui/note-frag")).text
+
+    asyncio.run(run())
+
+
+def test_recipes_ui_pages_and_partial_next_rows(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+    payloads = [_recipe_payload(f"page-{index:02d}", f"Paged {index:02d}") for index in range(55)]
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.post("/recipes/batch", json=payloads)).status_code == 200
+
+            page = await client.get("/recipes/ui")
+            assert "X-Partial" in page.headers["vary"]
+            assert page.text.count('class="list-title"') == 50
+            assert 'href="/recipes/ui?offset=50"' in page.text
+
+            rest = await client.get("/recipes/ui", params={"offset": 50}, headers={"X-Partial": "1"})
+            assert rest.status_code == 200
+            assert "<html" not in rest.text
+            assert rest.text.count('class="list-title"') == 5
+            assert "data-load-more" not in rest.text
+
+            found = await client.get("/recipes/ui", params={"q": "paged"})
+            assert found.text.count('class="list-title"') == 50
+            assert 'href="/recipes/ui?q=paged&amp;offset=50"' in found.text
+            more = await client.get(
+                "/recipes/ui", params={"q": "paged", "offset": 50}, headers={"X-Partial": "1"}
+            )
+            assert more.text.count('class="list-title"') == 5
+
+    asyncio.run(run())
+
+
 def test_saved_recipes_empty_state_has_primary_cta(monkeypatch, tmp_path: Path) -> None:
     _set_db(monkeypatch, tmp_path)
 
@@ -249,7 +334,28 @@ def test_saved_recipe_without_summary_is_rejected(monkeypatch, tmp_path: Path) -
     asyncio.run(run())
 
 
-def test_ui_save_invalid_recipe_json_returns_400(monkeypatch, tmp_path: Path) -> None:
+def test_ui_save_default_draft_store_survives_worker_switch(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            generate_resp = await client.post(
+                "/ui/generate", data={"theme": "Shared Draft", "ingredients": "leek"}
+            )
+            recipe_id = _draft_id(generate_resp.text)
+
+            # A fresh process (another worker, or after a restart) has no drafts in memory.
+            monkeypatch.setattr(draft_store, "_stores", {})
+            save_resp = await client.post(
+                "/ui/save", data={"recipe_id": recipe_id}, follow_redirects=False
+            )
+            assert save_resp.status_code == 303
+
+    asyncio.run(run())
+
+
+def test_ui_save_unknown_draft_returns_404(monkeypatch, tmp_path: Path) -> None:
     _set_db(monkeypatch, tmp_path)
 
     async def run() -> None:
@@ -257,11 +363,18 @@ def test_ui_save_invalid_recipe_json_returns_400(monkeypatch, tmp_path: Path) ->
         async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
             resp = await client.post(
                 "/ui/save",
-                data={"recipe_json": "{\"id\":"},
+                data={"recipe_id": "never-generated"},
                 follow_redirects=False,
             )
-            assert resp.status_code == 400
-            assert resp.json()["detail"] == "Invalid recipe payload"
+            assert resp.status_code == 404
+            assert resp.json()["detail"] == "Recipe draft not found or expired"
+
+            tampered = await client.post(
+                "/ui/save",
+                data={"recipe_json": json.dumps(_recipe_payload("forged", "Forged Recipe"))},
+                follow_redirects=False,
+            )
+            assert tampered.status_code == 422
 
     asyncio.run(run())
 
@@ -273,33 +386,168 @@ def test_ui_save_duplicate_recipe_redirects_to_existing_detail(monkeypatch, tmp_
         transport = httpx.ASGITransport(app=app)
         async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
             generate_resp = await client.post(
-                "/generate",
-                json={
-                    "theme": "Duplicate Save",
-                    "ingredients": ["tomato"],
-                    "healthy": False,
-                    "quick_easy": True,
-                },
+                "/ui/generate",
+                data={"theme": "Duplicate Save", "ingredients": "tomato", "quick_easy": "on"},
             )
             assert generate_resp.status_code == 200
-            recipe = generate_resp.json()
-            recipe_json = json.dumps(recipe)
+            recipe_id = _draft_id(generate_resp.text)
 
             first_save = await client.post(
                 "/ui/save",
-                data={"recipe_json": recipe_json},
+                data={"recipe_id": recipe_id},
                 follow_redirects=False,
             )
             second_save = await client.post(
                 "/ui/save",
-                data={"recipe_json": recipe_json},
+                data={"recipe_id": recipe_id},
                 follow_redirects=False,
             )
 
-            expected_location = f"/recipes/ui/{recipe['id']}"
+            expected_location = f"/recipes/ui/{recipe_id}"
             assert first_save.status_code == 303
             assert second_save.status_code == 303
             assert first_save.headers["location"] == expected_location
             assert second_save.headers["location"] == expected_location
 
     asyncio.run(run())
+
+
+def test_recipes_ui_shows_note_count(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("count-ui", "Counted Recipe"))
+            await client.post("/recipes/count-ui/notes", json={"note_text": "Add chili"})
+
+            resp = await client.get("/recipes/ui")
+            assert resp.status_code == 200
+            assert "1 note" in resp.text
+            assert "1 notes" not in resp.text
+
+    asyncio.run(run())
+
+
+def test_recipes_ui_search_shows_matching_recipes(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("soup-ui", "Tomato Soup"))
+            await client.post("/recipes", json=_recipe_payload("salad-ui", "Green Salad"))
+
+            page = await client.get("/recipes/ui")
+            assert 'name="q"' in page.text
+
+            resp = await client.get("/recipes/ui", params={"q": "tomato"})
+            assert resp.status_code == 200
+            assert "Tomato Soup" in resp.text
+            assert "Green Salad" not in resp.text
+            assert "<mark>" in resp.text
+
+            empty = await client.get("/recipes/ui", params={"q": "durian"})
+            assert "No recipes match" in empty.text
+
+    asyncio.run(run())
+
+
+def test_generate_page_includes_pantry_hint_hooks(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            resp = await client.get("/")
+            assert resp.status_code == 200
+            assert "data-pantry-input" in resp.text
+            assert "data-pantry-hint" in resp.text
+
+    asyncio.run(run())
+
+
+def test_recipe_fragments_are_cached_and_rerendered_after_replace(
+    monkeypatch, tmp_path: Path
+) -> None:
+    _set_db(monkeypatch, tmp_path)
+    # Pre-rendered pages would be served before any template runs.
+    monkeypatch.setenv("PRERENDER", "0")
+    get_settings.cache_clear()
+    hits = fragment_cache_counters["hits"]
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("frag-1", "Chickpea Stew"))
+            first = await client.get("/cook/frag-1")
+            second = await client.get("/cook/frag-1")
+            assert second.text == first.text
+            assert fragment_cache_counters["hits"] == hits + 1
+
+            changed = _recipe_payload("frag-1", "Chickpea Stew")
+            changed["steps"][0]["text"] = "Roast chickpeas."
+            changed["cook_mode"]["step_cards"] = ["Roast chickpeas."]
+            await client.post("/recipes/batch", json=[changed], params={"on_conflict": "replace"})
+            for path in ("/cook/frag-1", "/recipes/ui/frag-1"):
+                page = (await client.get(path)).text
+                assert "Roast chickpeas." in page
+                assert "Warm chickpeas." not in page
+
+    asyncio.run(run())
+
+
+def test_detail_fragment_key_follows_the_rendered_recipe(monkeypatch, tmp_path: Path) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("keyed", "Keyed Stew"))
+
+    asyncio.run(run())
+    # A version read before a concurrent replace: the newer row is rendered, and its
+    # fragments are cached under that row's hash rather than the stale one.
+    page = ui_module._detail_page("keyed", {"content_hash": "stale"})
+    assert page is not None
+    _, context = page
+    assert context["recipe_hash"] == content_hash(context["recipe"].model_dump_json().encode())
+    assert context["recipe_hash"] != "stale"
+
+
+def test_service_worker_precaches_shell_and_offlines_saved_recipes(
+    monkeypatch, tmp_path: Path
+) -> None:
+    _set_db(monkeypatch, tmp_path)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/recipes", json=_recipe_payload("sw-1", "Offline Stew"))
+
+            worker = await client.get("/sw.js")
+            assert worker.status_code == 200
+            assert worker.headers["content-type"].startswith("text/javascript")
+            assert worker.headers["cache-control"] == "no-cache"
+            assert "{{" not in worker.text
+            assert f'const VERSION = "{ui_module._TEMPLATES_FINGERPRINT}";' in worker.text
+            assert "const PREFETCH_RECIPES = 20;" in worker.text
+            match = re.search(r"const SHELL_URLS = (\[.*\]);", worker.text)
+            assert match is not None
+            shell = json.loads(match.group(1))
+            assert {"/", "/recipes/ui", *get_asset_manifest().urls()} == set(shell)
+
+            page = (await client.get("/recipes/ui/sw-1")).text
+            assert get_asset_manifest().url("offline.js") in page
+            assert 'data-offline-prefetch="/cook/sw-1 /recipes/sw-1"' in page
+            assert "data-offline-recent" in (await client.get("/recipes/ui")).text
+
+    asyncio.run(run())
+
+
+def test_precompile_loads_every_template() -> None:
+    names = templates.env.list_templates()
+    assert {"base.html", "cook_mode.html"} <= set(names)
+    assert precompile_templates(templates) >= 0
+    assert templates.env.cache is not None
+    assert len(templates.env.cache) >= len(names)